@@ -1,2 +1,4 @@
 from .namespace import Namespace
-from .resource import Resource
\ No newline at end of file
+from .resource import Resource
+from .loader import DataLoader, Loader
+from .bulkhead import BulkheadConfig
\ No newline at end of file
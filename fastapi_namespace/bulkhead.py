@@ -0,0 +1,112 @@
+from fastapi import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Optional
+import asyncio
+
+
+@dataclass(frozen=True)
+class BulkheadConfig:
+    """Resource method 하나의 동시 처리 제한 설정
+
+    Attributes:
+        max_concurrency: 동시에 처리하는 최대 요청 수
+        max_queue: 자리가 날 때까지 기다릴 수 있는 최대 요청 수, 0 이면 바로 거절
+        queue_timeout: 최대 대기 시간 (초), ``None`` 이면 자리가 날 때까지
+        retry_after: 거절 응답의 ``Retry-After`` (초)
+    """
+    max_concurrency: int
+    max_queue: int = 0
+    queue_timeout: Optional[float] = 1.0
+    retry_after: int = 1
+
+
+@dataclass
+class BulkheadStats:
+    """``Bulkhead`` 누적 통계
+
+    Attributes:
+        in_flight: 처리 중인 요청 수
+        waiting: 대기 중인 요청 수
+        admitted: 처리한 요청 수 (대기 후 처리 포함)
+        queued: 대기 후 처리한 요청 수
+        rejected: 대기열이 가득 차서 거절한 요청 수
+        timed_out: ``queue_timeout`` 이 지나 거절한 요청 수
+    """
+    in_flight: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+
+
+class Bulkhead:
+    """``BulkheadConfig`` 로 method 하나의 동시 처리 수를 제한
+
+    * 자리가 있으면 await 없이 바로 통과
+    * 자리가 없으면 ``max_queue`` 까지 순서대로 대기, 넘치거나 ``queue_timeout`` 이 지나면 503 + ``Retry-After``
+    * 자리는 끝난 요청에서 대기 중인 요청으로 바로 넘겨지므로 새 요청이 끼어들지 않음
+    * ``dependency`` 를 route 의 첫번째 dependency 로 사용, 다른 dependency 와 handler 가 끝나면 자리를 반환
+    """
+
+    def __init__(self, config: BulkheadConfig):
+        self.config = config
+        self._stats = BulkheadStats()
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def stats(self) -> BulkheadStats:
+        return replace(self._stats, waiting=len(self._waiters))
+
+    def _reject(self) -> HTTPException:
+        return HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service Unavailable",
+            headers={"Retry-After": str(self.config.retry_after)},
+        )
+
+    async def acquire(self) -> None:
+        stats = self._stats
+        if stats.in_flight < self.config.max_concurrency and len(self._waiters) == 0:
+            stats.in_flight += 1
+            stats.admitted += 1
+            return
+        if len(self._waiters) >= self.config.max_queue:
+            stats.rejected += 1
+            raise self._reject()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            async with asyncio.timeout(self.config.queue_timeout):
+                await future
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # 자리를 넘겨 받은 직후 취소 되었으면 다음 요청에 넘김
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            if isinstance(e, TimeoutError):
+                stats.timed_out += 1
+                raise self._reject() from None
+            raise
+        stats.admitted += 1
+        stats.queued += 1
+
+    def release(self) -> None:
+        while len(self._waiters) != 0:
+            future = self._waiters.popleft()
+            if not future.done():
+                # in_flight 는 그대로 두고 자리를 넘김
+                future.set_result(None)
+                return
+        self._stats.in_flight -= 1
+
+    async def dependency(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,143 @@
+from fastapi import Depends, Request
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, Optional, Sequence, TypeVar
+import asyncio
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[list[K]], Awaitable[Sequence[V | Exception]]]
+"""
+``keys`` 순서대로 값 또는 해당 키의 ``Exception`` 을 반환하는 batch 함수
+"""
+
+LOADERS_STATE_KEY = "data_loaders"
+
+
+class DataLoader(Generic[K, V]):
+    """같은 event loop tick 안에서 요청된 키를 모아 ``batch_fn`` 한번으로 조회
+
+    * ``load`` 는 키를 대기열에 넣고, 대기열이 비어 있었으면 다음 tick 에 한번에 처리
+    * ``asyncio.gather`` 등으로 동시에 실행 중인 coroutine 의 ``load`` 가 하나로 묶임,
+      순서대로 await 하는 호출은 묶이지 않고 memoize 만 됨
+    * ``cache`` 면 같은 키는 loader 가 살아있는 동안 (요청 동안) 한번만 조회
+    * ``batch_fn`` 이 실패하면 해당 batch 의 키는 모두 같은 예외, 다음 ``load`` 에서 다시 조회
+    * batch 가 취소 되면 대기 중인 ``load`` 도 취소 됨
+
+    Args:
+        batch_fn: 키 목록을 받아 같은 순서의 값 목록을 반환하는 함수
+        max_batch_size: 한번에 넘길 최대 키 갯수, ``None`` 이면 제한 없음
+        cache: 키 별 결과 memoize 여부
+    """
+
+    def __init__(self, batch_fn: BatchLoadFn, max_batch_size: Optional[int] = None, cache: bool = True):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self._futures: dict[K, asyncio.Future] = {}
+        self._queue: list[tuple[K, asyncio.Future]] = []
+        # 실행 중인 batch task 가 GC 되지 않도록 끝날 때까지 참조를 유지
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: K) -> Awaitable[V]:
+        if self.cache and (future := self._futures.get(key)) is not None and not future.cancelled():
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self.cache:
+            self._futures[key] = future
+        self._queue.append((key, future))
+        if len(self._queue) == 1:
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V]:
+        return list(await asyncio.gather(*(self.load(i) for i in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """조회 없이 결과를 넣어둠, 이미 있으면 무시"""
+        if self.cache and key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """memoize 된 결과를 지움, ``key`` 가 없으면 전부"""
+        if key is None:
+            self._futures.clear()
+        else:
+            self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        size = self.max_batch_size or len(queue)
+        for start in range(0, len(queue), size):
+            task = asyncio.ensure_future(self._run(queue[start:start + size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _forget(self, key: K, future: asyncio.Future) -> None:
+        """실패한 키는 다음 ``load`` 에서 다시 조회"""
+        if self._futures.get(key) is future:
+            del self._futures[key]
+
+    async def _run(self, batch: list[tuple[K, asyncio.Future]]) -> None:
+        keys = [key for key, _ in batch]
+        try:
+            values = await self.batch_fn(keys)
+            if len(values) != len(keys):
+                raise ValueError(f"batch_fn returned {len(values)} values for {len(keys)} keys")
+            for (key, future), value in zip(batch, values):
+                if future.done():
+                    continue
+                if isinstance(value, Exception):
+                    self._forget(key, future)
+                    future.set_exception(value)
+                else:
+                    future.set_result(value)
+        except Exception as e:
+            for key, future in batch:
+                if not future.done():
+                    self._forget(key, future)
+                    future.set_exception(e)
+        finally:
+            # CancelledError 등으로 끝나도 기다리는 load 가 남지 않도록 취소
+            for key, future in batch:
+                if not future.done():
+                    self._forget(key, future)
+                    future.cancel()
+
+
+def get_request_loader(
+        request: Request,
+        key: Any,
+        factory: Callable[[], DataLoader],
+) -> DataLoader:
+    """요청에 저장된 ``key`` 의 ``DataLoader``, 없으면 ``factory`` 로 만들어 저장"""
+    if (loaders := getattr(request.state, LOADERS_STATE_KEY, None)) is None:
+        loaders = {}
+        setattr(request.state, LOADERS_STATE_KEY, loaders)
+    if (loader := loaders.get(key)) is None:
+        loader = factory()
+        loaders[key] = loader
+    return loader
+
+
+def Loader(
+        batch_fn: BatchLoadFn,
+        max_batch_size: Optional[int] = None,
+        cache: bool = True,
+) -> Any:
+    """요청 단위 ``DataLoader`` 를 주입하는 ``Depends``
+
+    * 같은 요청의 handler 와 dependency 들은 같은 ``batch_fn`` 이면 같은 loader 를 받음
+    * Resource method 인자 기본값이나 ``global_dependencies`` 의 dependency 인자에 사용
+
+    ex)
+        async def get(self, users: DataLoader[int, User] = Loader(load_users)):
+            a, b = await users.load_many([1, 2])
+    """
+
+    def dependency(request: Request) -> DataLoader:
+        return get_request_loader(request, batch_fn, lambda: DataLoader(batch_fn, max_batch_size, cache))
+
+    return Depends(dependency)
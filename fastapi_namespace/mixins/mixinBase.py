@@ -87,8 +87,7 @@ class MixinBase(Resource, metaclass=__Meta):
     def _add_depends(self, type_: MethodType, depends: Depends) -> None:
         assert isinstance(depends, Depends), "Depends must be a Depends"
         key = f'{type_}_dependencies'
-        dependencies = getattr(self, key, [])
-        dependencies.append(depends)
+        dependencies = [*getattr(self, key, []), depends]
         setattr(self, key, dependencies)
 
     def add_global_depends(self, depends: Depends) -> None:
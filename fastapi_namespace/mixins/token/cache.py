@@ -0,0 +1,243 @@
+from .typings import TokenKey
+from collections import OrderedDict
+from hashlib import blake2b
+from time import monotonic, time
+from typing import Callable, Optional
+import fcntl
+import mmap
+import os
+import struct
+
+_SHARED_MAGIC = b"FNSTC001"
+# magic, slot 갯수, slot 크기
+_SHARED_HEADER = struct.Struct("<8sII")
+# seq, 키 hash, cache 만료 시각, 토큰 만료 시각, 레코드 길이
+_SHARED_SLOT = struct.Struct("<I16sddH")
+_SHARED_SEQ = struct.Struct("<I")
+_EMPTY_HASH = bytes(16)
+
+
+class NegativeTokenCache:
+    """최근 조회에 실패한 토큰 키를 잠시 기억하는 프로세스 내 cache
+
+    만료 되었거나 무작위인 토큰이 반복해서 들어올 때 저장소 조회를 생략함
+
+    * ``max_size`` 를 넘으면 가장 오래 쓰이지 않은 키부터 버림
+    * ``ttl`` 이 지나면 다시 저장소를 조회
+    * 이 프로세스에서 발급한 토큰은 ``discard`` 로 바로 지움,
+      다른 프로세스에서 발급 된 토큰은 ``ttl`` 동안 없는 것으로 보일 수 있으나
+      토큰은 추측할 수 없으므로 발급 전에 조회 되는 경우는 없음
+
+    Args:
+        max_size: 최대 키 갯수
+        ttl: 키를 기억하는 시간 (초)
+        clock: 현재 시각 (테스트 용)
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 5, clock: Callable[[], float] = monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._keys: OrderedDict[TokenKey, float] = OrderedDict()
+        self.hits = 0
+        self.lookups = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def hit_rate(self) -> float:
+        """``contains`` 호출 중 cache 에서 걸러진 비율"""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def contains(self, key: TokenKey) -> bool:
+        self.lookups += 1
+        if (deadline := self._keys.get(key)) is None:
+            return False
+        if deadline <= self._clock():
+            del self._keys[key]
+            return False
+        self._keys.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def add(self, key: TokenKey) -> None:
+        self._keys[key] = self._clock() + self.ttl
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+
+    def discard(self, key: TokenKey) -> None:
+        self._keys.pop(key, None)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.lookups = 0
+
+
+class SharedTokenCache:
+    """같은 호스트의 worker 들이 함께 쓰는 memory-mapped 토큰 cache
+
+    prefork (gunicorn / uvicorn workers) 환경에서 worker 마다 cache 를 따로 두지 않도록
+    ``path`` 파일 (ex. ``/dev/shm/...``) 을 ``mmap`` 해서 고정 크기 slot 에 레코드를 저장
+
+    * slot 은 ``[seq, 키 hash, cache 만료, 토큰 만료, 길이, 레코드]``,
+      키는 blake2b 128bit hash 로만 저장하므로 raw 토큰은 남지 않음
+    * open addressing, 키 hash 로 정한 연속된 ``probes`` 개 slot 중 하나에 저장,
+      빈 slot 이 없으면 가장 먼저 만료 되는 slot 을 덮어씀
+    * 조회는 lock 없이 seqlock 으로 읽음, 쓰는 중이거나 읽는 동안 ``seq`` 가 바뀐 slot 은 없는 것으로 봄
+    * 쓰기는 ``probes`` 범위의 ``fcntl`` byte-range lock 안에서 ``seq`` 를 홀수 → 짝수로 올리며 씀
+    * 처음 연 worker 가 파일을 만들고, 이후 worker 는 같은 크기 설정으로만 열 수 있음
+    * 메모리 사용량은 ``slots * slot_size`` 로 고정, ``slot_size`` 에 들어가지 않는 레코드는 저장하지 않음
+
+    Args:
+        path: 공유할 파일 경로, 같은 호스트의 worker 끼리 같아야 함
+        slots: slot 갯수
+        slot_size: slot 하나의 크기 (byte)
+        ttl: 레코드를 cache 하는 최대 시간 (초)
+        probes: 키 하나가 들어갈 수 있는 slot 갯수
+        clock: 현재 시각, 프로세스끼리 같은 기준이어야 함 (테스트 용)
+    """
+
+    def __init__(
+            self,
+            path: str,
+            slots: int = 65536,
+            slot_size: int = 256,
+            ttl: float = 1,
+            probes: int = 8,
+            clock: Callable[[], float] = time,
+    ):
+        if slot_size <= _SHARED_SLOT.size:
+            raise ValueError(f"slot_size must be larger than {_SHARED_SLOT.size}")
+        if slots < probes:
+            raise ValueError("slots must be at least probes")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self.probes = probes
+        self.capacity = slot_size - _SHARED_SLOT.size
+        self._clock = clock
+        self.hits = 0
+        self.lookups = 0
+
+        size = _SHARED_HEADER.size + slots * slot_size
+        header = _SHARED_HEADER.pack(_SHARED_MAGIC, slots, slot_size)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                current = os.pread(fd, _SHARED_HEADER.size, 0)
+                if current.strip(b"\0") == b"":
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, header, 0)
+                elif current != header:
+                    raise ValueError(f"shared token cache layout mismatch: {path}")
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._mmap = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    @property
+    def hit_rate(self) -> float:
+        """이 프로세스의 ``get`` 호출 중 cache 에서 찾은 비율"""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.lookups = 0
+
+    @staticmethod
+    def _hash(key: TokenKey) -> bytes:
+        return blake2b(key.encode(), digest_size=16).digest()
+
+    def _window(self, key_hash: bytes) -> range:
+        # 범위가 파일 끝을 넘지 않도록 시작 위치를 정해서 lock 한번으로 잠금
+        start = int.from_bytes(key_hash[:8], "little") % (self.slots - self.probes + 1)
+        return range(start, start + self.probes)
+
+    def _offset(self, index: int) -> int:
+        return _SHARED_HEADER.size + index * self.slot_size
+
+    def _lock(self, window: range, op: int) -> None:
+        fcntl.lockf(self._fd, op, self.probes * self.slot_size, self._offset(window.start))
+
+    def get(self, key: TokenKey) -> Optional[tuple[bytes, int]]:
+        """``(레코드, 남은 토큰 만료 시간)``, 없거나 만료 되었으면 ``None``"""
+        self.lookups += 1
+        key_hash = self._hash(key)
+        now = self._clock()
+        mm = self._mmap
+        for index in self._window(key_hash):
+            offset = self._offset(index)
+            seq, slot_hash, deadline, expires_at, length = _SHARED_SLOT.unpack_from(mm, offset)
+            if seq & 1 or slot_hash != key_hash:
+                continue
+            start = offset + _SHARED_SLOT.size
+            record = mm[start:start + min(length, self.capacity)]
+            if _SHARED_SEQ.unpack_from(mm, offset)[0] != seq or deadline <= now:
+                continue
+            self.hits += 1
+            return record, -1 if expires_at < 0 else int(expires_at - now)
+        return None
+
+    def _write(self, offset: int, key_hash: bytes, deadline: float, expires_at: float, record: bytes) -> None:
+        mm = self._mmap
+        seq = _SHARED_SEQ.unpack_from(mm, offset)[0]
+        _SHARED_SEQ.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF)
+        start = offset + _SHARED_SLOT.size
+        mm[start:start + len(record)] = record
+        _SHARED_SLOT.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF, key_hash, deadline, expires_at, len(record))
+        _SHARED_SEQ.pack_into(mm, offset, (seq + 2) & 0xFFFFFFFF)
+
+    def put(self, key: TokenKey, record: bytes, expires_in: int) -> bool:
+        """레코드 저장, ``expires_in`` 은 토큰의 남은 만료 시간 (``-1`` 이면 만료 없음)
+
+        * ``ttl`` 과 토큰 만료 중 먼저 오는 시각까지 cache
+        * 저장하지 않았으면 ``False``
+        """
+        if len(record) > self.capacity or expires_in == 0:
+            return False
+        key_hash = self._hash(key)
+        now = self._clock()
+        expires_at = -1.0 if expires_in < 0 else now + expires_in
+        deadline = now + (self.ttl if expires_in < 0 else min(self.ttl, expires_in))
+        window = self._window(key_hash)
+        self._lock(window, fcntl.LOCK_EX)
+        try:
+            target, oldest = None, None
+            for index in window:
+                offset = self._offset(index)
+                _, slot_hash, slot_deadline, _, _ = _SHARED_SLOT.unpack_from(self._mmap, offset)
+                if slot_hash == key_hash:
+                    target = offset
+                    break
+                if target is None and (slot_hash == _EMPTY_HASH or slot_deadline <= now):
+                    target = offset
+                elif oldest is None or slot_deadline < oldest[0]:
+                    oldest = (slot_deadline, offset)
+            self._write(oldest[1] if target is None else target, key_hash, deadline, expires_at, record)
+        finally:
+            self._lock(window, fcntl.LOCK_UN)
+        return True
+
+    def discard(self, key: TokenKey) -> None:
+        """취소 된 토큰을 모든 worker 의 cache 에서 지움"""
+        key_hash = self._hash(key)
+        window = self._window(key_hash)
+        self._lock(window, fcntl.LOCK_EX)
+        try:
+            for index in window:
+                offset = self._offset(index)
+                if _SHARED_SLOT.unpack_from(self._mmap, offset)[1] == key_hash:
+                    self._write(offset, _EMPTY_HASH, 0.0, 0.0, b"")
+        finally:
+            self._lock(window, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
@@ -0,0 +1,42 @@
+from .typings import AsyncRedis, UserIdentify
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster, ClusterNode
+from hashlib import blake2b
+
+
+def get_hash_tag(identify: UserIdentify, length: int = 8) -> str:
+    """uid 로 만든 Redis Cluster hash tag
+
+    * uid 가 토큰에 그대로 드러나지 않도록 hash 를 사용
+    """
+    return blake2b(str(identify).encode(), digest_size=length // 2).hexdigest()
+
+
+class ClusterNodeClients:
+    """``RedisCluster`` 의 노드별 ``Redis`` Client
+
+    redis-py 의 async ``RedisCluster`` 는 ``WATCH`` / ``MULTI`` 를 지원하지 않으므로
+    hash tag 로 한 slot 에 모인 키는 해당 노드의 일반 Client 로 처리함,
+    토큰 키를 ``str`` 로 다루므로 ``RedisCluster`` 설정과 관계없이 ``decode_responses=True``
+    """
+
+    def __init__(self):
+        self._clients: dict[str, AsyncRedis] = {}
+
+    def _get_node_client(self, node: ClusterNode) -> AsyncRedis:
+        if (client := self._clients.get(node.name)) is None:
+            client = Redis(**{**node.connection_kwargs, "decode_responses": True})
+            self._clients[node.name] = client
+        return client
+
+    def get_client(self, rd: RedisCluster, key: str) -> AsyncRedis:
+        """``key`` 의 slot 을 가진 primary 노드 Client"""
+        return self._get_node_client(rd.get_node_from_key(key))
+
+    def get_primary_clients(self, rd: RedisCluster) -> list[AsyncRedis]:
+        return [self._get_node_client(node) for node in rd.get_primaries()]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
@@ -0,0 +1,223 @@
+from .typings import Token, TokenInfo
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import asdict, fields
+from orjson import dumps, loads
+from typing import Any, Callable, Iterator, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T", bound=Token)
+TI = TypeVar("TI", bound=TokenInfo)
+
+RawValue = Union[bytes, str]
+
+RawRecord = Union[RawValue, Mapping[str, RawValue]]
+"""
+저장된 토큰 레코드, ``HashTokenCodec`` 이면 **필드 이름 → 인코딩 된 값**
+"""
+
+
+class TokenCodec(ABC):
+    """Redis 에 저장되는 토큰 레코드 codec
+
+    Attributes:
+        trusted:
+            ``True`` 면 ``verified`` 로 확인한 직접 쓴 레코드는 decode 결과를 다시 검증하지 않음
+    """
+    trusted: bool = False
+    hashed: bool = False
+    """``True`` 면 레코드가 Redis hash 로 저장 됨"""
+
+    def verified(self, data: RawRecord) -> bool:
+        """검증을 건너뛰어도 되는 레코드인지
+
+        * 헤더로 이 codec 이 직접 쓴 레코드임을 확인한 경우만 ``True``
+        * 기존 형식이나 알 수 없는 레코드는 항상 ``False``
+        """
+        return False
+
+    @abstractmethod
+    def encode(self, token: Token) -> RawRecord:
+        pass
+
+    @abstractmethod
+    def decode(self, data: RawRecord, token: type[T]) -> T:
+        pass
+
+    def decode_info(
+            self,
+            data: RawRecord,
+            token: type[T],
+            token_info: type[TI],
+            raw_token: str,
+            expires_in: int,
+            validator: Optional[Callable[[dict[str, Any]], bool]] = None,
+    ) -> Optional[TI]:
+        """레코드에서 바로 ``TokenInfo`` 생성
+
+        * ``validator`` 가 있으면 ``verified`` 가 아닌 레코드는 decode 한 값을 검증하고 실패시 ``None``
+        * 조회 경로에서 사용 되므로 중간 객체를 만들지 않도록 구현할 것
+        """
+        _token = self.decode(data, token)
+        if validator is not None and not self.verified(data) and not validator(asdict(_token)):
+            return None
+        return token_info(_token, raw_token, expires_in)
+
+
+class JSONTokenCodec(TokenCodec):
+    """``{"payload": ..., "uid": ...}`` 형태의 JSON 레코드 (기존 형식)"""
+
+    def encode(self, token: Token) -> bytes:
+        return dumps(token)
+
+    def decode(self, data: RawRecord, token: type[T]) -> T:
+        return token(**loads(data))
+
+    def decode_info(self, data, token, token_info, raw_token, expires_in, validator=None):
+        values = loads(data)
+        if validator is not None and not validator(values):
+            return None
+        return token_info(token(**values), raw_token, expires_in)
+
+
+class BinaryTokenCodec(TokenCodec):
+    """버전 헤더 + 필드 순서대로 나열한 레코드
+
+    ``\\x01[payload, uid, idf]`` 처럼 필드 이름 없이 저장함
+
+    * 헤더가 없는 레코드는 기존 JSON 으로 읽고 ``validator`` 로 검증함
+    * ``decode_responses=True`` 인 client 에서도 깨지지 않도록 텍스트 안전한 형식
+    """
+    trusted = True
+    version: int = 1
+
+    def __init__(self):
+        self._header = bytes((self.version,))
+        self._str_header = chr(self.version)
+        self._json = JSONTokenCodec()
+
+    def encode(self, token: Token) -> bytes:
+        return self._header + dumps([getattr(token, i.name) for i in fields(token)])
+
+    def verified(self, data: RawRecord) -> bool:
+        return data[:1] in (self._header, self._str_header)
+
+    def decode(self, data: RawRecord, token: type[T]) -> T:
+        if isinstance(data, str):
+            if data[:1] != self._str_header:
+                return self._json.decode(data, token)
+        elif data[:1] != self._header:
+            return self._json.decode(data, token)
+        return token(*loads(data[1:]))
+
+    def decode_info(self, data, token, token_info, raw_token, expires_in, validator=None):
+        if not self.verified(data):
+            return self._json.decode_info(data, token, token_info, raw_token, expires_in, validator)
+        return token_info(token(*loads(data[1:])), raw_token, expires_in)
+
+
+class HashTokenCodec(TokenCodec):
+    """필드별로 인코딩 해서 Redis hash 로 저장하는 레코드
+
+    ``{"uid": b"1", "idf": b'"..."', "payload.role": b'"admin"'}`` 처럼
+    dataclass 필드와 payload 의 키마다 hash 필드 하나
+
+    * ``HMGET`` 으로 필요한 필드만 가져올 수 있음 (``get_token_fields``)
+    * 값은 필드별 JSON 이므로 읽은 필드만 decode 함
+    * 기존 ``STRING`` 레코드와 같이 쓸 수 없으므로 바꿀 때는 기존 토큰이 만료 되어야 함
+    * ``version_field`` 헤더 필드가 있는 레코드만 직접 쓴 것으로 보고 검증을 건너뜀
+    """
+    trusted = True
+    hashed = True
+    payload_prefix: str = "payload."
+    version_field: str = "_v"
+    version: int = 1
+
+    def __init__(self):
+        self._header = dumps(self.version)
+        self._headers = (self._header, self._header.decode())
+
+    def verified(self, data: RawRecord) -> bool:
+        return data.get(self.version_field) in self._headers
+
+    def encode(self, token: Token) -> dict[str, bytes]:
+        record = {self.version_field: self._header}
+        for i in fields(token):
+            if i.name == "payload":
+                for key, value in token.payload.items():
+                    record[self.payload_prefix + key] = dumps(value)
+            else:
+                record[i.name] = dumps(getattr(token, i.name))
+        return record
+
+    def _load(self, data: RawRecord) -> dict[str, Any]:
+        values: dict[str, Any] = {}
+        payload: dict[str, Any] = {}
+        for key, value in data.items():
+            if isinstance(key, bytes):
+                key = key.decode()
+            if key == self.version_field:
+                continue
+            if key.startswith(self.payload_prefix):
+                payload[key[len(self.payload_prefix):]] = loads(value)
+            else:
+                values[key] = loads(value)
+        values["payload"] = payload
+        return values
+
+    def decode(self, data: RawRecord, token: type[T]) -> T:
+        return token(**self._load(data))
+
+    def decode_info(self, data, token, token_info, raw_token, expires_in, validator=None):
+        values = self._load(data)
+        if validator is not None and not self.verified(data) and not validator(values):
+            return None
+        return token_info(token(**values), raw_token, expires_in)
+
+
+class TokenFields(Mapping):
+    """필드 일부만 읽은 토큰
+
+    값은 처음 접근할 때 decode 하고, 저장된 레코드에 없는 필드는 ``None``
+
+    Attributes:
+        token: Raw Token
+        expires_in: 남은 시간 (초)
+    """
+    __slots__ = ("token", "expires_in", "_raw", "_values", "_decode")
+
+    def __init__(
+            self,
+            raw: dict[str, Optional[RawValue]],
+            token: str,
+            expires_in: int,
+            decode: Callable[[RawValue], Any] = loads,
+    ):
+        self.token = token
+        self.expires_in = expires_in
+        self._raw = raw
+        self._values: dict[str, Any] = {}
+        self._decode = decode
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        raw = self._raw[key]
+        value = self._values[key] = None if raw is None else self._decode(raw)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __repr__(self) -> str:
+        return f"TokenFields({dict(self)!r}, expires_in={self.expires_in!r})"
+
+
+def project_token(token: Token, names: Sequence[str], payload_prefix: str = HashTokenCodec.payload_prefix) -> dict[str, Any]:
+    """decode 된 토큰에서 ``names`` 필드만 꺼냄 (hash 레코드가 아닐 때 사용)"""
+    return {
+        name: token.payload.get(name[len(payload_prefix):]) if name.startswith(payload_prefix) else getattr(token, name, None)
+        for name in names
+    }
@@ -0,0 +1,65 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from random import uniform
+from typing import AsyncIterator, Awaitable, Callable
+import asyncio
+
+
+@dataclass(frozen=True)
+class WatchRetry:
+    """``WatchError`` 재시도 정책
+
+    * 재시도 전에 full jitter 지수 backoff 만큼 기다림
+    * ``max_retries`` 를 넘으면 ``WatchError`` 를 그대로 올림
+
+    Attributes:
+        max_retries: 최대 재시도 횟수
+        base: 첫 재시도 최대 대기 시간 (초)
+        cap: 대기 시간 상한 (초)
+        random: ``(low, high)`` 사이 값을 고르는 함수, 테스트에서 바꿔 끼움
+        sleep: 기다리는 함수, 테스트에서 바꿔 끼움
+    """
+    max_retries: int = 10
+    base: float = 0.005
+    cap: float = 0.2
+    random: Callable[[float, float], float] = field(default=uniform, repr=False, compare=False)
+    sleep: Callable[[float], Awaitable[None]] = field(default=asyncio.sleep, repr=False, compare=False)
+
+    def delay(self, attempt: int) -> float:
+        """``attempt`` 번째 (1 부터) 재시도 전 대기 시간"""
+        return self.random(0, min(self.cap, self.base * (2 ** (attempt - 1))))
+
+    async def backoff(self, attempt: int) -> bool:
+        """재시도 가능하면 기다린 후 ``True``"""
+        if attempt > self.max_retries:
+            return False
+        await self.sleep(self.delay(attempt))
+        return True
+
+
+class KeyedLock:
+    """키 별 ``asyncio.Lock``
+
+    * 같은 키는 한번에 하나만 실행 되고 다른 키는 서로 막지 않음
+    * 기다리는 작업이 없으면 Lock 을 지워서 키 갯수만큼 쌓이지 않음
+    """
+
+    def __init__(self):
+        self._locks: dict[str, tuple[asyncio.Lock, list[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def __call__(self, key: str) -> AsyncIterator[None]:
+        if (entry := self._locks.get(key)) is None:
+            entry = self._locks[key] = (asyncio.Lock(), [0])
+        lock, users = entry
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if users[0] == 0:
+                del self._locks[key]
@@ -0,0 +1,248 @@
+from .typings import (
+    TokenLimit,
+    TokenKey,
+    UserTokenKey,
+    TokenExpire,
+    RawToken,
+)
+from .codec import RawRecord
+from .store import TokenStore, TokenKeyFactory, TokenIssue, TokenRotation, RotateResult
+from typing import AsyncIterator, Callable, Iterator, Optional, Sequence
+from fnmatch import fnmatchcase
+from time import monotonic
+
+
+class TimerWheel:
+    """만료 시각별로 키를 모아두는 hashed timer wheel
+
+    * ``resolution`` 초 단위 slot 을 ``size`` 개 가짐
+    * 한 바퀴 이상 남은 키는 꺼낸 후 다시 넣어야 함
+    """
+
+    def __init__(self, now: float, resolution: float = 1.0, size: int = 512):
+        self.resolution = resolution
+        self.size = size
+        self._slots: list[set[str]] = [set() for _ in range(size)]
+        self._tick = int(now / resolution)
+
+    def schedule(self, key: str, deadline: float) -> None:
+        self._slots[int(deadline / self.resolution) % self.size].add(key)
+
+    def advance(self, now: float) -> Iterator[str]:
+        """지나간 slot 의 키를 꺼냄"""
+        tick = int(now / self.resolution)
+        start = max(self._tick, tick - self.size)
+        self._tick = tick
+        for i in range(start, tick):
+            slot = self._slots[i % self.size]
+            self._slots[i % self.size] = set()
+            yield from slot
+
+
+class MemoryTokenStore(TokenStore):
+    """네트워크 없이 프로세스 내부 dict 에 저장하는 저장소
+
+    * 단일 노드 배포 및 테스트 용, 프로세스 간 공유되지 않음
+    * 만료는 ``TimerWheel`` 로 정리하며 조회 시에도 만료 시각을 확인함
+    * ``clock`` 을 바꾸면 시간을 직접 제어할 수 있음
+
+    Args:
+        clock: 초 단위 현재 시각을 반환하는 함수
+        resolution: timer wheel slot 간격 (초)
+        wheel_size: timer wheel slot 갯수
+    """
+
+    def __init__(
+            self,
+            clock: Callable[[], float] = monotonic,
+            resolution: float = 1.0,
+            wheel_size: int = 512,
+    ):
+        self._clock = clock
+        self._records: dict[str, RawRecord] = {}
+        self._sets: dict[str, set[str]] = {}
+        self._deadlines: dict[str, float] = {}
+        self._wheel = TimerWheel(clock(), resolution=resolution, size=wheel_size)
+
+    def _now(self) -> float:
+        """현재 시각, 지나간 만료 키를 함께 정리"""
+        now = self._clock()
+        for key in self._wheel.advance(now):
+            if (deadline := self._deadlines.get(key)) is None:
+                continue
+            if deadline <= now:
+                self._remove(key)
+            else:
+                self._wheel.schedule(key, deadline)
+        return now
+
+    def _remove(self, key: str) -> None:
+        self._records.pop(key, None)
+        self._sets.pop(key, None)
+        self._deadlines.pop(key, None)
+
+    def _set_expire(self, key: str, deadline: float) -> None:
+        self._deadlines[key] = deadline
+        self._wheel.schedule(key, deadline)
+
+    def _alive(self, key: str, now: float) -> bool:
+        if key not in self._records and key not in self._sets:
+            return False
+        if (deadline := self._deadlines.get(key)) is not None and deadline <= now:
+            self._remove(key)
+            return False
+        return True
+
+    def _ttl(self, key: str, now: float) -> int:
+        if not self._alive(key, now):
+            return -2
+        if (deadline := self._deadlines.get(key)) is None:
+            return -1
+        return int(deadline - now + 0.5)
+
+    async def cleanup(self, user_token_key: UserTokenKey, limit: Optional[TokenLimit], prune: bool = True) -> list[TokenKey]:
+        # 메모리에서는 만료 확인 비용이 작아서 항상 정리함
+        return self._cleanup(user_token_key, limit, self._now())
+
+    async def prune(self, user_token_keys: Sequence[UserTokenKey]) -> int:
+        now = self._now()
+        removed = 0
+        for key in user_token_keys:
+            if not self._alive(key, now):
+                continue
+            dead = [i for i in self._sets[key] if not self._alive(i, now)]
+            self._sets[key].difference_update(dead)
+            removed += len(dead)
+        return removed
+
+    def _cleanup(self, user_token_key: UserTokenKey, limit: Optional[TokenLimit], now: float) -> list[TokenKey]:
+        if not self._alive(user_token_key, now):
+            return []
+        tokens = self._sets[user_token_key]
+        tokens.difference_update([i for i in tokens if not self._alive(i, now)])
+        evict: list[TokenKey] = []
+        if limit is not None and len(tokens) >= limit:
+            evict = sorted(tokens, key=lambda i: self._deadlines.get(i, float("inf")))[:len(tokens) - limit + 1]
+            tokens.difference_update(evict)
+            for i in evict:
+                self._remove(i)
+        if len(tokens) == 0:
+            self._remove(user_token_key)
+        return evict
+
+    async def add(
+            self,
+            user_token_key: UserTokenKey,
+            make_token_key: TokenKeyFactory,
+            record: RawRecord,
+            expire: TokenExpire,
+            unique: bool = False,
+            owner_prefix: Optional[str] = None,
+    ) -> tuple[RawToken, TokenKey, int]:
+        now = self._now()
+        if not self._alive(user_token_key, now):
+            self._sets[user_token_key] = set()
+        tokens = self._sets[user_token_key]
+        while (result := make_token_key())[1] in tokens or (not unique and self._alive(result[1], now)):
+            pass
+        self._put(user_token_key, result[1], record, expire, now)
+        return result[0], result[1], expire
+
+    def _put(self, user_token_key: UserTokenKey, token_key: TokenKey, record: RawRecord, expire: TokenExpire, now: float) -> None:
+        if not self._alive(user_token_key, now):
+            self._sets[user_token_key] = set()
+        self._sets[user_token_key].add(token_key)
+        self._records[token_key] = record
+        self._set_expire(user_token_key, now + expire)
+        self._set_expire(token_key, now + expire)
+
+    async def get_with_ttl(self, token_keys: Sequence[TokenKey]) -> list[tuple[Optional[RawRecord], int]]:
+        now = self._now()
+        return [
+            (self._records[key], self._ttl(key, now)) if self._alive(key, now) else (None, -2)
+            for key in token_keys
+        ]
+
+    async def list_user(self, user_token_key: UserTokenKey) -> list[tuple[TokenKey, RawRecord, int]]:
+        now = self._now()
+        if not self._alive(user_token_key, now):
+            return []
+        return [
+            (key, self._records[key], self._ttl(key, now))
+            for key in self._sets[user_token_key] if self._alive(key, now)
+        ]
+
+    async def abort(self, user_token_key: UserTokenKey, token_keys: Optional[Sequence[TokenKey]] = None) -> None:
+        now = self._now()
+        if not self._alive(user_token_key, now):
+            return
+        tokens = self._sets[user_token_key]
+        for key in (list(tokens) if not token_keys else [i for i in token_keys if i in tokens]):
+            tokens.discard(key)
+            self._remove(key)
+        if len(tokens) == 0:
+            self._remove(user_token_key)
+
+    async def delete(self, token_keys: Sequence[TokenKey]) -> None:
+        for key in token_keys:
+            self._remove(key)
+
+    async def expire(self, keys: Sequence[str], expire: TokenExpire) -> None:
+        now = self._now()
+        for key in keys:
+            if self._alive(key, now):
+                self._set_expire(key, now + expire)
+
+    async def scan_user_keys(self, match: str, count: int) -> AsyncIterator[UserTokenKey]:
+        now = self._now()
+        for key in [i for i in self._sets if fnmatchcase(i, match)]:
+            if self._alive(key, now):
+                yield UserTokenKey(key)
+
+    def _revoke_family(self, used_key: str, family_prefix: str, now: float, deleted: list[TokenKey]) -> RotateResult:
+        if not self._alive(used_key, now):
+            return RotateResult.MISSING
+        family_key = family_prefix + self._records[used_key]
+        for key in list(self._sets.get(family_key, ()) if self._alive(family_key, now) else ()):
+            self._remove(key)
+            deleted.append(key)
+        self._remove(family_key)
+        return RotateResult.REUSED
+
+    async def rotate(self, rotation: TokenRotation) -> RotateResult:
+        now = self._now()
+        if not self._alive(rotation.token_key, now):
+            return self._revoke_family(rotation.used_key, rotation.family_prefix, now, rotation.deleted)
+        if self._records[rotation.token_key] != rotation.record:
+            return RotateResult.MISSING
+        if self._alive(rotation.access.token_key, now) or self._alive(rotation.refresh.token_key, now):
+            return RotateResult.COLLISION
+
+        family = self._records[rotation.family_pointer_key] if self._alive(rotation.family_pointer_key, now) else rotation.family
+        family_key = rotation.family_prefix + family
+        refresh_expire = rotation.refresh.expire
+        if self._alive(rotation.refresh.user_token_key, now):
+            self._sets[rotation.refresh.user_token_key].discard(rotation.token_key)
+        if self._alive(family_key, now):
+            self._sets[family_key].difference_update((rotation.token_key, rotation.family_pointer_key))
+        self._remove(rotation.token_key)
+        self._remove(rotation.family_pointer_key)
+        rotation.deleted.append(rotation.token_key)
+        self._records[rotation.used_key] = family
+        self._set_expire(rotation.used_key, now + refresh_expire)
+
+        issue: TokenIssue
+        for issue in (rotation.access, rotation.refresh):
+            rotation.deleted.extend(self._cleanup(issue.user_token_key, issue.limit, now))
+            self._put(issue.user_token_key, issue.token_key, issue.record, issue.expire, now)
+        self._records[rotation.refresh_family_pointer_key] = family
+        self._set_expire(rotation.refresh_family_pointer_key, now + refresh_expire)
+        if not self._alive(family_key, now):
+            self._sets[family_key] = set()
+        self._sets[family_key].update((rotation.access.token_key, rotation.refresh.token_key, rotation.refresh_family_pointer_key))
+        if self._deadlines.get(family_key, 0) < now + refresh_expire:
+            self._set_expire(family_key, now + refresh_expire)
+        return RotateResult.ROTATED
+
+    async def revoke_reused(self, used_key: str, family_prefix: str, deleted: Optional[list[TokenKey]] = None) -> bool:
+        return self._revoke_family(used_key, family_prefix, self._now(), [] if deleted is None else deleted) == RotateResult.REUSED
@@ -0,0 +1,212 @@
+from .typings import AsyncRedis
+from .contention import WatchRetry
+from redis.asyncio.client import Pipeline
+from redis.exceptions import WatchError
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar, Token as ContextToken
+from dataclasses import dataclass, field
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+@dataclass
+class OperationStats:
+    """토큰 작업 한번의 측정값
+
+    Attributes:
+        operation: 작업 이름 (ex. ``create_access_token``)
+        commands: Redis 로 보낸 명령 수 (``MULTI`` / ``EXEC`` 포함)
+        round_trips: Redis 왕복 횟수
+        watch_retries: ``WatchError`` 로 transaction 을 다시 실행한 횟수
+        negative_cache_hits: ``NegativeTokenCache`` 로 저장소 조회를 생략한 횟수
+        shared_cache_hits: ``SharedTokenCache`` 에서 토큰을 찾은 횟수
+        elapsed: 걸린 시간 (초)
+        error: 예외로 끝났는지 여부
+    """
+    operation: str
+    commands: int = 0
+    round_trips: int = 0
+    watch_retries: int = 0
+    negative_cache_hits: int = 0
+    shared_cache_hits: int = 0
+    elapsed: float = 0.0
+    error: bool = False
+
+
+_current: ContextVar[Optional[OperationStats]] = ContextVar("token_operation_stats", default=None)
+
+
+class TokenMetricsExporter(ABC):
+    """``OperationStats`` 를 받아서 내보냄
+
+    * 요청 처리 중에 동기로 호출 되므로 blocking I/O 는 하지 않아야 함
+    """
+
+    @abstractmethod
+    def export(self, stats: OperationStats) -> None:
+        pass
+
+
+@dataclass
+class OperationSummary:
+    count: int = 0
+    errors: int = 0
+    commands: int = 0
+    round_trips: int = 0
+    watch_retries: int = 0
+    negative_cache_hits: int = 0
+    shared_cache_hits: int = 0
+    total_time: float = 0.0
+    buckets: list[int] = field(default_factory=list)
+
+
+class HistogramExporter(TokenMetricsExporter):
+    """작업별 누적 카운터와 latency histogram 을 메모리에 보관
+
+    * ``buckets`` 는 오름차순 상한 (초), 마지막 칸은 상한 없음
+    * ``snapshot`` 으로 현재 값을 가져가서 Prometheus 등으로 넘김
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._operations: dict[str, OperationSummary] = {}
+
+    def export(self, stats: OperationStats) -> None:
+        if (summary := self._operations.get(stats.operation)) is None:
+            summary = OperationSummary(buckets=[0] * (len(self.buckets) + 1))
+            self._operations[stats.operation] = summary
+        summary.count += 1
+        summary.errors += stats.error
+        summary.commands += stats.commands
+        summary.round_trips += stats.round_trips
+        summary.watch_retries += stats.watch_retries
+        summary.negative_cache_hits += stats.negative_cache_hits
+        summary.shared_cache_hits += stats.shared_cache_hits
+        summary.total_time += stats.elapsed
+        summary.buckets[bisect_left(self.buckets, stats.elapsed)] += 1
+
+    def snapshot(self) -> dict[str, OperationSummary]:
+        return {
+            key: OperationSummary(**{**value.__dict__, "buckets": list(value.buckets)})
+            for key, value in self._operations.items()
+        }
+
+    def reset(self) -> None:
+        self._operations = {}
+
+
+class measure:
+    """with 블록 안의 Redis 사용량과 시간을 ``exporter`` 로 보냄
+
+    * ``exporter`` 가 없으면 아무것도 하지 않음
+    * 이미 측정 중이면 바깥 작업에 합산
+    """
+    __slots__ = ("exporter", "operation", "stats", "_token", "_start")
+
+    def __init__(self, exporter: Optional[TokenMetricsExporter], operation: str):
+        self.exporter = exporter
+        self.operation = operation
+        self.stats: Optional[OperationStats] = None
+
+    def __enter__(self) -> Optional[OperationStats]:
+        if self.exporter is None or _current.get() is not None:
+            return None
+        self.stats = OperationStats(self.operation)
+        self._token: ContextToken = _current.set(self.stats)
+        self._start = perf_counter()
+        return self.stats
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.stats is None:
+            return
+        self.stats.elapsed = perf_counter() - self._start
+        self.stats.error = exc_type is not None
+        _current.reset(self._token)
+        self.exporter.export(self.stats)
+
+
+def count(commands: int = 1, round_trips: int = 1) -> None:
+    """측정 중인 작업에 명령 수와 왕복 횟수를 더함"""
+    if (stats := _current.get()) is not None:
+        stats.commands += commands
+        stats.round_trips += round_trips
+
+
+def count_negative_cache_hit() -> None:
+    """측정 중인 작업에 negative cache hit 를 더함"""
+    if (stats := _current.get()) is not None:
+        stats.negative_cache_hits += 1
+
+
+def count_shared_cache_hit() -> None:
+    """측정 중인 작업에 shared cache hit 를 더함"""
+    if (stats := _current.get()) is not None:
+        stats.shared_cache_hits += 1
+
+
+class CountingPipeline(Pipeline):
+    """보낸 명령과 왕복 횟수를 세는 ``Pipeline``"""
+
+    async def immediate_execute_command(self, *args, **options):
+        count()
+        return await super().immediate_execute_command(*args, **options)
+
+    async def execute(self, raise_on_error: bool = True):
+        if self.command_stack or self.watching:
+            count(len(self.command_stack) + (2 if self.is_transaction or self.explicit_transaction else 0))
+        return await super().execute(raise_on_error)
+
+
+def pipeline(rd: AsyncRedis, transaction: bool = True) -> Pipeline:
+    """측정 중이면 ``CountingPipeline``, 아니면 ``rd.pipeline``"""
+    if _current.get() is None:
+        return rd.pipeline(transaction=transaction)
+    return CountingPipeline(rd.connection_pool, rd.response_callbacks, transaction, None)
+
+
+async def transaction(
+        rd: AsyncRedis,
+        func: Callable[[Pipeline], Any],
+        *watches: str,
+        value_from_callable: bool = False,
+        retry: Optional[WatchRetry] = None,
+) -> Any:
+    """``rd.transaction`` 과 같지만 측정 중이면 ``WatchError`` 재시도 횟수를 셈
+
+    * ``retry`` 가 있으면 재시도 전에 기다리고 횟수를 넘으면 ``WatchError``
+    """
+    if (stats := _current.get()) is None and retry is None:
+        return await rd.transaction(func, *watches, value_from_callable=value_from_callable)
+    attempt = 0
+    async with pipeline(rd, True) as pipe:
+        while True:
+            try:
+                if watches:
+                    await pipe.watch(*watches)
+                func_value = func(pipe)
+                if isawaitable(func_value):
+                    func_value = await func_value
+                exec_value = await pipe.execute()
+                return func_value if value_from_callable else exec_value
+            except WatchError:
+                attempt += 1
+                if stats is not None:
+                    stats.watch_retries += 1
+                if retry is not None and not await retry.backoff(attempt):
+                    raise
+
+
+async def scan_iter(rd: AsyncRedis, match: str, count_: int) -> AsyncIterator[str]:
+    """``rd.scan_iter`` 와 같지만 ``SCAN`` 한번마다 셈"""
+    cursor = "0"
+    while cursor != 0:
+        count()
+        cursor, keys = await rd.scan(cursor=cursor, match=match, count=count_)
+        for key in keys:
+            yield key
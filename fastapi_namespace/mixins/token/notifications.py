@@ -0,0 +1,130 @@
+from .typings import AsyncRedis, TokenKey, UserTokenKey
+from .metrics import pipeline
+from typing import Awaitable, Callable, Optional, Sequence
+import asyncio
+
+KEYSPACE_EVENTS = ("expired", "evicted", "del")
+"""토큰 키가 사라질 때 발생하는 keyevent"""
+
+
+class TokenIndexSubscriber:
+    """Redis keyspace notification 으로 유저 토큰 목록을 정리
+
+    토큰 키의 ``expired`` / ``evicted`` / ``del`` 이벤트를 받아서
+    ``owner_prefix + 토큰 키`` 에 기록된 유저 토큰 목록에서 지움
+
+    * ``batch_size`` 개가 모이거나 ``flush_interval`` 이 지나면 pipeline 두번으로 처리
+    * Redis 서버에 ``notify-keyspace-events`` 에 ``Egxe`` 가 켜져 있어야 함,
+      ``configure`` 면 시작할 때 ``CONFIG SET`` 으로 추가
+    * notification 은 노드별로 발생하므로 Cluster 면 primary 노드마다 구독
+    * 구독이 끊긴 동안 놓친 이벤트는 ``TokenReaper`` 또는 발급 시 정리에 맡김,
+      주인 기록은 토큰보다 조금 늦게 만료 되므로 남지 않음
+
+    Args:
+        get_clients: 구독할 Client 목록
+        prefixes: 토큰 키 prefix (ex. ``access_token/``)
+        owner_prefix: 토큰 키를 붙이면 토큰의 유저 토큰 키가 기록된 키가 되는 prefix
+        batch_size: 한번에 처리할 토큰 키 갯수
+        flush_interval: 모인 토큰 키를 처리하는 최대 간격 (초)
+        configure: 시작할 때 ``notify-keyspace-events`` 설정
+    """
+
+    def __init__(
+            self,
+            get_clients: Callable[[], Sequence[AsyncRedis]],
+            prefixes: Sequence[str],
+            owner_prefix: str,
+            batch_size: int = 100,
+            flush_interval: float = 1,
+            configure: bool = False,
+    ):
+        self.get_clients = get_clients
+        self.prefixes = tuple(prefixes)
+        self.owner_prefix = owner_prefix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.configure = configure
+        self.removed = 0
+        self._tasks: list[asyncio.Task] = []
+
+    @staticmethod
+    async def configure_events(rd: AsyncRedis) -> None:
+        """기존 설정을 유지하며 ``notify-keyspace-events`` 에 ``Egxe`` 추가"""
+        current = (await rd.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+        required = "E" + ("" if "A" in current else "gxe")
+        if (missing := "".join(i for i in required if i not in current)) != "":
+            await rd.config_set("notify-keyspace-events", current + missing)
+
+    async def flush(self, rd: AsyncRedis, token_keys: Sequence[TokenKey]) -> int:
+        """``token_keys`` 를 주인의 유저 토큰 목록에서 지우고 주인 기록도 지움"""
+        token_keys = list(dict.fromkeys(token_keys))
+        owner_keys = [self.owner_prefix + i for i in token_keys]
+        # 토큰마다 slot 이 다를 수 있으므로 MGET 대신 GET 을 pipeline 으로 보냄
+        async with pipeline(rd, False) as pipe:
+            for owner_key in owner_keys:
+                _: Awaitable = pipe.get(owner_key)
+            users: list[Optional[UserTokenKey]] = await pipe.execute()
+
+        by_user: dict[UserTokenKey, list[TokenKey]] = {}
+        for token_key, user_token_key in zip(token_keys, users):
+            if user_token_key is not None:
+                by_user.setdefault(user_token_key, []).append(token_key)
+        removed = 0
+        async with pipeline(rd, False) as pipe:
+            for user_token_key, tokens in by_user.items():
+                _: Awaitable = pipe.srem(user_token_key, *tokens)
+                removed += len(tokens)
+            for owner_key, user_token_key in zip(owner_keys, users):
+                if user_token_key is not None:
+                    _: Awaitable = pipe.delete(owner_key)
+            await pipe.execute()
+        self.removed += removed
+        return removed
+
+    async def _listen(self, rd: AsyncRedis) -> None:
+        db = rd.connection_pool.connection_kwargs.get("db", 0)
+        pubsub = rd.pubsub()
+        await pubsub.subscribe(*(f"__keyevent@{db}__:{i}" for i in KEYSPACE_EVENTS))
+        pending: list[TokenKey] = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.flush_interval)
+                if message is not None:
+                    key = message["data"]
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    if key.startswith(self.prefixes):
+                        pending.append(TokenKey(key))
+                if len(pending) >= self.batch_size or (len(pending) != 0 and loop.time() >= deadline):
+                    await self.flush(rd, pending)
+                    pending = []
+                if loop.time() >= deadline:
+                    deadline = loop.time() + self.flush_interval
+        finally:
+            if len(pending) != 0:
+                await asyncio.shield(self.flush(rd, pending))
+            await pubsub.aclose()
+
+    async def _listen_forever(self, rd: AsyncRedis) -> None:
+        while True:
+            try:
+                if self.configure:
+                    await self.configure_events(rd)
+                await self._listen(rd)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 연결이 끊기면 잠시 후 다시 구독
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self) -> None:
+        if len(self._tasks) == 0:
+            self._tasks = [asyncio.create_task(self._listen_forever(rd)) for rd in self.get_clients()]
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
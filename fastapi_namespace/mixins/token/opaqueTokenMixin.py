@@ -10,20 +10,32 @@ from .typings import (
     JWTToken,
     TokenInfo,
     RawToken,
-    Token
+    Token,
+    UserIdentify,
 )
+from .format import SignedOpaqueToken, TokenHeader
+from .cluster import get_hash_tag
 from fastapi_namespace.utils import get_typeddict_validator
 from secrets import token_urlsafe
 from uuid import uuid4
 from typing_extensions import TypedDict
-from dataclasses import asdict
+from typing import Optional, Union
 
 
 class OpaqueTokenMixin(TokenBaseMixin[OpaqueToken, OpaqueTokenInfo]):
+    """
+    Attributes:
+        token_secret:
+            지정하면 ``SignedOpaqueToken`` 형식으로 발급,
+            서명이 맞지 않는 토큰은 Redis 조회 없이 거절 됨
+    """
+    token_secret: Optional[Union[str, bytes]] = None
 
     def __init__(self):
-        token_validator = get_typeddict_validator(OpaqueToken)
-        token_info_validator = get_typeddict_validator(OpaqueTokenInfo)
+        self._token_format = None if self.token_secret is None else SignedOpaqueToken(self.token_secret)
+        self._unique_raw_tokens = self._token_format is not None
+        token_validator = get_typeddict_validator(OpaqueToken, strict=False)
+        token_info_validator = get_typeddict_validator(OpaqueTokenInfo, strict=False)
 
         super().__init__(
             token=OpaqueToken,
@@ -39,13 +51,25 @@ class OpaqueTokenMixin(TokenBaseMixin[OpaqueToken, OpaqueTokenInfo]):
         """
         return token_urlsafe(48)
 
+    def _create_raw_token(self, identify: UserIdentify, **kwargs) -> RawToken:
+        if self._token_format is None:
+            return super()._create_raw_token(identify, **kwargs)
+        return self._token_format.issue(get_hash_tag(identify, self.cluster_tag_length))
+
+    def _verify_raw_token(self, token: RawToken) -> bool:
+        return self._token_format is None or self._token_format.parse(token) is not None
+
+    def parse_token_header(self, token: RawToken) -> Optional[TokenHeader]:
+        """``token_secret`` 로 발급된 토큰의 header, 검증 실패시 ``None``
+
+        * 토큰 주인 확인: ``header.hint == get_hash_tag(uid, cluster_tag_length)``
+        """
+        if self._token_format is None:
+            return None
+        return self._token_format.parse(token)
+
     def _make_token(self, token: Token) -> OpaqueTokenInfo:
-        # return OpaqueTokenInfo(
-        #     **token,
-        #     idf=uuid4().hex
-        # )
-        OpaqueToken(**asdict(token))
         return OpaqueTokenInfo(
-            info=OpaqueToken(**asdict(token)),
+            info=OpaqueToken(payload=token.payload, uid=token.uid),
         )
 
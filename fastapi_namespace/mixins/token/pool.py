@@ -0,0 +1,119 @@
+from redis.asyncio import Redis
+from redis.asyncio.connection import BlockingConnectionPool, AbstractConnection
+from typing import Optional
+from time import monotonic
+import asyncio
+
+
+class TokenConnectionPool(BlockingConnectionPool):
+    """``TokenBaseMixin`` 이 공유하는 Redis connection pool
+
+    * ``max_connections`` 를 넘으면 ``timeout`` 까지 대기
+    * ``idle_timeout`` 동안 쓰이지 않은 연결은 ``min_idle`` 개를 남기고 끊음
+    * ``health_check_interval`` 은 redis-py 연결 옵션으로 넘어감
+    """
+
+    def __init__(
+            self,
+            idle_timeout: Optional[float] = 300,
+            min_idle: int = 0,
+            reap_interval: float = 30,
+            **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.idle_timeout = idle_timeout
+        self.min_idle = min_idle
+        self.reap_interval = reap_interval
+        self._reaper: Optional[asyncio.Task] = None
+        # pool 에 반납된 연결과 반납 시각, 반납 순서대로 (오래된 연결이 앞쪽)
+        self._idle: dict[AbstractConnection, float] = {}
+
+    def reset(self):
+        super().reset()
+        self._idle = {}
+
+    async def ensure_connection(self, connection: AbstractConnection):
+        # pool 에서 꺼낸 직후 다른 task 로 넘어가기 전에 불림
+        self._idle.pop(connection, None)
+        await super().ensure_connection(connection)
+
+    async def release(self, connection: AbstractConnection):
+        self._idle.pop(connection, None)
+        self._idle[connection] = monotonic()
+        await super().release(connection)
+
+    async def reap_idle(self) -> int:
+        """``idle_timeout`` 이 지난 연결을 끊음
+
+        * redis-py 의 pool 내부 목록은 건드리지 않고 연결만 끊음, 끊긴 연결은 다음 사용 때 다시 연결됨
+        * ``disconnect(nowait=True)`` 는 중간에 다른 task 로 넘어가지 않으므로 끊는 동안 다른 task 가 가져가지 못함
+
+        Returns:
+            끊은 연결 갯수
+        """
+        if self.idle_timeout is None:
+            return 0
+        deadline = monotonic() - self.idle_timeout
+        reaped = 0
+        while len(self._idle) > self.min_idle:
+            connection, released_at = next(iter(self._idle.items()))
+            if released_at >= deadline:
+                break
+            del self._idle[connection]
+            await connection.disconnect(nowait=True)
+            reaped += 1
+        return reaped
+
+    async def warm_up(self, count: int) -> None:
+        """``count`` 개의 연결을 미리 만들고 ``PING`` 으로 확인"""
+        connections = await asyncio.gather(
+            *(self.get_connection("PING") for _ in range(min(count, self.max_connections)))
+        )
+        try:
+            for connection in connections:
+                await connection.send_command("PING")
+                await connection.read_response()
+        finally:
+            for connection in connections:
+                await self.release(connection)
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            await self.reap_idle()
+
+    def start_reaper(self) -> None:
+        if self.idle_timeout is not None and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def aclose(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        await super().aclose()
+
+
+def create_token_redis_client(
+        url: str,
+        max_connections: int = 50,
+        timeout: Optional[float] = 20,
+        health_check_interval: int = 30,
+        idle_timeout: Optional[float] = 300,
+        min_idle: int = 0,
+        **kwargs
+) -> Redis:
+    """``TokenConnectionPool`` 을 사용하는 Async Redis Client 생성
+
+    * ``decode_responses`` 는 따로 주지 않으면 ``True``, ``False`` 여도 저장소가 키를 ``str`` 로 다룸
+    """
+    kwargs.setdefault("decode_responses", True)
+    pool = TokenConnectionPool.from_url(
+        url,
+        max_connections=max_connections,
+        timeout=timeout,
+        health_check_interval=health_check_interval,
+        idle_timeout=idle_timeout,
+        min_idle=min_idle,
+        **kwargs
+    )
+    return Redis(connection_pool=pool)
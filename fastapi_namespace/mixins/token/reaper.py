@@ -0,0 +1,105 @@
+from .store import TokenStore
+from .typings import UserTokenKey
+from .metrics import TokenMetricsExporter, measure
+from typing import Awaitable, Callable, Optional, Sequence
+import asyncio
+
+
+class TokenReaper:
+    """유저 토큰 목록에서 만료 된 토큰 키를 백그라운드로 정리
+
+    유저 토큰 키를 ``SCAN`` 으로 조금씩 순회하므로 발급 시에는 정리하지 않아도 됨
+
+    * 한 바퀴 돌고 나면 ``interval`` 만큼 쉼
+    * ``rate`` 가 있으면 초당 ``rate`` 개의 유저 토큰 키만 확인
+    * 실패한 순회는 다음 주기에 다시 시도하고 ``failed`` / ``last_error`` 에 남김,
+      ``metrics`` 가 있으면 ``reap_tokens`` 작업으로 내보냄 (실패는 ``error``)
+    * ``trim`` 이 있으면 한 바퀴 돌 때마다 마지막에 호출 (전역 세션 index 정리)
+
+    Args:
+        get_stores: 정리할 저장소 목록 (Cluster 면 primary 노드별 저장소)
+        patterns: 유저 토큰 키 glob 패턴
+        interval: 한 바퀴 후 쉬는 시간 (초)
+        batch_size: ``SCAN COUNT`` 및 한번에 정리할 유저 토큰 키 갯수
+        rate: 초당 확인할 유저 토큰 키 갯수, ``None`` 이면 제한 없음
+        metrics: 순회마다 ``OperationStats`` 를 받을 exporter
+        trim: 순회 후 호출할 정리 작업, 지운 갯수 반환
+
+    Attributes:
+        removed: 지운 토큰 키 갯수
+        scanned: 확인한 유저 토큰 키 갯수
+        trimmed: ``trim`` 이 지운 갯수
+        failed: 실패한 순회 횟수
+        last_error: 마지막으로 순회에 실패한 예외
+    """
+
+    def __init__(
+            self,
+            get_stores: Callable[[], Sequence[TokenStore]],
+            patterns: Sequence[str],
+            interval: float = 60,
+            batch_size: int = 100,
+            rate: Optional[float] = 1000,
+            metrics: Optional[TokenMetricsExporter] = None,
+            trim: Optional[Callable[[], Awaitable[int]]] = None,
+    ):
+        self.get_stores = get_stores
+        self.patterns = patterns
+        self.interval = interval
+        self.batch_size = batch_size
+        self.rate = rate
+        self.metrics = metrics
+        self.trim = trim
+        self.removed = 0
+        self.scanned = 0
+        self.trimmed = 0
+        self.failed = 0
+        self.last_error: Optional[Exception] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _prune(self, store: TokenStore, keys: list[UserTokenKey]) -> None:
+        self.removed += await store.prune(keys)
+        self.scanned += len(keys)
+        if self.rate is not None:
+            await asyncio.sleep(len(keys) / self.rate)
+
+    async def sweep(self) -> int:
+        """모든 유저 토큰 키를 한번 순회하고 지운 토큰 키 갯수 반환"""
+        removed = self.removed
+        for store in self.get_stores():
+            for pattern in self.patterns:
+                batch: list[UserTokenKey] = []
+                async for key in store.scan_user_keys(pattern, self.batch_size):
+                    batch.append(key)
+                    if len(batch) >= self.batch_size:
+                        await self._prune(store, batch)
+                        batch = []
+                if len(batch) != 0:
+                    await self._prune(store, batch)
+        if self.trim is not None:
+            self.trimmed += await self.trim()
+        return self.removed - removed
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            try:
+                with measure(self.metrics, "reap_tokens"):
+                    await self.sweep()
+            except Exception as e:
+                # 연결 오류 등은 다음 주기에 다시 시도
+                self.failed += 1
+                self.last_error = e
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_forever())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
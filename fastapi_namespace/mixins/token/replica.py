@@ -0,0 +1,100 @@
+from .typings import AsyncRedis
+from collections import deque
+from typing import Optional, Sequence
+import asyncio
+
+
+class ReplicaSet:
+    """조회용 replica Client 묶음
+
+    지연이 ``max_lag`` 이하인 replica 만 돌아가며 사용
+
+    * ``check_interval`` 마다 primary 의 ``master_repl_offset`` 을 기록하고
+      replica 의 ``slave_repl_offset`` 이 따라잡은 가장 최근 기록 시각으로 지연을 계산
+    * 연결이 끊겼거나 확인에 실패한 replica 는 다음 확인까지 제외
+    * 확인 전이나 사용할 replica 가 없으면 ``get_client`` 가 ``None``, primary 로 조회 해야 함
+
+    Args:
+        primary: replica 들의 primary Client
+        replicas: replica Client 목록
+        max_lag: 허용하는 최대 지연 (초)
+        check_interval: 지연 확인 간격 (초)
+    """
+
+    def __init__(
+            self,
+            primary: AsyncRedis,
+            replicas: Sequence[AsyncRedis],
+            max_lag: float = 1,
+            check_interval: float = 0.5,
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lags: list[Optional[float]] = [None] * len(self.replicas)
+        self._healthy: list[AsyncRedis] = []
+        self._next = 0
+        self._samples: deque[tuple[float, int]] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def get_client(self) -> Optional[AsyncRedis]:
+        if len(self._healthy) == 0:
+            return None
+        self._next = (self._next + 1) % len(self._healthy)
+        return self._healthy[self._next]
+
+    async def _replica_offset(self, replica: AsyncRedis) -> Optional[int]:
+        try:
+            info = await replica.info("replication")
+        except Exception:
+            return None
+        if info.get("master_link_status") != "up":
+            return None
+        return info.get("slave_repl_offset")
+
+    async def check(self) -> None:
+        """replica 별 지연을 계산하고 사용할 replica 목록을 갱신"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self._samples.append((now, (await self.primary.info("replication"))["master_repl_offset"]))
+        # 지연 계산에 필요한 만큼만 기록을 유지
+        while len(self._samples) > 1 and now - self._samples[1][0] > self.max_lag + self.check_interval:
+            self._samples.popleft()
+
+        offsets = await asyncio.gather(*(self._replica_offset(i) for i in self.replicas))
+        healthy = []
+        for index, (replica, offset) in enumerate(zip(self.replicas, offsets)):
+            caught_up = None if offset is None else max((t for t, o in self._samples if o <= offset), default=None)
+            self.lags[index] = None if caught_up is None else now - caught_up
+            if self.lags[index] is not None and self.lags[index] <= self.max_lag:
+                healthy.append(replica)
+        self._healthy = healthy
+
+    async def _check_forever(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # primary 확인 실패시 replica 를 사용하지 않음
+                self._healthy = []
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._check_forever())
+
+    async def aclose(self, close_clients: bool = True) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._healthy = []
+        if close_clients:
+            for replica in self.replicas:
+                await replica.aclose(close_connection_pool=True)
@@ -1,4 +1,5 @@
 from fastapi.security.base import SecurityBase as SecurityBase_
+from fastapi.security.utils import get_authorization_scheme_param
 from typing import ParamSpec, Callable, TypeVar, Optional
 
 P = ParamSpec("P")
@@ -6,8 +7,15 @@ T = TypeVar("T")
 ValidateFunction = Callable[P, T]
 
 
-class SecurityBase(SecurityBase_):...
-    # def __init__(self):
-    #     self._validate: Optional[ValidateFunction] = None
-    #
-    # def validate(self, func: ValidateFunction) -> ValidateFunction:
\ No newline at end of file
+class SecurityBase(SecurityBase_):
+    scheme: str = "bearer"
+
+    def parse_token(self, credentials: Optional[str]) -> Optional[str]:
+        """``__call__`` 결과 (``Authorization`` 헤더) 에서 토큰만 꺼냄
+
+        * scheme 이 다르거나 토큰이 없으면 ``None``
+        """
+        scheme, param = get_authorization_scheme_param(credentials)
+        if scheme.lower() != self.scheme or not param:
+            return None
+        return param
@@ -0,0 +1,82 @@
+from .typings import AsyncRedis
+from .metrics import count
+from typing import Optional, Union
+
+Score = Union[float, str]
+
+SESSION_SCORE_STEP = 1e-6
+"""
+한번에 index 에 추가하는 항목 사이의 score 간격 (초), epoch 초 float 에서 구분 되는 크기
+"""
+
+
+def encode_cursor(score: float, member: str) -> str:
+    return f"{score!r}:{member}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    score, _, member = cursor.partition(":")
+    return float(score), member
+
+
+async def read_index_page(
+        rd: AsyncRedis,
+        key: str,
+        min: Score = "-inf",
+        max: Score = "+inf",
+        count_: int = 100,
+        cursor: Optional[str] = None,
+        reverse: bool = False,
+) -> tuple[list[tuple[str, float]], Optional[str]]:
+    """sorted set 에서 ``cursor`` 다음 ``(member, score)`` 를 ``count_`` 개까지 읽고 다음 cursor 반환
+
+    ``(score, member)`` 기준 keyset pagination 이라 전체를 읽지 않고,
+    페이지 사이에 추가 / 삭제가 있어도 이미 읽은 위치를 다시 읽지 않음
+
+    * cursor 의 score 부터 다시 읽으며 같은 score 에서 이미 지난 member 는 건너뜀
+    * 마지막 페이지면 다음 cursor 는 ``None``
+    * ``decode_responses=False`` 인 client 여도 member 는 ``str``
+
+    Args:
+        rd: ``key`` 를 가진 노드 Client
+        key: sorted set 키
+        min: 최소 score
+        max: 최대 score
+        count_: 페이지 크기
+        cursor: 이전 페이지의 cursor, 없으면 처음부터
+        reverse: score 내림차순
+
+    Raises:
+        ValueError: ``count_`` 가 1 보다 작음
+    """
+    if count_ < 1:
+        raise ValueError("count must be at least 1")
+    after = None if cursor is None else decode_cursor(cursor)
+    if after is not None:
+        if reverse:
+            max = after[0]
+        else:
+            min = after[0]
+
+    entries: list[tuple[str, float]] = []
+    offset = 0
+    exhausted = False
+    while len(entries) < count_ and not exhausted:
+        count()
+        if reverse:
+            rows = await rd.zrevrangebyscore(key, max, min, start=offset, num=count_, withscores=True)
+        else:
+            rows = await rd.zrangebyscore(key, min, max, start=offset, num=count_, withscores=True)
+        exhausted = len(rows) < count_
+        offset += len(rows)
+        for member, score in rows:
+            if isinstance(member, bytes):
+                member = member.decode()
+            if after is not None and score == after[0] and (member >= after[1] if reverse else member <= after[1]):
+                continue
+            entries.append((member, score))
+
+    if exhausted and len(entries) <= count_:
+        return entries, None
+    entries = entries[:count_]
+    return entries, encode_cursor(entries[-1][1], entries[-1][0])
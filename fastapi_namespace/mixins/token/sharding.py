@@ -0,0 +1,248 @@
+from .typings import AsyncRedis
+from .metrics import count, pipeline, scan_iter
+from bisect import bisect
+from hashlib import blake2b
+from redis.exceptions import WatchError
+from typing import Awaitable, Mapping, Optional, Sequence
+import asyncio
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def get_key_tag(key: str) -> str:
+    """Redis Cluster 와 같은 규칙으로 키의 hash tag (``{...}`` 안쪽), 없으면 키 전체"""
+    if (start := key.find("{")) != -1 and (end := key.find("}", start + 1)) > start + 1:
+        return key[start + 1:end]
+    return key
+
+
+class HashRing:
+    """consistent hashing ring
+
+    노드마다 ``replicas`` 개의 가상 노드를 두므로 노드를 추가 / 제거 하면
+    대략 ``1 / 노드 수`` 만큼의 hash tag 만 다른 노드로 옮겨짐
+
+    Args:
+        nodes: 노드 이름
+        replicas: 노드당 가상 노드 갯수
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 160):
+        if len(nodes) == 0:
+            raise ValueError("HashRing requires at least one node")
+        self.nodes = tuple(nodes)
+        self.replicas = replicas
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._positions = [i[0] for i in points]
+        self._nodes = [i[1] for i in points]
+
+    def get_node(self, tag: str) -> str:
+        return self._nodes[bisect(self._positions, _hash(tag)) % len(self._nodes)]
+
+
+class ShardedRedis:
+    """uid 의 hash tag 로 노드를 정하는 Client 묶음
+
+    Redis Cluster 없이 여러 primary 에 토큰을 나누어 저장할 때 ``rd`` 대신 사용
+
+    * 키 형식은 ``redis_cluster`` 와 같고 (``prefix/{tag}/...``), ``{tag}`` 로 노드를 정함
+    * 한 유저의 토큰 목록과 토큰은 항상 같은 노드에 있으므로 ``WATCH`` / Lua 를 그대로 사용
+    * ``add_shard`` / ``remove_shard`` 후 ``rebalance`` 가 끝날 때까지는
+      이전 노드를 ``get_previous_client`` 로 함께 조회
+
+    Args:
+        clients: 노드 이름 → Client, 이름이 ring 위치를 정하므로 주소가 바뀌어도 같은 이름을 사용
+        replicas: 노드당 가상 노드 갯수
+    """
+
+    def __init__(self, clients: Mapping[str, AsyncRedis], replicas: int = 160):
+        self.clients: dict[str, AsyncRedis] = dict(clients)
+        self.replicas = replicas
+        self.ring = HashRing(list(self.clients), replicas)
+        self.previous: Optional[HashRing] = None
+
+    @property
+    def rebalancing(self) -> bool:
+        return self.previous is not None
+
+    def get_client(self, key: str) -> AsyncRedis:
+        """``key`` 를 저장하는 노드 Client"""
+        return self.clients[self.ring.get_node(get_key_tag(key))]
+
+    def get_previous_client(self, key: str) -> Optional[AsyncRedis]:
+        """rebalance 중 ``key`` 가 아직 남아 있을 수 있는 이전 노드 Client, 옮겨지지 않는 키면 ``None``"""
+        if self.previous is None:
+            return None
+        tag = get_key_tag(key)
+        if (node := self.previous.get_node(tag)) == self.ring.get_node(tag):
+            return None
+        return self.clients[node]
+
+    def get_primary_clients(self) -> list[AsyncRedis]:
+        return list(self.clients.values())
+
+    def _reshard(self, nodes: list[str]) -> None:
+        if self.previous is not None:
+            raise RuntimeError("rebalance is in progress")
+        self.previous = self.ring
+        self.ring = HashRing(nodes, self.replicas)
+
+    def add_shard(self, name: str, client: AsyncRedis) -> None:
+        """노드 추가, 새 키는 바로 새 ring 으로 저장 되며 기존 키는 ``rebalance`` 로 옮김"""
+        if name in self.clients:
+            raise ValueError(f"shard already exists: {name}")
+        self.clients[name] = client
+        self._reshard([*self.ring.nodes, name])
+
+    def remove_shard(self, name: str) -> None:
+        """노드 제거, ``rebalance`` 가 끝나면 Client 목록에서 빠짐"""
+        if name not in self.ring.nodes:
+            raise ValueError(f"unknown shard: {name}")
+        self._reshard([i for i in self.ring.nodes if i != name])
+
+    def finish_rebalance(self) -> list[AsyncRedis]:
+        """이전 ring 을 버리고 제거 된 노드 Client 반환 (닫는 것은 호출한 쪽에서)"""
+        self.previous = None
+        removed = [self.clients.pop(i) for i in list(self.clients) if i not in self.ring.nodes]
+        return removed
+
+    async def aclose(self, close_connection_pool: bool = True) -> None:
+        for client in self.clients.values():
+            await client.aclose(close_connection_pool=close_connection_pool)
+
+
+async def _copy_keys(source: AsyncRedis, target: AsyncRedis, keys: list[str]) -> list[str]:
+    """``keys`` 를 ``target`` 에 복사하고 복사한 ``STRING`` / hash 키 반환
+
+    * 이미 ``target`` 에 있는 키는 rebalance 이후 새로 쓰인 것이므로 덮어쓰지 않음,
+      ``SET`` / hash 는 없는 값만 합치고 sorted set 은 더 큰 score 로 합치며 더 긴 만료 시간을 유지
+    """
+    async with pipeline(source, False) as pipe:
+        for key in keys:
+            _: Awaitable = pipe.type(key)
+            _: Awaitable = pipe.pttl(key)
+        res = await pipe.execute()
+    types, ttls = res[::2], res[1::2]
+
+    async with pipeline(source, False) as pipe:
+        for key, type_ in zip(keys, types):
+            if type_ == "set":
+                _: Awaitable = pipe.smembers(key)
+            elif type_ == "hash":
+                _: Awaitable = pipe.hgetall(key)
+            elif type_ == "zset":
+                _: Awaitable = pipe.zrange(key, 0, -1, withscores=True)
+            elif type_ == "string":
+                _: Awaitable = pipe.get(key)
+            else:
+                _: Awaitable = pipe.dump(key)
+        values = await pipe.execute()
+
+    async with pipeline(target, False) as pipe:
+        for key in keys:
+            _: Awaitable = pipe.pttl(key)
+        target_ttls = await pipe.execute()
+
+    copied: list[str] = []
+    async with pipeline(target, False) as pipe:
+        for key, type_, ttl, value, target_ttl in zip(keys, types, ttls, values, target_ttls):
+            if ttl == -2 or not value:
+                continue
+            if type_ in ("set", "hash", "zset"):
+                if type_ == "set":
+                    _: Awaitable = pipe.sadd(key, *value)
+                elif type_ == "zset":
+                    _: Awaitable = pipe.zadd(key, dict(value), gt=True)
+                else:
+                    for field, field_value in value.items():
+                        _: Awaitable = pipe.hsetnx(key, field, field_value)
+                    copied.append(key)
+                if target_ttl != -1 and (expire := max(ttl, target_ttl)) > 0:
+                    _: Awaitable = pipe.pexpire(key, expire)
+                elif ttl == -1:
+                    _: Awaitable = pipe.persist(key)
+            elif target_ttl == -2:
+                if type_ == "string":
+                    _: Awaitable = pipe.set(key, value, px=ttl if ttl > 0 else None)
+                else:
+                    _: Awaitable = pipe.restore(key, max(ttl, 0), value)
+                copied.append(key)
+        if len(pipe) != 0:
+            await pipe.execute()
+    return copied
+
+
+async def move_keys(source: AsyncRedis, target: AsyncRedis, keys: list[str]) -> None:
+    """``keys`` 를 ``target`` 으로 옮김
+
+    * ``rebalance`` 및 rebalance 중 이전 노드에 있는 토큰을 바로 옮길 때 사용
+    * 옮기는 동안 ``source`` 의 키가 바뀌면 (취소 등) 다시 옮기고,
+      그 사이 ``source`` 에서 사라진 토큰은 ``target`` 에서도 지움
+    """
+    copied: set[str] = set()
+    while True:
+        async with pipeline(source, True) as pipe:
+            await pipe.watch(*keys)
+            copied.update(await _copy_keys(source, target, keys))
+            pipe.multi()
+            _: Awaitable = pipe.delete(*keys)
+            try:
+                await pipe.execute()
+                return
+            except WatchError:
+                pass
+
+        async with pipeline(source, False) as pipe:
+            for key in copied:
+                _: Awaitable = pipe.exists(key)
+            exists = await pipe.execute() if len(copied) != 0 else []
+        if len(gone := [key for key, alive in zip(copied, exists) if not alive]) != 0:
+            count()
+            await target.delete(*gone)
+            copied.difference_update(gone)
+
+
+async def rebalance(
+        sharded: ShardedRedis,
+        match: str = "*{*}*",
+        batch_size: int = 100,
+        rate: Optional[float] = None,
+) -> int:
+    """``add_shard`` / ``remove_shard`` 후 노드가 바뀐 키를 새 노드로 옮기고 옮긴 키 갯수 반환
+
+    서비스 중에 실행 가능
+
+    * 새 키는 이미 새 노드에 쓰이고, 조회 / 취소는 끝날 때까지 이전 노드도 확인함
+    * 노드별로 ``SCAN`` 하며 ``batch_size`` 개씩 pipeline 으로 옮김
+    * ``rate`` 가 있으면 초당 ``rate`` 개의 키만 옮김
+    * 끝나면 ``finish_rebalance`` 를 호출, 제거 된 노드 Client 는 닫지 않음
+
+    Args:
+        sharded: ``add_shard`` / ``remove_shard`` 를 호출한 ``ShardedRedis``
+        match: 옮길 키 glob 패턴, 기본은 hash tag 가 있는 모든 키
+        batch_size: ``SCAN COUNT`` 및 한번에 옮길 키 갯수
+        rate: 초당 옮길 키 갯수, ``None`` 이면 제한 없음
+    """
+    if sharded.previous is None:
+        return 0
+    moved = 0
+    for name, source in list(sharded.clients.items()):
+        batches: dict[str, list[str]] = {}
+        async for key in scan_iter(source, match, batch_size):
+            if (node := sharded.ring.get_node(get_key_tag(key))) == name:
+                continue
+            (batch := batches.setdefault(node, [])).append(key)
+            if len(batch) >= batch_size:
+                await move_keys(source, sharded.clients[node], batch)
+                moved += len(batch)
+                batches[node] = []
+                if rate is not None:
+                    await asyncio.sleep(len(batch) / rate)
+        for node, batch in batches.items():
+            if len(batch) != 0:
+                await move_keys(source, sharded.clients[node], batch)
+                moved += len(batch)
+    sharded.finish_rebalance()
+    return moved
@@ -0,0 +1,85 @@
+from .typings import AsyncRedis, TokenExpire
+from typing import Awaitable, Iterable, Optional
+import asyncio
+
+
+class SlidingExpiration:
+    """토큰 사용 기록을 모아서 ``EXPIRE`` 를 주기적으로 한번에 보냄
+
+    * 같은 키는 한번만 갱신 됨
+    * 갱신은 최대 ``flush_interval`` 만큼 늦어짐
+    * ``max_pending`` 개가 쌓이면 주기를 기다리지 않고 보냄
+    * 보내지 못한 batch 는 버리고 ``failed`` 에 키 갯수, ``last_error`` 에 예외를 남김
+
+    Attributes:
+        flushed: 갱신을 보낸 키 갯수
+        failed: 오류로 갱신하지 못한 키 갯수
+        last_error: 마지막으로 갱신에 실패한 예외
+    """
+
+    def __init__(
+            self,
+            flush_interval: float = 5,
+            max_pending: int = 10000,
+            batch_size: int = 500,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending: dict[AsyncRedis, dict[str, TokenExpire]] = {}
+        self._pending_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self.flushed = 0
+        self.failed = 0
+        self.last_error: Optional[Exception] = None
+
+    def note(self, rd: AsyncRedis, keys: Iterable[str], expire: TokenExpire) -> None:
+        """``keys`` 의 만료 시간을 ``expire`` 로 갱신 하도록 기록"""
+        pending = self._pending.setdefault(rd, {})
+        for key in keys:
+            if key not in pending:
+                self._pending_count += 1
+            pending[key] = expire
+        if self._pending_count >= self.max_pending and self._flushing is None:
+            self._flushing = asyncio.ensure_future(self.flush())
+            self._flushing.add_done_callback(self._flush_done)
+
+    def _flush_done(self, _: asyncio.Future) -> None:
+        self._flushing = None
+
+    async def flush(self) -> None:
+        pending, self._pending, self._pending_count = self._pending, {}, 0
+        await asyncio.gather(*(self._flush_client(rd, keys) for rd, keys in pending.items()))
+
+    async def _flush_client(self, rd: AsyncRedis, keys: dict[str, TokenExpire]) -> None:
+        items = list(keys.items())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            try:
+                async with rd.pipeline(transaction=False) as pipe:
+                    for key, expire in batch:
+                        _: Awaitable = pipe.expire(key, expire)
+                    await pipe.execute()
+            except Exception as e:
+                # 연결 오류 등으로 실패한 batch 는 버리고 다음 batch 를 보냄
+                self.failed += len(batch)
+                self.last_error = e
+            else:
+                self.flushed += len(batch)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_forever())
+
+    async def aclose(self) -> None:
+        """주기 작업을 멈추고 남은 기록을 보냄"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
@@ -0,0 +1,759 @@
+from .typings import (
+    TokenLimit,
+    TokenKey,
+    UserTokenKey,
+    TokenExpire,
+    RawToken,
+    AsyncRedis,
+    AsyncPipeline,
+)
+from .codec import RawRecord, RawValue
+from .metrics import count, pipeline, transaction, scan_iter
+from .contention import WatchRetry
+from redis.commands.core import AsyncScript
+from redis.exceptions import WatchError
+from typing import (
+    Awaitable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+)
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import partial
+
+TokenKeyFactory = Callable[[], tuple[RawToken, TokenKey]]
+
+
+class RotateResult(IntEnum):
+    REUSED = -1
+    MISSING = 0
+    ROTATED = 1
+    COLLISION = 2
+
+
+@dataclass
+class TokenIssue:
+    """새로 등록할 토큰 한개"""
+    user_token_key: UserTokenKey
+    token_key: TokenKey
+    record: RawRecord
+    expire: TokenExpire
+    limit: Optional[TokenLimit]
+
+
+@dataclass
+class TokenRotation:
+    """refresh 토큰 교체 요청
+
+    Attributes:
+        token_key: 교체할 refresh 토큰 키
+        record: 조회한 레코드, 그 사이 바뀌었으면 교체하지 않음
+        used_key: 교체된 토큰의 사용 기록 키, 값은 family id
+        family_pointer_key: 교체할 토큰의 family id 키
+        family_prefix: family id 를 붙이면 family 의 토큰 키 목록
+        family: 교체할 토큰에 family 가 없을 때 사용할 id
+        access: 새 access 토큰
+        refresh: 새 refresh 토큰
+        refresh_family_pointer_key: 새 refresh 토큰의 family id 키
+        owner_prefix: 있으면 ``owner_prefix + 토큰 키`` 에 새 토큰의 유저 토큰 키를 기록
+        deleted: 저장소가 채우는 지운 키 목록, 교체한 토큰과 ``limit`` 때문에 지운 토큰,
+            ``REUSED`` 면 family 의 키 전부
+    """
+    token_key: TokenKey
+    record: RawRecord
+    used_key: str
+    family_pointer_key: str
+    family_prefix: str
+    family: str
+    access: TokenIssue
+    refresh: TokenIssue
+    refresh_family_pointer_key: str
+    owner_prefix: Optional[str] = None
+    deleted: list[TokenKey] = field(default_factory=list)
+
+
+class TokenStore(ABC):
+    """토큰 저장소
+
+    ``TokenBaseMixin`` 은 키와 인코딩 된 레코드만 넘기고 저장 방식은 저장소가 정함
+
+    * 유저 토큰 키 (``UserTokenKey``) 는 해당 유저의 토큰 키 목록
+    * 토큰 키 (``TokenKey``) 는 인코딩 된 토큰 레코드
+    * 남은 시간은 Redis ``TTL`` 과 같이 초 단위, 키가 없으면 ``-2``
+    """
+
+    @abstractmethod
+    async def cleanup(self, user_token_key: UserTokenKey, limit: Optional[TokenLimit], prune: bool = True) -> list[TokenKey]:
+        """만료 된 토큰을 목록에서 지우고 ``limit`` 이 있으면 새 토큰 한개가 들어갈 자리를 만듦
+
+        * 남은 시간이 짧은 토큰부터 지움 (만료 된 토큰이 먼저 지워짐)
+        * ``prune`` 이 ``False`` 면 만료 된 토큰 정리는 ``prune`` method 에 맡김
+
+        Returns:
+            ``limit`` 때문에 지운 토큰 키 목록
+        """
+
+    @abstractmethod
+    async def prune(self, user_token_keys: Sequence[UserTokenKey]) -> int:
+        """유저 토큰 목록에서 만료 된 토큰 키를 지우고 지운 갯수 반환"""
+
+    @abstractmethod
+    async def add(
+            self,
+            user_token_key: UserTokenKey,
+            make_token_key: TokenKeyFactory,
+            record: RawRecord,
+            expire: TokenExpire,
+            unique: bool = False,
+            owner_prefix: Optional[str] = None,
+    ) -> tuple[RawToken, TokenKey, int]:
+        """토큰 등록
+
+        Args:
+            user_token_key: 유저 토큰 키
+            make_token_key: 겹치지 않는 키가 나올 때 까지 호출 됨
+            record: 인코딩 된 토큰, ``Mapping`` 이면 hash 로 저장
+            expire: 만료 시간
+            unique: ``make_token_key`` 가 항상 새 키를 만들면 ``True``, 중복 확인을 생략
+            owner_prefix: 있으면 ``owner_prefix + 토큰 키`` 에 유저 토큰 키를 기록 (keyspace notification 정리 용),
+                토큰 만료 후 ``OWNER_EXPIRE_GRACE`` 초 뒤에 사라짐
+
+        Returns:
+            ``(RawToken, TokenKey, 남은 시간)``
+        """
+
+    @abstractmethod
+    async def get_with_ttl(self, token_keys: Sequence[TokenKey]) -> list[tuple[Optional[RawRecord], int]]:
+        """토큰 키 별 ``(레코드, 남은 시간)``, 없으면 ``(None, -2)``"""
+
+    async def get_fields(
+            self,
+            token_keys: Sequence[TokenKey],
+            fields: Sequence[str],
+    ) -> list[tuple[Optional[list[Optional[RawValue]]], int]]:
+        """hash 레코드에서 ``fields`` 만 읽은 ``(필드 값 목록, 남은 시간)``, 없으면 ``(None, -2)``"""
+        return [
+            (None, ttl) if record is None else ([record.get(i) for i in fields], ttl)
+            for record, ttl in await self.get_with_ttl(token_keys)
+        ]
+
+    @abstractmethod
+    async def list_user(self, user_token_key: UserTokenKey) -> list[tuple[TokenKey, RawRecord, int]]:
+        """유저의 살아있는 토큰 ``(토큰 키, 레코드, 남은 시간)`` 목록"""
+
+    @abstractmethod
+    async def abort(self, user_token_key: UserTokenKey, token_keys: Optional[Sequence[TokenKey]] = None) -> None:
+        """유저의 토큰 취소, ``token_keys`` 가 없으면 전부"""
+
+    @abstractmethod
+    async def delete(self, token_keys: Sequence[TokenKey]) -> None:
+        """토큰 키 삭제"""
+
+    @abstractmethod
+    async def expire(self, keys: Sequence[str], expire: TokenExpire) -> None:
+        """있는 키의 만료 시간을 ``expire`` 로 변경"""
+
+    @abstractmethod
+    def scan_user_keys(self, match: str, count: int) -> AsyncIterator[UserTokenKey]:
+        """glob 패턴에 맞는 유저 토큰 키, 중복 될 수 있음"""
+
+    @abstractmethod
+    async def rotate(self, rotation: TokenRotation) -> RotateResult:
+        """refresh 토큰을 지우고 새 access / refresh 토큰을 한번에 등록
+
+        * 이미 교체된 토큰이면 family 의 토큰을 모두 지우고 ``REUSED``
+        * 새 토큰 키가 이미 있으면 아무것도 하지 않고 ``COLLISION``
+        * 지운 키는 ``rotation.deleted`` 에 추가
+        """
+
+    @abstractmethod
+    async def revoke_reused(self, used_key: str, family_prefix: str, deleted: Optional[list[TokenKey]] = None) -> bool:
+        """이미 교체된 토큰이면 family 의 토큰을 모두 지우고 ``True``, 지운 키는 ``deleted`` 에 추가"""
+
+
+OWNER_EXPIRE_GRACE = 60
+"""
+토큰 주인 기록이 토큰보다 늦게 사라지는 시간 (초), 만료 notification 을 처리할 때까지 남아 있도록 함
+"""
+
+
+def write_owner(
+        pipe: AsyncPipeline,
+        owner_prefix: str,
+        token_key: TokenKey,
+        user_token_key: UserTokenKey,
+        expire: TokenExpire,
+        nx: bool = False,
+) -> None:
+    """``owner_prefix + token_key`` 에 토큰의 유저 토큰 키를 토큰 만료 + ``OWNER_EXPIRE_GRACE`` 동안 기록"""
+    _: Awaitable = pipe.set(owner_prefix + token_key, user_token_key, ex=expire + OWNER_EXPIRE_GRACE, nx=nx)
+
+
+def _decode_key(key: str | bytes) -> str:
+    """``decode_responses=False`` 인 client 가 돌려준 ``bytes`` 키를 ``str`` 로"""
+    return key.decode() if isinstance(key, bytes) else key
+
+
+def _decode_keys(keys: Iterable[str | bytes]) -> list[str]:
+    return [_decode_key(i) for i in keys]
+
+
+def _decode_record(record: Optional[RawRecord]) -> Optional[RawRecord]:
+    """hash 레코드의 ``bytes`` 필드 이름을 ``str`` 로, 값은 codec 이 그대로 읽음"""
+    if isinstance(record, Mapping):
+        return {_decode_key(k): v for k, v in record.items()} or None
+    return record or None
+
+
+def _write_record(pipe: AsyncPipeline, key: TokenKey, record: RawRecord, expire: TokenExpire) -> None:
+    """``record`` 가 ``Mapping`` 이면 hash, 아니면 ``STRING`` 으로 기록"""
+    if isinstance(record, Mapping):
+        _: Awaitable = pipe.hset(key, mapping=record)
+        _: Awaitable = pipe.expire(key, expire)
+    else:
+        _: Awaitable = pipe.set(key, record, ex=expire)
+
+
+class TransactionCore:
+    """토큰 키를 다루는 ``WATCH`` transaction
+
+    * ``decode_responses=False`` 인 client 에서도 키는 ``str`` 로 다루고 돌려줌
+    """
+
+    @staticmethod
+    async def _manage_user_token_transaction(pipe: AsyncPipeline, key: UserTokenKey):
+        """
+        ``Redis`` 내 토큰 관리
+
+        만료 된 토큰은 ``UserTokenList`` 에서 삭제 함
+        """
+        if len((tokens := await pipe.smembers(key))) == 0:
+            return
+        await pipe.watch(*tokens)
+
+        async def _gen():
+            for i in tokens:
+                yield i, await pipe.exists(i)
+
+        tokens_for_delete = [i[0] async for i in _gen() if i[1] == 0]
+        if len(tokens_for_delete) == 0:
+            return
+        pipe.multi()
+        await pipe.srem(key, *tokens_for_delete)
+
+    @staticmethod
+    async def _manage_user_token_count_transaction(
+            pipe: AsyncPipeline,
+            key: UserTokenKey,
+            limit: TokenLimit
+    ) -> list[TokenKey]:
+        """``Redis`` 내에 토큰 갯수 관리, 지운 토큰 키 반환
+        """
+        if len((tokens := _decode_keys(await pipe.smembers(key)))) == 0:
+            return []
+        await pipe.watch(*tokens)
+        token_count = len(tokens)
+
+        if token_count >= limit:
+            delete_count = token_count - limit + 1
+            delete_tokens = [(i, await pipe.ttl(i)) for i in tokens]
+            delete_tokens.sort(key=lambda x: x[1])
+            delete_tokens = delete_tokens[:delete_count]
+            pipe.multi()
+            _: Awaitable = pipe.delete(*(d := [i[0] for i in delete_tokens]))
+            _: Awaitable = pipe.srem(key, *d)
+            return d
+        return []
+
+    @staticmethod
+    async def _add_token_transaction(
+            pipe: AsyncPipeline,
+            user_token_key: UserTokenKey,
+            token_key: TokenKey,
+            record: RawRecord,
+            token_expire: TokenExpire,
+            owner_prefix: Optional[str] = None,
+    ) -> bool:
+        """``Redis`` 내에 토큰 등록
+        """
+        if await pipe.sismember(user_token_key, token_key) == 1:
+            pipe.multi()
+            _write_record(pipe, token_key, record, token_expire)
+            if owner_prefix is not None:
+                write_owner(pipe, owner_prefix, token_key, user_token_key, token_expire)
+            return True
+        else:
+            return False
+
+    @staticmethod
+    async def _get_record_transaction(
+            pipe: AsyncPipeline,
+            key: TokenKey,
+            hashed: bool = False,
+    ) -> tuple[Optional[RawRecord], int]:
+        """``Redis`` 에서 토큰 레코드 가져오기
+        """
+        if not (record := _decode_record(await (pipe.hgetall(key) if hashed else pipe.get(key)))):
+            await pipe.unwatch()
+            return None, -2
+        return record, await pipe.ttl(key)
+
+    @staticmethod
+    async def _get_user_records_transaction(
+            pipe: AsyncPipeline,
+            key: UserTokenKey,
+            hashed: bool = False,
+    ) -> list[tuple[TokenKey, RawRecord, int]]:
+        """``Redis`` 에서 특정 유저의 토큰 레코드 가져오기
+        """
+        tokens = _decode_keys(await pipe.smembers(key))
+        if len(tokens) == 0:
+            return []
+
+        await pipe.watch(*tokens)
+        return [
+            (i, record, await pipe.ttl(i))
+            for i in tokens if (record := _decode_record(await (pipe.hgetall(i) if hashed else pipe.get(i))))
+        ]
+
+    @staticmethod
+    async def _abort_user_token_transaction(
+            pipe: AsyncPipeline,
+            key: UserTokenKey,
+            token_keys: Sequence[TokenKey] | None = None
+    ) -> None:
+        """``Redis`` 에서 특정 유저의 토큰을 취소
+        """
+        tokens = set(_decode_keys(await pipe.smembers(key)))
+        if len(tokens) == 0:
+            return
+
+        if token_keys is None or len(token_keys) == 0:
+            tokens_for_delete = list(tokens)
+        else:
+            tokens_for_delete = [i for i in token_keys if i in tokens]
+
+        if len(tokens_for_delete) == 0:
+            return
+
+        pipe.multi()
+        _: Awaitable = pipe.srem(key, *tokens_for_delete)
+        _: Awaitable = pipe.delete(*tokens_for_delete)
+
+
+_RETRY = 3
+"""
+script 를 부르기 전에 읽은 family id 가 바뀌었을 때 script 의 반환 값, 다시 읽고 실행
+"""
+
+# family 키도 KEYS 로 받도록 family id 는 script 전에 읽어서 ``expected`` 로 넘기고 script 안에서 확인
+# script 는 ``{결과, 지운 키...}`` 를 돌려줌
+_REVOKE_FAMILY_LUA = f"local RETRY = {_RETRY}\n" + """
+local deleted = {}
+
+local function finish(result)
+    local reply = {result}
+    for i = 1, #deleted do
+        reply[i + 1] = deleted[i]
+    end
+    return reply
+end
+
+local function revoke_family(used_key, family_key, expected)
+    local family = redis.call('GET', used_key)
+    if not family then
+        return 0
+    end
+    if family ~= expected then
+        return RETRY
+    end
+    local members = redis.call('SMEMBERS', family_key)
+    for i = 1, #members, 500 do
+        redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for i = 1, #members do
+        deleted[#deleted + 1] = members[i]
+    end
+    redis.call('DEL', family_key)
+    return -1
+end
+"""
+
+REVOKE_REUSED_LUA = _REVOKE_FAMILY_LUA + """
+return finish(revoke_family(KEYS[1], KEYS[2], ARGV[1]))
+"""
+
+ROTATE_LUA = _REVOKE_FAMILY_LUA + f"local OWNER_EXPIRE_GRACE = {OWNER_EXPIRE_GRACE}\n" + """
+local function write_record(key, record, expire)
+    if type(record) == 'table' then
+        redis.call('HSET', key, unpack(record))
+        redis.call('EXPIRE', key, expire)
+    else
+        redis.call('SET', key, record, 'EX', expire)
+    end
+end
+
+local function same_record(key, record)
+    if type(record) ~= 'table' then
+        return redis.call('GET', key) == record
+    end
+    if redis.call('HLEN', key) * 2 ~= #record then
+        return false
+    end
+    for i = 1, #record, 2 do
+        if redis.call('HGET', key, record[i]) ~= record[i + 1] then
+            return false
+        end
+    end
+    return true
+end
+
+local function issue(user_key, token_key, record, expire, limit)
+    local alive = {}
+    for _, key in ipairs(redis.call('SMEMBERS', user_key)) do
+        local ttl = redis.call('TTL', key)
+        if ttl == -2 then
+            redis.call('SREM', user_key, key)
+        else
+            alive[#alive + 1] = {key, ttl}
+        end
+    end
+    if limit > 0 and #alive >= limit then
+        table.sort(alive, function(a, b) return a[2] < b[2] end)
+        for i = 1, #alive - limit + 1 do
+            redis.call('DEL', alive[i][1])
+            redis.call('SREM', user_key, alive[i][1])
+            deleted[#deleted + 1] = alive[i][1]
+        end
+    end
+    write_record(token_key, record, expire)
+    redis.call('SADD', user_key, token_key)
+    redis.call('EXPIRE', user_key, expire)
+end
+
+-- hash 레코드는 ARGV[11] 부터 (필드 갯수 * 2, 필드, 값, ...) 로 이전 / access / refresh 순서
+local old, access, refresh = ARGV[2], ARGV[4], ARGV[8]
+if ARGV[11] then
+    local records, offset = {}, 11
+    for n = 1, 3 do
+        local size = tonumber(ARGV[offset])
+        records[n] = {unpack(ARGV, offset + 1, offset + size)}
+        offset = offset + size + 1
+    end
+    old, access, refresh = records[1], records[2], records[3]
+end
+
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return finish(revoke_family(KEYS[2], KEYS[10], ARGV[10]))
+end
+if not same_record(KEYS[1], old) then
+    return finish(0)
+end
+if redis.call('EXISTS', KEYS[6], KEYS[8]) > 0 then
+    return finish(2)
+end
+
+local family = redis.call('GET', KEYS[3]) or ''
+if family ~= ARGV[1] then
+    return finish(RETRY)
+end
+if family == '' then
+    family = ARGV[3]
+end
+local family_key = KEYS[9]
+local refresh_expire = tonumber(ARGV[7])
+redis.call('DEL', KEYS[1], KEYS[3])
+deleted[#deleted + 1] = KEYS[1]
+redis.call('SREM', KEYS[7], KEYS[1])
+redis.call('SREM', family_key, KEYS[1], KEYS[3])
+redis.call('SET', KEYS[2], family, 'EX', refresh_expire)
+
+issue(KEYS[5], KEYS[6], access, tonumber(ARGV[5]), tonumber(ARGV[6]))
+issue(KEYS[7], KEYS[8], refresh, refresh_expire, tonumber(ARGV[9]))
+redis.call('SET', KEYS[4], family, 'EX', refresh_expire)
+redis.call('SADD', family_key, KEYS[6], KEYS[8], KEYS[4])
+if KEYS[11] then
+    redis.call('SET', KEYS[11], KEYS[5], 'EX', tonumber(ARGV[5]) + OWNER_EXPIRE_GRACE)
+    redis.call('SET', KEYS[12], KEYS[7], 'EX', refresh_expire + OWNER_EXPIRE_GRACE)
+end
+if redis.call('TTL', family_key) < refresh_expire then
+    redis.call('EXPIRE', family_key, refresh_expire)
+end
+return finish(1)
+"""
+
+# Client 마다 다시 만들지 않도록 한번만 만들고 호출할 때 Client 를 넘김
+_ROTATE_SCRIPT = AsyncScript(None, ROTATE_LUA.encode())
+_REVOKE_REUSED_SCRIPT = AsyncScript(None, REVOKE_REUSED_LUA.encode())
+
+
+class RedisTokenStore(TokenStore, TransactionCore):
+    """Redis 저장소
+
+    * 유저 토큰 키는 ``SET``, 토큰 키는 ``STRING`` (``hashed`` 면 hash)
+    * 쓰기는 ``WATCH`` transaction 으로 처리
+    * ``rotate`` 는 family id 를 읽은 뒤 Lua script 한번으로 처리, 모든 키를 ``KEYS`` 로 넘기므로
+      Redis Cluster 에서는 토큰 / 유저 토큰 / family 키가 같은 hash tag 를 사용해야 함
+    * ``decode_responses`` 와 관계없이 사용할 수 있음, 돌려주는 키와 hash 필드 이름은 항상 ``str``
+
+    Args:
+        rd: Async Redis Client
+        watch_reads: ``True`` 면 조회도 ``WATCH`` transaction 사용,
+            아니면 ``WATCH`` 없이 조회 (토큰은 ``MULTI/EXEC`` 한번, 유저 토큰 목록은 pipeline 두번),
+            replica 에서 조회할 때는 ``False``
+        retry: ``WatchError`` 재시도 정책, 없으면 redis-py 처럼 계속 재시도
+        hashed: 레코드를 hash 로 읽음 (``HashTokenCodec``)
+    """
+
+    def __init__(
+            self,
+            rd: AsyncRedis,
+            watch_reads: bool = False,
+            retry: Optional[WatchRetry] = None,
+            hashed: bool = False,
+    ):
+        self.rd = rd
+        self.watch_reads = watch_reads
+        self.retry = retry
+        self.hashed = hashed
+
+    async def cleanup(self, user_token_key: UserTokenKey, limit: Optional[TokenLimit], prune: bool = True) -> list[TokenKey]:
+        if prune:
+            await transaction(
+                self.rd,
+                partial(self._manage_user_token_transaction, key=user_token_key),
+                user_token_key,
+                retry=self.retry,
+            )
+        if limit is None:
+            return []
+        return await transaction(
+            self.rd,
+            partial(self._manage_user_token_count_transaction, key=user_token_key, limit=limit),
+            user_token_key,
+            value_from_callable=True,
+            retry=self.retry,
+        )
+
+    async def prune(self, user_token_keys: Sequence[UserTokenKey]) -> int:
+        async with pipeline(self.rd, False) as pipe:
+            for key in user_token_keys:
+                _: Awaitable = pipe.smembers(key)
+            members = [(key, token_key) for key, tokens in zip(user_token_keys, await pipe.execute()) for token_key in tokens]
+        if len(members) == 0:
+            return 0
+
+        async with pipeline(self.rd, False) as pipe:
+            for _, token_key in members:
+                _: Awaitable = pipe.exists(token_key)
+            exists = await pipe.execute()
+        dead: dict[UserTokenKey, list[TokenKey]] = {}
+        for (key, token_key), alive in zip(members, exists):
+            if alive == 0:
+                dead.setdefault(key, []).append(token_key)
+        if len(dead) == 0:
+            return 0
+
+        # 토큰 키는 다시 쓰이지 않으므로 WATCH 없이 지워도 됨
+        async with pipeline(self.rd, False) as pipe:
+            for key, token_keys in dead.items():
+                _: Awaitable = pipe.srem(key, *token_keys)
+            await pipe.execute()
+        return sum(len(i) for i in dead.values())
+
+    async def _register_token(
+            self,
+            user_token_key: UserTokenKey,
+            make_token_key: TokenKeyFactory,
+            expire: TokenExpire,
+    ) -> tuple[RawToken, TokenKey]:
+        """유저 토큰 목록에 겹치지 않는 토큰 키 등록"""
+        count()
+        while await self.rd.sadd(user_token_key, (result := make_token_key())[1]) == 0:
+            count()
+        count()
+        await self.rd.expire(user_token_key, expire)
+        return result
+
+    async def add(
+            self,
+            user_token_key: UserTokenKey,
+            make_token_key: TokenKeyFactory,
+            record: bytes,
+            expire: TokenExpire,
+            unique: bool = False,
+            owner_prefix: Optional[str] = None,
+    ) -> tuple[RawToken, TokenKey, int]:
+        if unique:
+            raw_token, token_key = make_token_key()
+            async with pipeline(self.rd, True) as pipe:
+                _: Awaitable = pipe.sadd(user_token_key, token_key)
+                _: Awaitable = pipe.expire(user_token_key, expire)
+                _write_record(pipe, token_key, record, expire)
+                if owner_prefix is not None:
+                    write_owner(pipe, owner_prefix, token_key, user_token_key, expire)
+                await pipe.execute()
+            return raw_token, token_key, expire
+        attempt = 0
+        while not await transaction(
+                self.rd,
+                partial(
+                    self._add_token_transaction,
+                    user_token_key=user_token_key,
+                    token_key=(result := await self._register_token(user_token_key, make_token_key, expire))[1],
+                    record=record,
+                    token_expire=expire,
+                    owner_prefix=owner_prefix,
+                ),
+                *(user_token_key, result[1]),
+                value_from_callable=True,
+                retry=self.retry,
+        ):
+            # 등록한 토큰 키가 동시에 발급 된 다른 토큰에 의해 밀려남
+            attempt += 1
+            if self.retry is not None and not await self.retry.backoff(attempt):
+                raise WatchError(f"{user_token_key} registration retried {attempt} times")
+        return result[0], result[1], expire
+
+    async def get_with_ttl(self, token_keys: Sequence[TokenKey]) -> list[tuple[Optional[RawRecord], int]]:
+        if self.watch_reads:
+            return [
+                await transaction(
+                    self.rd,
+                    partial(self._get_record_transaction, key=key, hashed=self.hashed),
+                    key,
+                    value_from_callable=True,
+                    retry=self.retry,
+                )
+                for key in token_keys
+            ]
+        async with pipeline(self.rd, True) as pipe:
+            for key in token_keys:
+                _: Awaitable = pipe.hgetall(key) if self.hashed else pipe.get(key)
+                _: Awaitable = pipe.ttl(key)
+            res = await pipe.execute()
+        return [(_decode_record(record), ttl) for record, ttl in zip(res[::2], res[1::2])]
+
+    async def get_fields(
+            self,
+            token_keys: Sequence[TokenKey],
+            fields: Sequence[str],
+    ) -> list[tuple[Optional[list[Optional[RawValue]]], int]]:
+        if not self.hashed:
+            return await super().get_fields(token_keys, fields)
+        async with pipeline(self.rd, True) as pipe:
+            for key in token_keys:
+                _: Awaitable = pipe.hmget(key, fields)
+                _: Awaitable = pipe.ttl(key)
+            res = await pipe.execute()
+        return [(None if ttl == -2 else values, ttl) for values, ttl in zip(res[::2], res[1::2])]
+
+    async def list_user(self, user_token_key: UserTokenKey) -> list[tuple[TokenKey, RawRecord, int]]:
+        if not self.watch_reads:
+            count()
+            if len(tokens := _decode_keys(await self.rd.smembers(user_token_key))) == 0:
+                return []
+            async with pipeline(self.rd, False) as pipe:
+                for key in tokens:
+                    _: Awaitable = pipe.hgetall(key) if self.hashed else pipe.get(key)
+                    _: Awaitable = pipe.ttl(key)
+                res = await pipe.execute()
+            return [
+                (key, record, ttl)
+                for key, record, ttl in zip(tokens, map(_decode_record, res[::2]), res[1::2]) if record
+            ]
+        return await transaction(
+            self.rd,
+            partial(self._get_user_records_transaction, key=user_token_key, hashed=self.hashed),
+            user_token_key,
+            value_from_callable=True,
+            retry=self.retry,
+        )
+
+    async def abort(self, user_token_key: UserTokenKey, token_keys: Optional[Sequence[TokenKey]] = None) -> None:
+        await transaction(
+            self.rd,
+            partial(self._abort_user_token_transaction, key=user_token_key, token_keys=token_keys),
+            user_token_key,
+            retry=self.retry,
+        )
+
+    async def delete(self, token_keys: Sequence[TokenKey]) -> None:
+        count()
+        await self.rd.delete(*token_keys)
+
+    async def expire(self, keys: Sequence[str], expire: TokenExpire) -> None:
+        async with pipeline(self.rd, False) as pipe:
+            for key in keys:
+                _: Awaitable = pipe.expire(key, expire)
+            await pipe.execute()
+
+    async def scan_user_keys(self, match: str, count: int) -> AsyncIterator[UserTokenKey]:
+        async for key in scan_iter(self.rd, match, count):
+            yield UserTokenKey(_decode_key(key))
+
+    @staticmethod
+    def _flatten_records(*records: RawRecord) -> list[RawValue]:
+        """hash 레코드를 Lua 인자 ``(필드 갯수 * 2, 필드, 값, ...)`` 로 나열"""
+        args: list[RawValue] = []
+        for record in records:
+            args.append(len(record) * 2)
+            for item in record.items():
+                args.extend(item)
+        return args
+
+    async def rotate(self, rotation: TokenRotation) -> RotateResult:
+        hashed = isinstance(rotation.access.record, Mapping)
+        while True:
+            count()
+            family, used_family = map(_decode_key, await self.rd.mget(rotation.family_pointer_key, rotation.used_key))
+            count()
+            result = await _ROTATE_SCRIPT(keys=[
+                rotation.token_key,
+                rotation.used_key,
+                rotation.family_pointer_key,
+                rotation.refresh_family_pointer_key,
+                rotation.access.user_token_key,
+                rotation.access.token_key,
+                rotation.refresh.user_token_key,
+                rotation.refresh.token_key,
+                rotation.family_prefix + (family or rotation.family),
+                rotation.family_prefix + (used_family or ""),
+                *(() if rotation.owner_prefix is None else (
+                    rotation.owner_prefix + rotation.access.token_key,
+                    rotation.owner_prefix + rotation.refresh.token_key,
+                )),
+            ], args=[
+                family or "",
+                "" if hashed else rotation.record,
+                rotation.family,
+                "" if hashed else rotation.access.record,
+                rotation.access.expire,
+                rotation.access.limit or 0,
+                rotation.refresh.expire,
+                "" if hashed else rotation.refresh.record,
+                rotation.refresh.limit or 0,
+                used_family or "",
+                *(self._flatten_records(rotation.record, rotation.access.record, rotation.refresh.record) if hashed else ()),
+            ], client=self.rd)
+            if result[0] != _RETRY:
+                rotation.deleted.extend(_decode_keys(result[1:]))
+                return RotateResult(result[0])
+
+    async def revoke_reused(self, used_key: str, family_prefix: str, deleted: Optional[list[TokenKey]] = None) -> bool:
+        while True:
+            count()
+            if (family := await self.rd.get(used_key)) is None:
+                return False
+            family = _decode_key(family)
+            count()
+            result = await _REVOKE_REUSED_SCRIPT(keys=[used_key, family_prefix + family], args=[family], client=self.rd)
+            if result[0] != _RETRY:
+                if deleted is not None:
+                    deleted.extend(_decode_keys(result[1:]))
+                return result[0] == -1
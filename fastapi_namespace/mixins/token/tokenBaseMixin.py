@@ -16,7 +16,11 @@ from .typings import (
     AsyncPipeline,
     TokenPayload,
     Token,
-TokenInfo
+    TokenInfo,
+    BulkAbortProgress,
+    TokenReuseError,
+    SessionOrder,
+    SessionPage,
 )
 from typing import (
     Callable,
@@ -29,15 +33,37 @@ from typing import (
     Iterable,
     Coroutine,
     Any,
-    Optional
+    Optional,
+    Sequence,
+    AsyncIterator,
 )
 from abc import abstractmethod
 import asyncio
 from functools import partial
-from orjson import dumps as _dumps, loads
+from inspect import isawaitable
+from time import time
+from uuid import uuid4
+from weakref import WeakKeyDictionary, proxy
+from .codec import TokenCodec, BinaryTokenCodec, RawRecord, TokenFields, project_token
 from .sercurity.base import SecurityBase
+from ...loader import DataLoader, get_request_loader
+from .pool import TokenConnectionPool, create_token_redis_client
+from .cluster import ClusterNodeClients, get_hash_tag
+from .sharding import ShardedRedis, move_keys, get_key_tag
+from .replica import ReplicaSet
+from .cache import NegativeTokenCache, SharedTokenCache
+from .sessions import SESSION_SCORE_STEP, Score, read_index_page
+from .sliding import SlidingExpiration
+from .reaper import TokenReaper
+from .notifications import TokenIndexSubscriber
+from .contention import KeyedLock, WatchRetry
+from .store import TokenStore, RedisTokenStore, TransactionCore, TokenIssue, TokenRotation, RotateResult, OWNER_EXPIRE_GRACE, write_owner
+from .metrics import TokenMetricsExporter, measure, pipeline, scan_iter, count_negative_cache_hit, count_shared_cache_hit
+from contextlib import asynccontextmanager, nullcontext
+from fastapi import Request, Security, Depends, HTTPException
+from starlette.status import HTTP_401_UNAUTHORIZED
 from typing import Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 
 
 
@@ -54,182 +80,416 @@ TokenInfoValidator = _validator
 # CallableTokenInfo = Callable[..., TI]
 CallableToken = type[T]
 CallableTokenInfo = type[TI]
+TokenDecoder = Callable[[Optional[RawRecord]], Optional[T]]
+_MISSING = object()
 
-def dumps(data):
-    print(data, 'werwer')
-    return _dumps(asdict(data))
 
 
 
+class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
+    access_token_limit: Optional[TokenLimit] | None = 1
+    refresh_token_limit: Optional[TokenLimit] | None = 1
+    access_token_expire: Optional[TokenExpire] = 3600
+    refresh_token_expire: Optional[TokenExpire] = 129600
+    user_access_token_key: Optional[str] = 'user_access_token'
+    user_refresh_token_key: Optional[str] = 'user_refresh_token'
+    access_token_key: Optional[str] = 'access_token'
+    refresh_token_key: Optional[str] = 'refresh_token'
+    refresh_token_used_key: str = 'refresh_token_used'
+    refresh_token_family_key: str = 'refresh_token_family'
+    token_family_key: str = 'token_family'
+    security_route: Optional[list[MethodType]] = []
+    security_class: Optional[SecurityBase] = None
+    security_redis_dependency: Optional[Callable[..., Any]] = None
+    security_state_key: str = "token_info"
+    bulk_chunk_size: int = 500
+    redis_url: Optional[str] = None
+    redis_max_connections: int = 50
+    redis_pool_timeout: Optional[float] = 20
+    redis_health_check_interval: int = 30
+    redis_idle_timeout: Optional[float] = 300
+    redis_min_idle: int = 0
+    redis_warm_up: int = 0
+    token_codec: TokenCodec = BinaryTokenCodec()
+    token_read_pipelined: bool = True
+    redis_cluster: bool = False
+    cluster_tag_length: int = 8
+    redis_sharded: bool = False
+    redis_shard_urls: Optional[dict[str, str]] = None
+    shard_replicas: int = 160
+    redis_replica_urls: Optional[list[str]] = None
+    replica_max_lag: float = 1
+    replica_check_interval: float = 0.5
+    negative_cache: bool = False
+    negative_cache_size: int = 10000
+    negative_cache_ttl: float = 5
+    shared_cache_path: Optional[str] = None
+    shared_cache_slots: int = 65536
+    shared_cache_slot_size: int = 256
+    shared_cache_ttl: float = 1
+    _shared_cache_codec: TokenCodec = BinaryTokenCodec()
+    session_index: bool = False
+    session_expiry_index_key: str = 'session_expiry_index'
+    session_issued_index_key: str = 'session_issued_index'
+    token_store: Optional[TokenStore] = None
+    sliding_expiration: bool = False
+    sliding_flush_interval: float = 5
+    sliding_max_pending: int = 10000
+    token_metrics: Optional[TokenMetricsExporter] = None
+    _unique_raw_tokens: bool = False
+    token_reaper: bool = False
+    reaper_interval: float = 60
+    reaper_batch_size: int = 100
+    reaper_rate: Optional[float] = 1000
+    token_index_subscriber: bool = False
+    token_owner_key: str = 'token_owner'
+    subscriber_batch_size: int = 100
+    subscriber_flush_interval: float = 1
+    subscriber_configure: bool = False
+    serialize_issuance: bool = True
+    watch_retry: Optional[WatchRetry] = WatchRetry()
 
-class TransactionCore:
-    @staticmethod
-    async def _manage_user_token_transaction(pipe: AsyncPipeline, key: UserTokenKey):
-        """
-        ``Redis`` 내 토큰 관리
+    def __init__(
+            self,
+            token: type[T],
+            token_info: type[TI],
+            token_validator: TokenValidator,
+            token_info_validator: TokenInfoValidator
+    ):
+        self._Token = token
+        self._TokenInfo = token_info
+        self._token_validator = token_validator
+        self._token_info_validator = token_info_validator
 
-        만료 된 토큰은 ``UserTokenList`` 에서 삭제 함
-        """
-        if len((tokens := await pipe.smembers(key))) == 0:
-            return
-        await pipe.watch(*tokens)
+        if self.token_reaper and self.session_index and self.token_store is None:
+            # 세션 index 정리는 인스턴스 method 이므로 인스턴스가 생길 때 reaper 에 연결
+            async def trim() -> int:
+                return await self.trim_session_index(self.get_shared_redis_client())
 
-        async def _gen():
-            for i in tokens:
-                yield i, await pipe.exists(i)
+            type(self).get_token_reaper().trim = trim
 
-        tokens_for_delete = [i[0] async for i in _gen() if i[1] == 0]
-        if len(tokens_for_delete) == 0:
-            return
-        pipe.multi()
-        await pipe.srem(key, *tokens_for_delete)
+        if self.security_class is not None:
+            security_dependency = Depends(self.get_security_dependency())
+            for method in self.security_route:
+                self._add_depends(method, security_dependency)
 
-    @staticmethod
-    async def _manage_user_token_count_transaction(
-            pipe: AsyncPipeline,
-            key: UserTokenKey,
-            limit: TokenLimit
-    ) -> None:
-        """``Redis`` 내에 토큰 갯수 관리
+    @classmethod
+    def get_shared_redis_client(cls) -> AsyncRedis:
+        """class 에 설정된 ``redis_url`` 로 만든 공유 Redis Client
+
+        * 같은 class 의 인스턴스는 하나의 ``TokenConnectionPool`` 을 공유
+        * handler 에서 ``Depends`` 없이 ``self.redis`` 로 사용
+        * ``redis_shard_urls`` 가 있으면 노드별 pool 을 가진 ``ShardedRedis``
         """
-        if len((tokens := await pipe.smembers(key))) == 0:
-            return
-        await pipe.watch(*tokens)
-        token_count = len(tokens)
-
-        if token_count >= limit:
-            delete_count = limit - token_count + 1  # 무조건 음수
-            delete_tokens = [(i, await pipe.ttl(i)) for i in tokens]
-            delete_tokens.sort(key=lambda x: x[1])
-            delete_tokens = delete_tokens[:delete_count]
-            pipe.multi()
-            _: Awaitable = pipe.delete(*(d := [i[0] for i in delete_tokens]))
-            _: Awaitable = pipe.srem(key, *d)
-        return
+        if (client := cls.__dict__.get("_redis_client")) is None:
+            if cls.redis_url is None and cls.redis_shard_urls is None:
+                raise AttributeError("redis_url must be set to use the shared redis client")
+            create = partial(
+                create_token_redis_client,
+                max_connections=cls.redis_max_connections,
+                timeout=cls.redis_pool_timeout,
+                health_check_interval=cls.redis_health_check_interval,
+                idle_timeout=cls.redis_idle_timeout,
+                min_idle=cls.redis_min_idle,
+            )
+            if cls.redis_shard_urls is not None:
+                client = ShardedRedis({name: create(url) for name, url in cls.redis_shard_urls.items()}, cls.shard_replicas)
+            else:
+                client = create(cls.redis_url)
+            cls._redis_client = client
+        return client
+
+    @property
+    def redis(self) -> AsyncRedis:
+        return self.get_shared_redis_client()
+
+    @classmethod
+    def get_cluster_clients(cls) -> ClusterNodeClients:
+        """``redis_cluster`` 에서 사용하는 class 별 노드 Client, ``shutdown`` 에서 닫음"""
+        if (clients := cls.__dict__.get("_cluster_clients")) is None:
+            clients = ClusterNodeClients()
+            cls._cluster_clients = clients
+        return clients
+
+    @classmethod
+    def get_replica_set(cls) -> Optional[ReplicaSet]:
+        """``redis_replica_urls`` 로 만든 class 별 ``ReplicaSet``, 공유 Redis Client 가 primary
+
+        * ``startup`` 에서 지연 확인이 시작 되어야 replica 를 사용함
+        """
+        if cls.redis_replica_urls is None:
+            return None
+        if (replica_set := cls.__dict__.get("_replica_set")) is None:
+            replica_set = ReplicaSet(
+                cls.get_shared_redis_client(),
+                [
+                    create_token_redis_client(
+                        url,
+                        max_connections=cls.redis_max_connections,
+                        timeout=cls.redis_pool_timeout,
+                        health_check_interval=cls.redis_health_check_interval,
+                        idle_timeout=cls.redis_idle_timeout,
+                        min_idle=cls.redis_min_idle,
+                    )
+                    for url in cls.redis_replica_urls
+                ],
+                max_lag=cls.replica_max_lag,
+                check_interval=cls.replica_check_interval,
+            )
+            cls._replica_set = replica_set
+        return replica_set
+
+    @classmethod
+    def get_sliding_expiration(cls) -> SlidingExpiration:
+        """class 별 ``SlidingExpiration``"""
+        if (sliding := cls.__dict__.get("_sliding")) is None:
+            sliding = SlidingExpiration(
+                flush_interval=cls.sliding_flush_interval,
+                max_pending=cls.sliding_max_pending,
+                batch_size=cls.bulk_chunk_size,
+            )
+            cls._sliding = sliding
+        return sliding
 
-    @staticmethod
-    async def _add_token_transaction(
-            pipe: AsyncPipeline,
-            user_token_key: UserTokenKey,
-            token_key: TokenKey,
-            token: Token,
-            token_expire: TokenExpire
-    ) -> bool:
-        """``Redis`` 내에 토큰 등록
-        """
-        token = dumps(token)
-        if await pipe.sismember(user_token_key, token_key) == 1:
-            pipe.multi()
-            _: Awaitable = pipe.set(token_key, token)
-            _: Awaitable = pipe.expire(token_key, token_expire)
-            return True
+    @classmethod
+    def get_token_reaper(cls) -> TokenReaper:
+        """class 별 ``TokenReaper``
+
+        * ``token_store`` 가 없으면 공유 Redis Client 를 정리함
+        * ``session_index`` 면 인스턴스가 생길 때 ``trim_session_index`` 도 순회마다 실행 되도록 연결
+        """
+        if (reaper := cls.__dict__.get("_reaper")) is None:
+            def get_stores() -> list[TokenStore]:
+                if cls.token_store is not None:
+                    return [cls.token_store]
+                return [RedisTokenStore(i) for i in cls._get_primary_clients(cls.get_shared_redis_client())]
+
+            reaper = TokenReaper(
+                get_stores,
+                [cls._get_user_token_key_pattern(i, "*") for i in ("ACCESS", "REFRESH")],
+                interval=cls.reaper_interval,
+                batch_size=cls.reaper_batch_size,
+                rate=cls.reaper_rate,
+                metrics=cls.token_metrics,
+            )
+            cls._reaper = reaper
+        return reaper
+
+    @classmethod
+    def get_token_index_subscriber(cls) -> TokenIndexSubscriber:
+        """class 별 ``TokenIndexSubscriber``, 공유 Redis Client 를 구독함"""
+        if (subscriber := cls.__dict__.get("_index_subscriber")) is None:
+            def get_clients() -> list[AsyncRedis]:
+                return cls._get_primary_clients(cls.get_shared_redis_client())
+
+            subscriber = TokenIndexSubscriber(
+                get_clients,
+                [f"{cls.access_token_key}/", f"{cls.refresh_token_key}/"],
+                cls._get_token_owner_prefix(),
+                batch_size=cls.subscriber_batch_size,
+                flush_interval=cls.subscriber_flush_interval,
+                configure=cls.subscriber_configure,
+            )
+            cls._index_subscriber = subscriber
+        return subscriber
+
+    @classmethod
+    async def startup(cls) -> None:
+        """공유 pool 및 백그라운드 작업 준비
+
+        * ``redis_warm_up`` 갯수 만큼 연결을 미리 맺음
+        * idle 연결 정리 task 시작
+        * ``sliding_expiration`` 이면 만료 시간 갱신 task 시작
+        * ``token_reaper`` 면 만료 토큰 정리 task 시작
+        * ``token_index_subscriber`` 면 keyspace notification 구독 시작
+        * ``redis_replica_urls`` 가 있으면 replica 지연 확인 시작
+        """
+        if cls.redis_url is not None or cls.redis_shard_urls is not None:
+            for client in cls._get_primary_clients(cls.get_shared_redis_client()):
+                pool: TokenConnectionPool = client.connection_pool
+                if cls.redis_warm_up > 0:
+                    await pool.warm_up(cls.redis_warm_up)
+                pool.start_reaper()
+        if cls.sliding_expiration:
+            cls.get_sliding_expiration().start()
+        if cls.token_reaper:
+            if cls.token_store is None:
+                # 발급 시 정리를 하지 않으므로 정리할 저장소가 없으면 시작하지 않음
+                try:
+                    cls.get_shared_redis_client()
+                except AttributeError as e:
+                    raise AttributeError("token_reaper requires token_store or redis_url") from e
+            cls.get_token_reaper().start()
+        if cls.token_index_subscriber:
+            cls.get_token_index_subscriber().start()
+        if (replica_set := cls.get_replica_set()) is not None:
+            replica_set.start()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """남은 만료 시간 갱신을 보낸 후 공유 pool 을 닫음"""
+        if (replica_set := cls.__dict__.get("_replica_set")) is not None:
+            cls._replica_set = None
+            await replica_set.aclose()
+        if (reaper := cls.__dict__.get("_reaper")) is not None:
+            await reaper.aclose()
+        if (subscriber := cls.__dict__.get("_index_subscriber")) is not None:
+            await subscriber.aclose()
+        if (sliding := cls.__dict__.get("_sliding")) is not None:
+            await sliding.aclose()
+        if (shared_cache := cls.__dict__.get("_shared_cache")) is not None:
+            cls._shared_cache = None
+            shared_cache.close()
+        if (cluster_clients := cls.__dict__.get("_cluster_clients")) is not None:
+            cls._cluster_clients = None
+            await cluster_clients.aclose()
+        if (client := cls.__dict__.get("_redis_client")) is None:
+            return
+        cls._redis_client = None
+        await client.aclose(close_connection_pool=True)
+
+    @classmethod
+    @asynccontextmanager
+    async def lifespan(cls, app: Any = None):
+        """``FastAPI(lifespan=...)`` 또는 ``Namespace(lifespan=...)`` 에 사용"""
+        await cls.startup()
+        try:
+            yield
+        finally:
+            await cls.shutdown()
+
+    def get_security_dependency(self) -> Callable[..., Awaitable[Optional[TI]]]:
+        """``security_class`` 로 인증하는 dependency
+
+        * ``security_route`` 에 있는 method 에 자동으로 추가됨
+        * ``security_redis_dependency`` 가 없으면 공유 Redis Client 사용
+        * ``token_store`` 가 있으면 Redis Client 없이 동작
+        """
+        security = self.security_class
+        # 함수를 class 속성으로 지정해도 method 로 bind 되지 않도록 class 에서 가져옴
+        redis_dependency = type(self).security_redis_dependency
+
+        if redis_dependency is None:
+            async def authenticate(
+                    request: Request,
+                    credentials: Optional[str] = Security(security),
+            ) -> Optional[TI]:
+                return await self.authenticate(request, None if self.token_store is not None else self.redis, credentials)
         else:
-            return False
+            async def authenticate(
+                    request: Request,
+                    credentials: Optional[str] = Security(security),
+                    rd: AsyncRedis = Depends(redis_dependency),
+            ) -> Optional[TI]:
+                return await self.authenticate(request, rd, credentials)
 
-    @staticmethod
-    async def _get_token_transaction(
-            pipe: AsyncPipeline,
-            raw_token: RawToken,
-            key: TokenKey,
-            token: CallableToken,
-            token_info: CallableTokenInfo,
-            token_validator: TokenValidator,
+        return authenticate
+
+    async def authenticate(
+            self,
+            request: Request,
+            rd: AsyncRedis,
+            credentials: Optional[str],
     ) -> Optional[TI]:
-        """``Redis`` 에서 토큰 가져오기
+        """요청 당 한번만 access token 을 조회하여 ``request.state`` 에 저장
+
+        * 이미 조회 했으면 저장된 결과를 반환
+        * ``security_class.auto_error`` 면 유효하지 않은 토큰에 401
+
+        Args:
+            request: 현재 요청
+            rd: Async Redis Client
+            credentials: ``security_class`` 가 반환한 값
         """
-        if (__token := await pipe.get(key)) is None:
-            await pipe.unwatch()
-            return None
+        if (cached := getattr(request.state, self.security_state_key, _MISSING)) is not _MISSING:
+            return cached
+
+        token_info = None
+        if (token := self.security_class.parse_token(credentials)) is not None:
+            token_info = await self.get_access_token(rd=rd, token=token, pipelined=True)
+        if token_info is None and getattr(self.security_class, "auto_error", True):
+            raise HTTPException(
+                status_code=HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        setattr(request.state, self.security_state_key, token_info)
+        return token_info
 
-        _token = token(**loads(__token))
-        if not token_validator(_token):
-            return None
+    def get_current_token(self, request: Request) -> Optional[TI]:
+        """``authenticate`` 가 저장한 결과"""
+        return getattr(request.state, self.security_state_key, None)
+
+    def get_request_token_loader(
+            self,
+            request: Request,
+            rd: Optional[AsyncRedis] = None,
+            type: TokenType = "ACCESS",
+    ) -> DataLoader[RawToken, Optional[TI]]:
+        """raw 토큰으로 ``TokenInfo`` 를 조회하는 요청 단위 ``DataLoader``
 
-        ttl = await pipe.ttl(key)
+        * 같은 tick 에 요청된 토큰은 ``get_type_tokens`` 한번으로 조회, 요청 동안 memoize
+        * 같은 요청에서는 처음 만든 loader 의 ``rd`` 를 계속 사용
+        * ``rd`` 가 없으면 공유 Redis Client (``token_store`` 가 있으면 필요 없음)
 
-        return token_info(
-            token=raw_token,
-            expires_in=ttl,
-            **_token
+        ex)
+            async def get(self, request: Request):
+                loader = self.get_request_token_loader(request)
+                a, b = await loader.load_many([token_a, token_b])
+        """
+        if rd is None and self.token_store is None:
+            rd = self.redis
+        return get_request_loader(
+            request,
+            (id(self), type),
+            lambda: DataLoader(partial(self.get_type_tokens, rd, type=type)),
         )
 
-    @staticmethod
-    async def _get_user_tokens_transaction(
-            pipe: AsyncPipeline,
-            key: UserTokenKey,
-            token: CallableToken,
-            token_info: CallableTokenInfo,
-            token_validator: TokenValidator,
-    ) -> list[TI]:
-        """``Redis`` 에서 특정 유저의 토큰 가져오기
-        """
-        tokens = await pipe.smembers(key)
-        if len(tokens) == 0:
-            return []
-
-        await pipe.watch(*tokens)
-        ttl = None
-        return [
-            token_info(
-                token=i.split('/')[1],
-                expires_in=ttl,
-                **_token
-            )
-            for i in tokens if token_validator((_token := token(**loads(await pipe.get(i))))) and (ttl := await pipe.ttl(i)) > 5
-        ]
+    def get_token_loader(self, type: TokenType = "ACCESS") -> Any:
+        """``get_request_token_loader`` 를 주입하는 ``Depends``
 
-    @staticmethod
-    async def _abort_user_token_transaction(
-            pipe: AsyncPipeline,
-            key: UserTokenKey,
-            get_token_key: TokenKeyHandler,
-            user_tokens: list[RawToken] | None = None
-    ) -> None:
-        """``Redis`` 에서 특정 유저의 토큰을 취소
+        * ``global_dependencies`` 의 dependency 나 ``Resource`` 밖의 route 에서 사용
+        * Redis Client 는 ``get_security_dependency`` 와 같은 규칙
         """
-        tokens = await pipe.smembers(key)
-        if len(tokens) == 0:
-            return
+        redis_dependency = self.__class__.security_redis_dependency
 
-        if user_tokens is None or len(user_tokens) == 0:
-            tokens_for_delete = list(tokens)
+        if redis_dependency is None:
+            def dependency(request: Request) -> DataLoader:
+                return self.get_request_token_loader(request, type=type)
         else:
-            tokens_for_delete = [d for i in user_tokens if (d := get_token_key(i)) in tokens]
-
-        if len(tokens_for_delete) == 0:
-            return
-
-        pipe.multi()
-        _: Awaitable = pipe.srem(key, *tokens_for_delete)
-        _: Awaitable = pipe.delete(*tokens_for_delete)
-
+            def dependency(request: Request, rd: AsyncRedis = Depends(redis_dependency)) -> DataLoader:
+                return self.get_request_token_loader(request, rd, type)
 
+        return Depends(dependency)
 
+    def _decode_token(self, record: Optional[RawRecord]) -> Optional[T]:
+        """저장된 레코드를 토큰으로 변환
 
+        * ``token_codec`` 이 직접 쓴 것으로 확인한 (``verified``) 레코드가 아니면 ``token_validator`` 로 검증
+        * 레코드가 없거나 검증 실패시 ``None``
+        """
+        if record is None:
+            return None
+        _token = self.token_codec.decode(record, self._Token)
+        if not self.token_codec.verified(record) and not self._token_validator(asdict(_token)):
+            return None
+        return _token
 
-class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
-    access_token_limit: Optional[TokenLimit] | None = 1
-    refresh_token_limit: Optional[TokenLimit] | None = 1
-    access_token_expire: Optional[TokenExpire] = 3600
-    refresh_token_expire: Optional[TokenExpire] = 129600
-    user_access_token_key: Optional[str] = 'user_access_token'
-    user_refresh_token_key: Optional[str] = 'user_refresh_token'
-    access_token_key: Optional[str] = 'access_token'
-    refresh_token_key: Optional[str] = 'refresh_token'
-    security_route: Optional[list[MethodType]] = []
-    security_class: Optional[SecurityBase] = None
+    def _decode_token_info(self, record: Optional[RawRecord], token: RawToken, expires_in: int) -> Optional[TI]:
+        """저장된 레코드에서 바로 ``TokenInfo`` 생성, 조회 경로에서 사용
 
-    def __init__(
-            self,
-            token: type[T],
-            token_info: type[TI],
-            token_validator: TokenValidator,
-            token_info_validator: TokenInfoValidator
-    ):
-        self._Token = token
-        self._TokenInfo = token_info
-        self._token_validator = token_validator
-        self._token_info_validator = token_info_validator
+        * 검증은 ``_decode_token`` 과 같음
+        """
+        if record is None:
+            return None
+        return self.token_codec.decode_info(
+            record,
+            self._Token,
+            self._TokenInfo,
+            token,
+            expires_in,
+            self._token_validator,
+        )
 
     @abstractmethod
     def create_token(self, *args, **kwarg) -> RawToken:
@@ -239,105 +499,334 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
     def _make_token(self, token: Token) -> TI:
         pass
 
-    def _get_access_token_key(self, token: RawToken) -> TokenKey:
-        return TokenKey(f"{self.access_token_key}/{token}")
+    def _get_token_store(self, rd: AsyncRedis, watch_reads: bool = False) -> TokenStore:
+        """``token_store`` 가 없으면 ``rd`` 를 사용하는 ``RedisTokenStore``
 
-    def _get_refresh_token_key(self, token: RawToken) -> TokenKey:
-        return TokenKey(f"{self.refresh_token_key}/{token}")
+        * 작업마다 불리므로 class 별로 Client 당 한번만 만듦
+        * 저장소는 Client 를 weakref 로 가지므로 Client 가 사라지면 함께 사라짐
+        """
+        if self.token_store is not None:
+            return self.token_store
+        cls = type(self)
+        if (stores := cls.__dict__.get("_token_stores")) is None:
+            stores = WeakKeyDictionary()
+            cls._token_stores = stores
+        if (pair := stores.get(rd)) is None:
+            pair = tuple(
+                RedisTokenStore(proxy(rd), watch_reads=i, retry=cls.watch_retry, hashed=cls.token_codec.hashed)
+                for i in (False, True)
+            )
+            stores[rd] = pair
+        return pair[watch_reads]
 
-    def _get_token_key_handler(self, type: TokenType) -> TokenKeyHandler:
-        if type == "ACCESS":
-            return self._get_access_token_key
-        elif type == "REFRESH":
-            return self._get_refresh_token_key
-        raise ValueError(f"Token type must be ACCESS or REFRESH")
+    @classmethod
+    def get_negative_cache(cls) -> NegativeTokenCache:
+        """class 별 ``NegativeTokenCache``
 
-    def _get_user_access_token_key(self, idf: UserIdentify) -> UserTokenKey:
-        return UserTokenKey(f"{self.user_access_token_key}/{idf}")
+        * hit rate 는 ``get_negative_cache().hit_rate`` 또는 ``token_metrics`` 의 ``negative_cache_hits``
+        """
+        if (cache := cls.__dict__.get("_negative_cache")) is None:
+            cache = NegativeTokenCache(max_size=cls.negative_cache_size, ttl=cls.negative_cache_ttl)
+            cls._negative_cache = cache
+        return cache
+
+    def _is_known_missing(self, token_keys: Iterable[TokenKey]) -> bool:
+        """``negative_cache`` 에 모두 있으면 ``True``, 저장소 조회를 생략함"""
+        if not self.negative_cache:
+            return False
+        cache = self.get_negative_cache()
+        if all(cache.contains(i) for i in token_keys):
+            count_negative_cache_hit()
+            return True
+        return False
 
-    def _get_user_refresh_token_key(self, idf: UserIdentify) -> UserTokenKey:
-        return UserTokenKey(f"{self.user_refresh_token_key}/{idf}")
+    def _note_missing(self, token_keys: Iterable[TokenKey]) -> None:
+        if self.negative_cache:
+            cache = self.get_negative_cache()
+            for token_key in token_keys:
+                cache.add(token_key)
 
-    def _get_user_token_key_handler(self, type: TokenType) -> UserTokenKeyHandler:
-        if type == "ACCESS":
-            return self._get_user_access_token_key
-        elif type == "REFRESH":
-            return self._get_user_refresh_token_key
-        raise ValueError(f"Token type must be ACCESS or REFRESH")
+    @classmethod
+    def get_shared_cache(cls) -> Optional[SharedTokenCache]:
+        """class 별 ``SharedTokenCache``, ``shared_cache_path`` 가 없으면 ``None``
+
+        * 같은 호스트의 worker 들은 같은 ``shared_cache_path`` 와 크기 설정을 사용해야 함
+        * class 마다 다른 경로를 사용
+        """
+        if cls.shared_cache_path is None:
+            return None
+        if (cache := cls.__dict__.get("_shared_cache")) is None:
+            cache = SharedTokenCache(
+                cls.shared_cache_path,
+                slots=cls.shared_cache_slots,
+                slot_size=cls.shared_cache_slot_size,
+                ttl=cls.shared_cache_ttl,
+            )
+            cls._shared_cache = cache
+        return cache
 
-    async def _register_token(
+    def _get_shared_cached(self, token_key: TokenKey, token: RawToken) -> Optional[TI]:
+        if (cache := self.get_shared_cache()) is None or (cached := cache.get(token_key)) is None:
+            return None
+        count_shared_cache_hit()
+        record, expires_in = cached
+        return self._shared_cache_codec.decode_info(record, self._Token, self._TokenInfo, token, expires_in)
+
+    def _put_shared_cached(self, token_key: TokenKey, token_info: TI) -> None:
+        if (cache := self.get_shared_cache()) is not None:
+            cache.put(token_key, self._shared_cache_codec.encode(token_info.info), token_info.expires_in)
+
+    def _note_aborted(self, token_keys: Iterable[TokenKey]) -> None:
+        """취소 된 토큰 키를 ``SharedTokenCache`` 에서 지움"""
+        if (cache := self.get_shared_cache()) is not None:
+            for token_key in token_keys:
+                cache.discard(token_key)
+
+    async def _note_deleted(self, rd: AsyncRedis, token_keys: Sequence[TokenKey | bytes]) -> None:
+        """저장소가 지운 키 중 access / refresh 토큰 키를 ``_note_aborted`` 와 ``_unindex_sessions`` 로 넘김
+
+        * family id 키 처럼 토큰 키가 아닌 키는 무시
+        """
+        deleted: dict[TokenType, list[TokenKey]] = {"ACCESS": [], "REFRESH": []}
+        for key in token_keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            raw = self._get_raw_token(key)
+            for type in deleted:
+                if self._get_token_key_handler(type)(raw) == key:
+                    deleted[type].append(key)
+        for type, keys in deleted.items():
+            self._note_aborted(keys)
+            await self._unindex_sessions(rd, type, keys)
+
+    def _get_session_index_keys(self, type: TokenType) -> tuple[str, str]:
+        """``(만료 시각 index, 발급 시각 index)`` 키, 둘은 같은 slot / 노드에 있음"""
+        if not self._uses_hash_tags():
+            return f"{self.session_expiry_index_key}/{type}", f"{self.session_issued_index_key}/{type}"
+        return f"{self.session_expiry_index_key}/{{{type}}}", f"{self.session_issued_index_key}/{{{type}}}"
+
+    async def _index_sessions(self, rd: AsyncRedis, type: TokenType, token_keys: Sequence[TokenKey], expire: TokenExpire) -> None:
+        """발급한 토큰을 전역 세션 index 에 추가
+
+        * ``session_index`` 일 때만, ``token_store`` 가 있으면 사용하지 않음
+        * 토큰 저장과 별도로 기록 되므로 사이에 실패하면 index 에서 빠질 수 있음
+        * 한번에 발급한 토큰도 score 가 겹치지 않도록 ``SESSION_SCORE_STEP`` 씩 더함,
+          같은 score 가 많으면 페이지마다 그 score 의 항목을 처음부터 다시 읽게 됨
+        """
+        if not self.session_index or self.token_store is not None or len(token_keys) == 0:
+            return
+        expiry_key, issued_key = self._get_session_index_keys(type)
+        now = time()
+        steps = [i * SESSION_SCORE_STEP for i in range(len(token_keys))]
+        async with pipeline(self._get_key_client(rd, expiry_key), True) as pipe:
+            _: Awaitable = pipe.zadd(expiry_key, {k: now + expire + s for k, s in zip(token_keys, steps)})
+            _: Awaitable = pipe.zadd(issued_key, {k: now + s for k, s in zip(token_keys, steps)})
+            await pipe.execute()
+
+    async def _unindex_sessions(self, rd: AsyncRedis, type: TokenType, token_keys: Sequence[TokenKey]) -> None:
+        """취소 된 토큰을 전역 세션 index 에서 지움, rebalance 중이면 이전 노드의 index 에서도 지움"""
+        if not self.session_index or self.token_store is not None or len(token_keys) == 0:
+            return
+        expiry_key, issued_key = self._get_session_index_keys(type)
+        clients = [self._get_key_client(rd, expiry_key)]
+        if (previous := self._get_previous_key_client(rd, expiry_key)) is not None:
+            clients.append(previous)
+        for client in clients:
+            async with pipeline(client, True) as pipe:
+                _: Awaitable = pipe.zrem(expiry_key, *token_keys)
+                _: Awaitable = pipe.zrem(issued_key, *token_keys)
+                await pipe.execute()
+
+    async def _merge_session_index(self, rd: AsyncRedis, type: TokenType) -> AsyncRedis:
+        """rebalance 중이면 이전 노드의 세션 index 를 현재 노드로 합치고 index 를 가진 Client 반환
+
+        * 새 노드에 이미 index 가 있으면 (rebalance 중 발급) 두 index 를 더 큰 score 로 합침
+        """
+        expiry_key, issued_key = self._get_session_index_keys(type)
+        client = self._get_key_client(rd, expiry_key)
+        if (previous := self._get_previous_key_client(rd, expiry_key)) is not None:
+            await move_keys(previous, client, [expiry_key, issued_key])
+        return client
+
+    def _note_issued(self, token_keys: Iterable[TokenKey]) -> None:
+        """이 프로세스에서 발급한 토큰 키를 ``negative_cache`` 에서 지움"""
+        if self.negative_cache:
+            cache = self.get_negative_cache()
+            for token_key in token_keys:
+                cache.discard(token_key)
+
+    @classmethod
+    def get_issue_lock(cls) -> KeyedLock:
+        """class 별 유저 토큰 키 ``KeyedLock``
+
+        * 같은 프로세스에서 같은 유저의 발급이 ``WATCH`` 로 충돌하지 않도록 순서대로 처리
+        """
+        if (lock := cls.__dict__.get("_issue_lock")) is None:
+            lock = KeyedLock()
+            cls._issue_lock = lock
+        return lock
+
+    @classmethod
+    def _uses_hash_tags(cls) -> bool:
+        """키와 토큰에 uid 의 hash tag 를 넣는지 여부 (``redis_cluster`` 또는 ``redis_sharded``)"""
+        return cls.redis_cluster or cls.redis_sharded
+
+    @classmethod
+    def _get_primary_clients(cls, rd: AsyncRedis) -> list[AsyncRedis]:
+        """노드별로 처리해야 하는 작업 (``SCAN`` 등) 에 사용할 Client 목록"""
+        if cls.redis_cluster:
+            return cls.get_cluster_clients().get_primary_clients(rd)
+        if cls.redis_sharded:
+            return rd.get_primary_clients()
+        return [rd]
+
+    def _get_key_client(self, rd: AsyncRedis, key: str) -> AsyncRedis:
+        """``key`` 를 처리할 Client
+
+        * ``redis_cluster`` 면 ``key`` 의 slot 을 가진 노드 Client
+        * ``redis_sharded`` 면 ``key`` 의 hash tag 를 가진 노드 Client
+        """
+        if self.token_store is not None:
+            return rd
+        if self.redis_cluster:
+            return self.get_cluster_clients().get_client(rd, key)
+        if self.redis_sharded:
+            return rd.get_client(key)
+        return rd
+
+    def _get_read_clients(
             self,
             rd: AsyncRedis,
-            key: UserTokenKey,
-            token_key_handler: TokenKeyHandler,
-            token_expire: TokenExpire,
-            **kwargs
-    ) -> tuple[RawToken, TokenKey]:
-        """``Redis`` 에 토큰 등록
+            key: str,
+            read_rd: Optional[AsyncRedis] = None,
+            replica: bool = True,
+    ) -> list[AsyncRedis]:
+        """``key`` 를 조회할 Client 를 순서대로, 앞에서 없으면 다음 Client 에서 조회
+
+        * replica (``read_rd`` 또는 공유 Client 일 때 ``get_replica_set``) → primary
+          → ``redis_sharded`` rebalance 중 이전 노드
+        * 방금 발급 되어 replica 에 아직 없는 토큰은 primary 에서 찾음
+        * replica 는 ``redis_cluster`` / ``redis_sharded`` / ``token_store`` 가 아닐 때만 사용
+        """
+        clients = [self._get_key_client(rd, key)]
+        if replica and self.token_store is None and not self._uses_hash_tags():
+            if read_rd is None and self.redis_replica_urls is not None and rd is self.__class__.__dict__.get("_redis_client"):
+                read_rd = self.get_replica_set().get_client()
+            if read_rd is not None:
+                clients.insert(0, read_rd)
+        if (previous := self._get_previous_key_client(rd, key)) is not None:
+            clients.append(previous)
+        return clients
+
+    def _get_previous_key_client(self, rd: AsyncRedis, key: str) -> Optional[AsyncRedis]:
+        """``redis_sharded`` 의 rebalance 중 ``key`` 가 아직 남아 있을 수 있는 이전 노드 Client
+
+        * 조회는 없을 때 이전 노드도 확인하고, 취소는 양쪽에서 함
+        """
+        if not self.redis_sharded or self.token_store is not None:
+            return None
+        return rd.get_previous_client(key)
 
-        * class 내부 사용됨
+    def _verify_raw_token(self, token: RawToken) -> bool:
+        """저장소 조회 전에 토큰 형식 확인, ``False`` 면 조회 하지 않음"""
+        return True
 
-        Args:
-            rd: Async Redis Client
-            key:
-            token_key_handler:
-            token_expire: 토큰 만료 시간
-            **kwargs: 토큰 만들때 인자로 넘겨줌
+    def _create_raw_token(self, identify: UserIdentify, **kwargs) -> RawToken:
+        """``create_token`` 으로 토큰 생성
 
-        Returns:
-            * ``tuple[0]`` = ``RawToken``
-            * ``tuple[1]`` = ``TokenKey``
+        * ``redis_cluster`` 또는 ``redis_sharded`` 면 ``{hash tag}.{token}`` 형태로 uid 의 hash tag 를 붙임
         """
+        if not self._uses_hash_tags():
+            return self.create_token(**kwargs)
+        return f"{get_hash_tag(identify, self.cluster_tag_length)}.{self.create_token(**kwargs)}"
 
-        while await rd.sadd(
-                key,
-                (
-                        token_key := token_key_handler(
-                            token := self.create_token(**kwargs)
-                        )
-                )
-        ) == 0:
-            pass
-        await rd.expire(key, token_expire)
-        return token, TokenKey(token_key)
+    def _format_token_key(self, prefix: str, token: RawToken) -> TokenKey:
+        if not self._uses_hash_tags():
+            return TokenKey(f"{prefix}/{token}")
+        tag, _, _ = token.rpartition('.')
+        return TokenKey(f"{prefix}/{{{tag}}}/{token}")
 
-    async def _manage_user_token(
-            self,
-            rd: AsyncRedis,
-            key: UserTokenKey
-    ) -> None:
-        """uid로 등록된 토큰을 관리함
+    @staticmethod
+    def _get_raw_token(token_key: TokenKey | bytes) -> RawToken:
+        """토큰 키에서 토큰 부분
 
-        * class 내부 사용
+        * ``decode_responses=False`` 인 client 가 돌려준 ``bytes`` 키도 받음
+        """
+        if isinstance(token_key, bytes):
+            token_key = token_key.decode()
+        return token_key.rsplit('/', 1)[1]
 
-        Args:
-            rd: Async Redis client
-            key:
+    def _get_access_token_key(self, token: RawToken) -> TokenKey:
+        return self._format_token_key(self.access_token_key, token)
+
+    def _get_refresh_token_key(self, token: RawToken) -> TokenKey:
+        return self._format_token_key(self.refresh_token_key, token)
+
+    def _get_token_family_prefix(self, token: RawToken) -> str:
+        """family id 를 붙이면 family 의 토큰 키 목록이 되는 prefix
+
+        * ``redis_cluster`` 면 토큰과 같은 hash tag 를 사용
         """
-        await rd.transaction(
-            partial(self._manage_user_token_transaction, key=key),
-            key
-        )
+        if not self._uses_hash_tags():
+            return f"{self.token_family_key}/"
+        tag, _, _ = token.rpartition('.')
+        return f"{self.token_family_key}/{{{tag}}}/"
 
-    async def _manage_user_token_count(
-            self,
-            rd: AsyncRedis,
-            key: UserTokenKey,
-            limit: TokenLimit
-    ) -> None:
-        """토큰 갯수 제한시 토큰을 관리함
+    def _get_token_key_handler(self, type: TokenType) -> TokenKeyHandler:
+        if type == "ACCESS":
+            return self._get_access_token_key
+        elif type == "REFRESH":
+            return self._get_refresh_token_key
+        raise ValueError(f"Token type must be ACCESS or REFRESH")
 
-        * class 내부 사용
+    def _get_type_token_config(self, type: TokenType) -> tuple[Optional[TokenLimit], TokenExpire]:
+        """토큰 종류별 ``(limit, expire)``"""
+        if type == 'ACCESS':
+            return self.access_token_limit, self.access_token_expire
+        elif type == 'REFRESH':
+            return self.refresh_token_limit, self.refresh_token_expire
+        raise AttributeError("type must be ACCESS or REFRESH")
 
-        Args:
-            rd: Async Redis client
-            key: User Token key
-            limit: 토큰 제한 갯수
+    def _format_user_token_key(self, prefix: str, idf: UserIdentify) -> UserTokenKey:
+        if not self._uses_hash_tags():
+            return UserTokenKey(f"{prefix}/{idf}")
+        return UserTokenKey(f"{prefix}/{{{get_hash_tag(idf, self.cluster_tag_length)}}}/{idf}")
+
+    def _get_user_access_token_key(self, idf: UserIdentify) -> UserTokenKey:
+        return self._format_user_token_key(self.user_access_token_key, idf)
+
+    def _get_user_refresh_token_key(self, idf: UserIdentify) -> UserTokenKey:
+        return self._format_user_token_key(self.user_refresh_token_key, idf)
+
+    @classmethod
+    def _get_token_owner_prefix(cls) -> str:
+        """토큰 키를 붙이면 토큰의 유저 토큰 키를 기록하는 키가 되는 prefix
+
+        * 토큰 키의 hash tag 가 그대로 들어가므로 토큰과 같은 slot / 노드에 있음
+        * 토큰마다 따로 만료 되므로 notification 을 놓쳐도 계속 쌓이지 않음
         """
-        await rd.transaction(
-            partial(self._manage_user_token_count_transaction, key=key, limit=limit),
-            key
-        )
+        return f"{cls.token_owner_key}/"
+
+    def _get_issue_owner_prefix(self) -> Optional[str]:
+        """``token_index_subscriber`` 일 때 발급하는 토큰의 주인을 기록할 prefix"""
+        if not self.token_index_subscriber:
+            return None
+        return self._get_token_owner_prefix()
+
+    @classmethod
+    def _get_user_token_key_pattern(cls, type: TokenType, identify_pattern: str) -> str:
+        """``SCAN MATCH`` 에 사용할 유저 토큰 키 패턴"""
+        prefix = cls.user_access_token_key if type == "ACCESS" else cls.user_refresh_token_key
+        if not cls._uses_hash_tags():
+            return f"{prefix}/{identify_pattern}"
+        return f"{prefix}/{{*}}/{identify_pattern}"
+
+    def _get_user_token_key_handler(self, type: TokenType) -> UserTokenKeyHandler:
+        if type == "ACCESS":
+            return self._get_user_access_token_key
+        elif type == "REFRESH":
+            return self._get_user_refresh_token_key
+        raise ValueError(f"Token type must be ACCESS or REFRESH")
 
     async def _create_type_token(
             self,
@@ -347,7 +836,7 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             type: TokenType,
             **kwargs,
     ) -> TI:
-        """토큰 만든 후 Redis에 저장
+        """토큰 만든 후 저장소에 저장
 
         * Class 내부 사용
         * 직접 사용 금지 ``create_access_token`` ``create_refresh_token`` 을 사용
@@ -359,52 +848,33 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             type: ACCESS or REFRESH
             **kwargs: create_token 의 인자로 넘겨줌
         """
-        if type == 'ACCESS':
-            token_limit = self.access_token_limit
-            token_expire = self.access_token_expire
-        elif type == 'REFRESH':
-            token_limit = self.refresh_token_limit
-            token_expire = self.refresh_token_expire
-        else:
-            raise AttributeError("type must be ACCESS or REFRESH")
-
-        get_token_key = self._get_token_key_handler(type)
-        get_user_token_key = self._get_user_token_key_handler(type)
-
-        user_token_key = get_user_token_key(identify)
-
-        # 토큰 갯수 및 존재 여부 관리
-        await self._manage_user_token(rd=rd, key=user_token_key)
-        if token_limit is not None:
-            await self._manage_user_token_count(rd=rd, key=user_token_key, limit=token_limit)
+        with measure(self.token_metrics, f"create_{type.lower()}_token"):
+            token_limit, token_expire = self._get_type_token_config(type)
 
-        # 토큰 제작
-        get_token_info = partial[TI](self._make_token, token=Token(uid=identify, payload=payload))
-        get_raw_token_and_token_key = partial[Coroutine[Any, Any, tuple[RawToken, TokenKey]]](
-            self._register_token,
-            rd=rd,
-            key=user_token_key,
-            token_key_handler=get_token_key,
-            token_expire=token_expire,
-            **kwargs
-        )
-        while not await rd.transaction(
-                partial(
-                    self._add_token_transaction,
-                    user_token_key=user_token_key,
-                    token_key=(result := await get_raw_token_and_token_key())[1],
-                    token=(token_info := get_token_info()),
-                    token_expire=token_expire
-                ),
-                *(user_token_key, result[1]),
-                value_from_callable=True
-        ):
-            pass
-
-        ttl: int = await rd.ttl(result[1])
-        token_info["expires_in"] = ttl
-        token_info["token"] = result[0]
-        return token_info
+            get_token_key = self._get_token_key_handler(type)
+            get_user_token_key = self._get_user_token_key_handler(type)
+
+            user_token_key = get_user_token_key(identify)
+            store = self._get_token_store(self._get_key_client(rd, user_token_key))
+
+            # 같은 프로세스의 같은 유저 발급은 순서대로 처리하여 WATCH 충돌을 줄임
+            async with self.get_issue_lock()(user_token_key) if self.serialize_issuance else nullcontext():
+                # 토큰 갯수 및 존재 여부 관리
+                self._note_aborted(await store.cleanup(user_token_key, token_limit, prune=not self.token_reaper))
+
+                # 토큰 제작
+                token_info = self._make_token(token=Token(uid=identify, payload=payload))
+                raw_token, token_key, expires_in = await store.add(
+                    user_token_key,
+                    lambda: ((raw_token := self._create_raw_token(identify, **kwargs)), get_token_key(raw_token)),
+                    self.token_codec.encode(token_info.info),
+                    token_expire,
+                    unique=self._unique_raw_tokens,
+                    owner_prefix=self._get_issue_owner_prefix(),
+                )
+            self._note_issued((token_key,))
+            await self._index_sessions(rd, type, [token_key], token_expire)
+            return replace(token_info, token=raw_token, expires_in=expires_in)
 
     async def create_access_token(
             self,
@@ -450,124 +920,665 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             **kwargs
         )
 
+    async def create_tokens_bulk(
+            self,
+            rd: AsyncRedis,
+            identities_and_payloads: Iterable[tuple[UserIdentify, TokenPayload]],
+            type: TokenType = "ACCESS",
+            chunk_size: Optional[int] = None,
+            **kwargs
+    ) -> list[TI | Exception]:
+        """여러 유저의 토큰을 한번에 발급
+
+        ``chunk_size`` 단위로 나눈 뒤 유저별로 묶어서 청크당 3번의 round trip 으로 처리함
+
+        * 청크 단위로 ``MULTI/EXEC`` 로 기록되며 ``WATCH`` 는 사용하지 않음
+        * 동시에 단건 발급이 일어나면 토큰 갯수 제한은 best-effort
+        * 한 유저에게 ``limit`` 보다 많이 발급하면 앞쪽 항목은 ``ValueError``
+        * ``redis_sharded`` 면 청크를 노드별로, ``redis_cluster`` 면 유저 hash tag 별로 나누어 동시에 처리
+        * ``token_store`` 가 있거나 ``token_codec.hashed`` 면 한 건씩 발급
+
+        Args:
+            rd: Async Redis Client
+            identities_and_payloads: ``(identify, payload)`` 의 Iterable
+            type: ACCESS or REFRESH
+            chunk_size: 한번에 처리할 갯수, 없으면 ``bulk_chunk_size``
+            **kwargs: ``create_token`` 인자로 넘어감
+
+        Returns:
+            입력 순서대로 ``TokenInfo`` 또는 해당 항목에서 발생한 ``Exception``
+        """
+        with measure(self.token_metrics, "create_tokens_bulk"):
+            token_limit, token_expire = self._get_type_token_config(type)
+            chunk_size = chunk_size or self.bulk_chunk_size
+            items = list(identities_and_payloads)
+            results: list[TI | Exception | None] = [None] * len(items)
+
+            if self.token_store is not None or self.token_codec.hashed:
+                for index, (identify, payload) in enumerate(items):
+                    try:
+                        results[index] = await self._create_type_token(rd, payload, identify, type, **kwargs)
+                    except Exception as e:
+                        results[index] = e
+                return results
+
+            get_token_key = self._get_token_key_handler(type)
+            get_user_token_key = self._get_user_token_key_handler(type)
+
+            for offset in range(0, len(items), chunk_size):
+                groups: dict[tuple[AsyncRedis, str], list[int]] = {}
+                for index in range(offset, min(offset + chunk_size, len(items))):
+                    user_token_key = get_user_token_key(items[index][0])
+                    # Redis Cluster 는 MULTI 안의 키가 모두 한 slot 에 있어야 하므로 hash tag 별로 나눔
+                    tag = get_key_tag(user_token_key) if self.redis_cluster else ""
+                    groups.setdefault((self._get_key_client(rd, user_token_key), tag), []).append(index)
+                await asyncio.gather(*(
+                    self._create_tokens_bulk_chunk(
+                        rd=client,
+                        items=items,
+                        indexes=indexes,
+                        results=results,
+                        type=type,
+                        token_limit=token_limit,
+                        token_expire=token_expire,
+                        **kwargs
+                    )
+                    for (client, _), indexes in groups.items()
+                ))
+                await self._index_sessions(rd, type, [
+                    get_token_key(i.token) for i in results[offset:offset + chunk_size] if isinstance(i, TokenInfo)
+                ], token_expire)
+            return results
+
+    async def _create_tokens_bulk_chunk(
+            self,
+            rd: AsyncRedis,
+            items: list[tuple[UserIdentify, TokenPayload]],
+            indexes: list[int],
+            results: list[TI | Exception | None],
+            type: TokenType,
+            token_limit: Optional[TokenLimit],
+            token_expire: TokenExpire,
+            **kwargs
+    ) -> None:
+        """``create_tokens_bulk`` 의 청크 하나를 처리
+
+        * class 내부 사용
+        * ``items`` 중 ``indexes`` 위치만 처리하며 결과도 같은 위치에 채워짐
+        """
+        get_token_key = self._get_token_key_handler(type)
+        get_user_token_key = self._get_user_token_key_handler(type)
+
+        users: dict[UserTokenKey, list[int]] = {}
+        for index in indexes:
+            users.setdefault(get_user_token_key(items[index][0]), []).append(index)
+
+        # 유저별 토큰 목록과 남은 시간
+        async with pipeline(rd, False) as pipe:
+            for user_token_key in users:
+                _: Awaitable = pipe.smembers(user_token_key)
+            members: list[set[TokenKey]] = await pipe.execute()
+        async with pipeline(rd, False) as pipe:
+            for tokens in members:
+                for token_key in tokens:
+                    _: Awaitable = pipe.ttl(token_key)
+            ttls = iter(await pipe.execute())
+
+        # 만료 된 토큰과 갯수 제한으로 지울 토큰 계산
+        tokens_for_delete: dict[UserTokenKey, tuple[list[TokenKey], list[TokenKey]]] = {}
+        pending: dict[int, TI] = {}
+        for (user_token_key, user_indexes), tokens in zip(users.items(), members):
+            alive: list[tuple[TokenKey, int]] = []
+            dead: list[TokenKey] = []
+            for token_key in tokens:
+                if (ttl := next(ttls)) == -2:
+                    dead.append(token_key)
+                else:
+                    alive.append((token_key, ttl))
+
+            if token_limit is not None:
+                for index in user_indexes[:max(len(user_indexes) - token_limit, 0)]:
+                    results[index] = ValueError(f"token limit exceeded: {token_limit}")
+                user_indexes = user_indexes[max(len(user_indexes) - token_limit, 0):]
+                alive.sort(key=lambda x: x[1])
+                evict = [i[0] for i in alive[:max(len(alive) + len(user_indexes) - token_limit, 0)]]
+            else:
+                evict = []
+            tokens_for_delete[user_token_key] = (dead, evict)
+
+            for index in user_indexes:
+                identify, payload = items[index]
+                try:
+                    pending[index] = self._make_token(token=Token(uid=identify, payload=payload))
+                except Exception as e:
+                    results[index] = e
+
+        first = True
+        while len(pending) != 0:
+            retry = await self._write_tokens_bulk(
+                rd=rd,
+                users=users,
+                tokens_for_delete=tokens_for_delete if first else {},
+                pending=pending,
+                results=results,
+                get_token_key=get_token_key,
+                token_expire=token_expire,
+                **kwargs
+            )
+            pending = {i: pending[i] for i in retry}
+            first = False
+
+    async def _write_tokens_bulk(
+            self,
+            rd: AsyncRedis,
+            users: dict[UserTokenKey, list[int]],
+            tokens_for_delete: dict[UserTokenKey, tuple[list[TokenKey], list[TokenKey]]],
+            pending: dict[int, TI],
+            results: list[TI | Exception | None],
+            get_token_key: TokenKeyHandler,
+            token_expire: TokenExpire,
+            **kwargs
+    ) -> list[int]:
+        """발급 대기 토큰을 ``MULTI/EXEC`` 한번으로 기록
+
+        * class 내부 사용
+        * 이미 있는 토큰 키와 겹친 항목은 유저 목록에서 되돌린 후 index 를 반환하여 재시도 함
+
+        Returns:
+            재시도 해야 할 index 목록
+        """
+        written: list[tuple[int, int, UserTokenKey, TokenKey, RawToken]] = []
+        async with pipeline(rd, True) as pipe:
+            for user_token_key, indexes in users.items():
+                dead, evict = tokens_for_delete.get(user_token_key, ([], []))
+                if len(dead) + len(evict) != 0:
+                    _: Awaitable = pipe.srem(user_token_key, *dead, *evict)
+                if len(evict) != 0:
+                    _: Awaitable = pipe.delete(*evict)
+
+                added = False
+                for index in indexes:
+                    if (token_info := pending.get(index)) is None:
+                        continue
+                    try:
+                        record = self.token_codec.encode(token_info.info)
+                        token_key = get_token_key(raw_token := self._create_raw_token(token_info.info.uid, **kwargs))
+                    except Exception as e:
+                        results[index] = e
+                        continue
+                    written.append((index, len(pipe), user_token_key, token_key, raw_token))
+                    _: Awaitable = pipe.set(token_key, record, ex=token_expire, nx=True)
+                    _: Awaitable = pipe.sadd(user_token_key, token_key)
+                    if (owner_prefix := self._get_issue_owner_prefix()) is not None:
+                        write_owner(pipe, owner_prefix, token_key, user_token_key, token_expire, nx=True)
+                    added = True
+                if added:
+                    _: Awaitable = pipe.expire(user_token_key, token_expire)
+
+            if len(pipe) == 0:
+                return []
+            try:
+                res = await pipe.execute(raise_on_error=False)
+            except Exception as e:
+                for index, *_ in written:
+                    results[index] = e
+                return []
+        for user_token_key in users:
+            self._note_aborted(tokens_for_delete.get(user_token_key, ([], []))[1])
+
+        retry: list[int] = []
+        collided: list[tuple[UserTokenKey, TokenKey]] = []
+        for index, position, user_token_key, token_key, raw_token in written:
+            if isinstance((ok := res[position]), Exception):
+                results[index] = ok
+            elif not ok:
+                collided.append((user_token_key, token_key))
+                retry.append(index)
+            else:
+                results[index] = replace(pending[index], token=raw_token, expires_in=token_expire)
+                self._note_issued((token_key,))
+
+        if len(collided) != 0:
+            async with pipeline(rd, False) as pipe:
+                for user_token_key, token_key in collided:
+                    _: Awaitable = pipe.srem(user_token_key, token_key)
+                await pipe.execute()
+        return retry
+
     async def get_type_token(
             self,
             rd: AsyncRedis,
             token: RawToken,
             type: Optional[TokenType] = None,
+            pipelined: Optional[bool] = None,
+            read_rd: Optional[AsyncRedis] = None,
     ) -> Optional[TI | tuple[TI, TI]]:
         """
+        Args:
+            rd: Async Redis Client (primary)
+            token: Raw Token
+            type: ACCESS or REFRESH, None 이면 둘 다
+            pipelined: ``WATCH`` 없이 ``MULTI/EXEC`` 한번으로 조회, 없으면 ``token_read_pipelined``
+            read_rd: 조회에 사용할 replica Client, 없으면 ``redis_replica_urls`` 의 replica
+
+        * ``sliding_expiration`` 이면 조회된 토큰의 만료 시간 연장이 기록됨
+        * replica 에 없는 토큰은 primary 에서 다시 조회, ``WATCH`` 조회는 항상 primary
+        * ``negative_cache`` 면 최근 없었던 토큰은 저장소를 조회하지 않음
+        * ``shared_cache_path`` 가 있으면 type 을 지정한 조회는 worker 간 공유 cache 를 먼저 확인,
+          다른 호스트에서 취소한 토큰은 ``shared_cache_ttl`` 동안 조회 될 수 있음
+
         Returns:
             type == None 이면
 
             * tuple[0] : ACCESS TOKEN INFO
             * tuple[1] : REFRESH TOKEN INFO
         """
-        kwargs = {
-            "token": self._Token,
-            "token_info": self._TokenInfo,
-            "token_validator": self._token_validator,
-        }
-        if type is None:
-            return await asyncio.gather(
-                rd.transaction(
-                    partial(
-                        self._get_token_transaction,
-                        raw_token=token,
-                        key=(token_key := self._get_token_key_handler("ACCESS")(token)),
-                        **kwargs
-                    ),
-                    token_key,
-                    value_from_callable=True
-                ),
-                rd.transaction(
-                    partial(
-                        self._get_token_transaction,
-                        raw_token=token,
-                        key=(token_key := self._get_token_key_handler("REFRESH")(token)),
-                        **kwargs
-                    ),
-                    token_key,
-                    value_from_callable=True
-                ),
-            )
+        with measure(self.token_metrics, "get_token" if type is None else f"get_{type.lower()}_token"):
+            if not self._verify_raw_token(token):
+                return (None, None) if type is None else None
+            key = self._get_access_token_key(token)
+            token_keys = [self._get_token_key_handler(i)(token) for i in (("ACCESS", "REFRESH") if type is None else (type,))]
+            if self._is_known_missing(token_keys):
+                return (None, None) if type is None else None
+            pipelined = self.token_read_pipelined if pipelined is None else pipelined
+            result = None if type is None or not pipelined else self._get_shared_cached(token_keys[0], token)
+            if result is None:
+                for client in self._get_read_clients(rd, key, read_rd, replica=pipelined):
+                    found = await self._lookup_type_token(rd=client, token=token, type=type, pipelined=pipelined)
+                    result = found if result is None else tuple(a or b for a, b in zip(result, found)) if type is None else found
+                    if not (None in result if type is None else result is None):
+                        break
+                self._note_missing(k for k, v in zip(token_keys, result if type is None else (result,)) if v is None)
+                if type is not None and result is not None:
+                    self._put_shared_cached(token_keys[0], result)
+            rd = self._get_key_client(rd, key)
+            if self.sliding_expiration:
+                for type_, token_info in zip(("ACCESS", "REFRESH") if type is None else (type,), result if type is None else (result,)):
+                    if token_info is not None:
+                        await self._note_token_usage(rd, token_info.token, token_info.info.uid, type_)
+            return result
+
+    async def _note_token_usage(self, rd: AsyncRedis, token: RawToken, identify: UserIdentify, type: TokenType) -> None:
+        """사용된 토큰과 유저 토큰 목록의 만료 시간 갱신을 기록
+
+        * ``sliding_expiration`` 일 때 사용
+        * ``token_store`` 가 있으면 바로 갱신
+        """
+        _, token_expire = self._get_type_token_config(type)
+        keys = (
+            self._get_token_key_handler(type)(token),
+            self._get_user_token_key_handler(type)(identify),
+        )
+        if self.token_store is not None:
+            await self.token_store.expire(keys, token_expire)
         else:
+            self.get_sliding_expiration().note(rd, keys, token_expire)
+            if (owner_prefix := self._get_issue_owner_prefix()) is not None:
+                self.get_sliding_expiration().note(rd, (owner_prefix + keys[0],), token_expire + OWNER_EXPIRE_GRACE)
+
+    async def _lookup_type_token(
+            self,
+            rd: AsyncRedis,
+            token: RawToken,
+            type: Optional[TokenType] = None,
+            pipelined: Optional[bool] = None,
+    ) -> Optional[TI | tuple[TI, TI]]:
+        """``get_type_token`` 의 조회 부분
+
+        * class 내부 사용
+        """
+        types = ("ACCESS", "REFRESH") if type is None else (type,)
+        store = self._get_token_store(rd, watch_reads=not (self.token_read_pipelined if pipelined is None else pipelined))
+        result = [
+            self._decode_token_info(record, token, ttl)
+            for record, ttl in await store.get_with_ttl([self._get_token_key_handler(i)(token) for i in types])
+        ]
+        return tuple(result) if type is None else result[0]
+
+    async def get_type_tokens(
+            self,
+            rd: AsyncRedis,
+            tokens: Sequence[RawToken],
+            type: TokenType = "ACCESS",
+    ) -> list[Optional[TI]]:
+        """여러 토큰을 한번에 조회, ``get_token_loader`` 의 batch 함수
+
+        * hash tag 를 사용하지 않으면 round trip 한번, 사용하면 tag 별로 동시에 조회
+        * ``negative_cache`` / ``shared_cache_path`` / ``sliding_expiration`` 은 ``get_type_token`` 과 같음
+        * replica 는 사용하지 않음, rebalance 중 새 노드에 없는 토큰은 한 건씩 다시 조회
+
+        Returns:
+            ``tokens`` 순서대로 ``TokenInfo``, 없으면 ``None``
+        """
+        with measure(self.token_metrics, f"get_{type.lower()}_tokens"):
             get_token_key = self._get_token_key_handler(type)
-            token_key = get_token_key(token)
-            return await rd.transaction(
-                partial(
-                    self._get_token_transaction,
-                    raw_token=token,
-                    key=token_key,
-                    **kwargs
-                ),
-                token_key,
-                value_from_callable=True
-            )
+            results: list[Optional[TI]] = [None] * len(tokens)
+            pending: list[int] = []
+            for index, token in enumerate(tokens):
+                if not self._verify_raw_token(token) or self._is_known_missing((get_token_key(token),)):
+                    continue
+                if (cached := self._get_shared_cached(get_token_key(token), token)) is not None:
+                    results[index] = cached
+                else:
+                    pending.append(index)
+
+            token_keys = [get_token_key(tokens[i]) for i in pending]
+            missing: list[TokenKey] = []
+            for index, token_key, (record, ttl) in zip(pending, token_keys, await self._get_token_records(rd, token_keys)):
+                if record is None and self._get_previous_key_client(rd, token_key) is not None:
+                    results[index] = await self.get_type_token(rd, tokens[index], type)
+                elif (token_info := self._decode_token_info(record, tokens[index], ttl)) is None:
+                    missing.append(token_key)
+                else:
+                    results[index] = token_info
+                    self._put_shared_cached(token_key, token_info)
+            self._note_missing(missing)
+
+            if self.sliding_expiration:
+                for token_info in results:
+                    if token_info is not None:
+                        await self._note_token_usage(
+                            self._get_key_client(rd, get_token_key(token_info.token)),
+                            token_info.token,
+                            token_info.info.uid,
+                            type,
+                        )
+            return results
+
+    async def get_token_fields(
+            self,
+            rd: AsyncRedis,
+            token: RawToken,
+            fields: Sequence[str],
+            type: TokenType = "ACCESS",
+            read_rd: Optional[AsyncRedis] = None,
+    ) -> Optional[TokenFields]:
+        """토큰의 ``fields`` 만 조회
+
+        ``token_codec.hashed`` 면 ``HMGET`` 으로 요청한 필드만 가져오고 접근한 필드만 decode 함
+
+        * 필드 이름은 ``uid`` ``idf`` 같은 토큰 필드 또는 ``payload.{key}``
+        * 레코드에 없는 필드는 ``None``
+        * hash 레코드가 아니면 전체를 읽어서 필드를 골라냄
+        * ``sliding_expiration`` 이면 만료 시간 연장을 위해 ``uid`` 도 함께 조회
+
+        Args:
+            rd: Async Redis Client
+            token: Raw Token
+            fields: 가져올 필드 이름
+            type: ACCESS or REFRESH
+            read_rd: 조회에 사용할 replica Client, ``get_type_token`` 과 같음
+
+        Returns:
+            ``TokenFields``, 토큰이 없으면 ``None``
+        """
+        with measure(self.token_metrics, f"get_{type.lower()}_token_fields"):
+            if not self._verify_raw_token(token):
+                return None
+            token_key = self._get_token_key_handler(type)(token)
+            if self._is_known_missing((token_key,)):
+                return None
+            names = list(fields)
+            if self.sliding_expiration and "uid" not in names:
+                names.append("uid")
+
+            for client in self._get_read_clients(rd, token_key, read_rd):
+                store = self._get_token_store(client)
+                if self.token_codec.hashed:
+                    [(values, ttl)] = await store.get_fields([token_key], names)
+                    if values is not None:
+                        result = TokenFields(dict(zip(names, values)), token, ttl)
+                        break
+                else:
+                    [(record, ttl)] = await store.get_with_ttl([token_key])
+                    if (_token := self._decode_token(record)) is not None:
+                        result = TokenFields(project_token(_token, names), token, ttl, decode=lambda value: value)
+                        break
+            else:
+                self._note_missing((token_key,))
+                return None
+            rd = self._get_key_client(rd, token_key)
+
+            if self.sliding_expiration:
+                await self._note_token_usage(rd, token, result["uid"], type)
+            return result
 
     async def get_access_token(
             self,
             rd: AsyncRedis,
             token: RawToken,
+            pipelined: Optional[bool] = None,
+            read_rd: Optional[AsyncRedis] = None,
     ) -> Optional[TI]:
-        return await self.get_type_token(rd=rd, token=token, type="ACCESS")
+        return await self.get_type_token(rd=rd, token=token, type="ACCESS", pipelined=pipelined, read_rd=read_rd)
 
     async def get_refresh_token(
             self,
             rd: AsyncRedis,
             token: RawToken,
+            pipelined: Optional[bool] = None,
+            read_rd: Optional[AsyncRedis] = None,
     ) -> Optional[TI]:
-        return await self.get_type_token(rd=rd, token=token, type="REFRESH")
+        return await self.get_type_token(rd=rd, token=token, type="REFRESH", pipelined=pipelined, read_rd=read_rd)
 
     async def _get_user_type_tokens(
             self,
             rd: AsyncRedis,
             identify: UserIdentify,
             type: TokenType = "ACCESS",
+            read_rd: Optional[AsyncRedis] = None,
     ) -> list[TI]:
-        get_token_key = self._get_token_key_handler(type)
-        get_user_token_key = self._get_user_token_key_handler(type)
+        """유저의 토큰 목록
 
-        key = get_user_token_key(identify)
-
-        await self._manage_user_token(rd=rd, key=key)
-        res: list[TI] = await rd.transaction(
-            partial(
-                self._get_user_tokens_transaction,
-                key=key,
-                token=self._Token,
-                token_info=self._TokenInfo,
-                token_validator=self._token_validator,
-            ),
-            key,
-            value_from_callable=True
-        )
-        res.sort(key=lambda t: t['expires_in'])
-
-        return res
+        * 정리는 primary 에서 하고 목록은 replica 가 있으면 replica 에서 ``WATCH`` 없이 조회,
+          replica 지연 만큼 방금 발급 된 토큰이 빠질 수 있음
+        """
+        with measure(self.token_metrics, f"get_user_{type.lower()}_tokens"):
+            get_token_key = self._get_token_key_handler(type)
+            get_user_token_key = self._get_user_token_key_handler(type)
+
+            key = get_user_token_key(identify)
+            await self._get_token_store(self._get_key_client(rd, key)).cleanup(key, None, prune=not self.token_reaper)
+
+            clients = self._get_read_clients(rd, key, read_rd)
+            if (primary := self._get_key_client(rd, key)) is not clients[0]:
+                # replica 가 있으면 primary 는 조회하지 않음
+                clients.remove(primary)
+            records = []
+            for client in clients:
+                records += await self._get_token_store(client, watch_reads=client is primary).list_user(key)
+            res: list[TI] = [
+                token_info
+                for token_key, record, ttl in records
+                if ttl > 5 and (token_info := self._decode_token_info(record, self._get_raw_token(token_key), ttl)) is not None
+            ]
+            res.sort(key=lambda t: t.expires_in)
+
+            return res
 
     async def get_user_access_tokens(
             self,
             rd: AsyncRedis,
-            identify: UserIdentify
+            identify: UserIdentify,
+            read_rd: Optional[AsyncRedis] = None,
     ) -> list[TI]:
         return await self._get_user_type_tokens(
             rd=rd,
             identify=identify,
-            type="ACCESS"
+            type="ACCESS",
+            read_rd=read_rd,
         )
 
     async def get_user_refresh_tokens(
             self,
             rd: AsyncRedis,
-            identify: UserIdentify
+            identify: UserIdentify,
+            read_rd: Optional[AsyncRedis] = None,
     ) -> list[TI]:
         return await self._get_user_type_tokens(
             rd=rd,
             identify=identify,
-            type="REFRESH"
+            type="REFRESH",
+            read_rd=read_rd,
         )
 
+    async def _get_token_records(
+            self,
+            rd: AsyncRedis,
+            token_keys: list[TokenKey],
+    ) -> list[tuple[Optional[RawRecord], int]]:
+        """토큰 키 별 ``(레코드, 남은 시간)``, hash tag 를 사용하면 tag 별로 나누어 동시에 조회
+
+        * class 내부 사용
+        """
+        def group(indexes: Iterable[int], get_client: Callable[[TokenKey], Optional[AsyncRedis]]) -> dict[tuple[AsyncRedis, str], list[int]]:
+            groups: dict[tuple[AsyncRedis, str], list[int]] = {}
+            for index in indexes:
+                if (client := get_client(token_keys[index])) is not None:
+                    tag = get_key_tag(token_keys[index]) if self._uses_hash_tags() else ""
+                    groups.setdefault((client, tag), []).append(index)
+            return groups
+
+        records: list[tuple[Optional[RawRecord], int]] = [(None, -2)] * len(token_keys)
+
+        async def read(client: AsyncRedis, indexes: list[int]) -> None:
+            for index, record in zip(indexes, await self._get_token_store(client).get_with_ttl([token_keys[i] for i in indexes])):
+                records[index] = record
+
+        groups = group(range(len(token_keys)), partial(self._get_key_client, rd))
+        await asyncio.gather(*(read(client, indexes) for (client, _), indexes in groups.items()))
+        # rebalance 중 아직 옮겨지지 않은 토큰은 이전 노드에서 읽음
+        missing = (index for index, (record, _) in enumerate(records) if record is None)
+        groups = group(missing, partial(self._get_previous_key_client, rd))
+        await asyncio.gather(*(read(client, indexes) for (client, _), indexes in groups.items()))
+        return records
+
+    async def get_session_page(
+            self,
+            rd: AsyncRedis,
+            type: TokenType = "ACCESS",
+            order: SessionOrder = "expiry",
+            min: Score = "-inf",
+            max: Score = "+inf",
+            count: int = 100,
+            cursor: Optional[str] = None,
+            reverse: bool = False,
+    ) -> SessionPage[T]:
+        """전역 세션 index 에서 유저와 상관없이 토큰 한 페이지 조회
+
+        ``session_index`` 면 발급 / 취소 시 토큰 키를 만료 시각, 발급 시각 순 sorted set 에 기록함
+
+        * ``min`` / ``max`` 는 epoch 초, ex. 1시간 안에 만료: ``order="expiry", min=now, max=now + 3600``
+        * 최근 발급 N 개: ``order="issued", reverse=True, count=N``
+        * 전체를 읽지 않고 ``cursor`` 로 이어서 읽음, 페이지 사이의 발급 / 취소 로 중복 / 누락 되지 않음
+        * 저장소에 없는 (만료 / 다른 경로로 취소 된) 토큰은 index 에서 지우고 건너뛰므로
+          페이지가 ``count`` 보다 작을 수 있음
+        * ``sliding_expiration`` 으로 연장 된 토큰은 ``trim_session_index`` 전까지 발급 때의 만료 시각 순서
+
+        Args:
+            rd: Async Redis Client
+            type: ACCESS or REFRESH
+            order: ``expiry`` (만료 시각) or ``issued`` (발급 시각)
+            min: 최소 시각
+            max: 최대 시각
+            count: 페이지 크기
+            cursor: 이전 페이지의 ``cursor``
+            reverse: 내림차순
+
+        Returns:
+            ``SessionPage``, 마지막 페이지면 ``cursor`` 가 ``None``
+
+        Raises:
+            ValueError: ``count`` 가 1 보다 작음
+        """
+        if not self.session_index or self.token_store is not None:
+            raise AttributeError("session_index must be set to use the session index")
+        with measure(self.token_metrics, f"get_{type.lower()}_session_page"):
+            expiry_key, issued_key = self._get_session_index_keys(type)
+            key = expiry_key if order == "expiry" else issued_key
+            client = await self._merge_session_index(rd, type)
+            entries, cursor = await read_index_page(client, key, min, max, count, cursor, reverse)
+            token_keys = [member for member, _ in entries]
+
+            sessions: list[TokenInfo[T]] = []
+            stale: list[TokenKey] = []
+            for token_key, (record, ttl) in zip(token_keys, await self._get_token_records(rd, token_keys)):
+                if record is None:
+                    # rebalance 중이면 이전 노드에 있을 수 있으므로 지우지 않음
+                    if self._get_previous_key_client(rd, token_key) is None:
+                        stale.append(token_key)
+                elif (token_info := self._decode_token_info(record, self._get_raw_token(token_key), ttl)) is not None:
+                    sessions.append(token_info)
+            await self._unindex_sessions(rd, type, stale)
+            return SessionPage(sessions, cursor)
+
+    async def iter_sessions(
+            self,
+            rd: AsyncRedis,
+            type: TokenType = "ACCESS",
+            order: SessionOrder = "expiry",
+            min: Score = "-inf",
+            max: Score = "+inf",
+            page_size: int = 100,
+            reverse: bool = False,
+    ) -> AsyncIterator[TokenInfo[T]]:
+        """``get_session_page`` 를 ``page_size`` 씩 이어서 읽으며 토큰을 하나씩 반환"""
+        cursor = None
+        while True:
+            page = await self.get_session_page(rd, type, order, min, max, page_size, cursor, reverse)
+            for token_info in page.sessions:
+                yield token_info
+            if (cursor := page.cursor) is None:
+                return
+
+    async def trim_session_index(
+            self,
+            rd: AsyncRedis,
+            type: Optional[TokenType] = None,
+            batch_size: Optional[int] = None,
+    ) -> int:
+        """만료 시각이 지난 index 항목을 정리하고 지운 갯수 반환
+
+        * 토큰이 없으면 두 index 에서 지움
+        * ``sliding_expiration`` 등으로 아직 살아있으면 만료 시각을 남은 시간으로 갱신
+        * ``batch_size`` 개씩 나누어 처리, 없으면 ``bulk_chunk_size``
+        * ``token_reaper`` 면 reaper 가 한 바퀴 돌 때마다 공유 Redis Client 로 실행
+
+        Args:
+            rd: Async Redis Client
+            type: ACCESS or REFRESH, None 이면 둘 다
+            batch_size: 한번에 확인할 토큰 갯수
+        """
+        if not self.session_index or self.token_store is not None:
+            raise AttributeError("session_index must be set to use the session index")
+        with measure(self.token_metrics, "trim_session_index"):
+            batch_size = batch_size or self.bulk_chunk_size
+            removed = 0
+            now = time()
+            for type_ in (("ACCESS", "REFRESH") if type is None else (type,)):
+                expiry_key, _ = self._get_session_index_keys(type_)
+                client = await self._merge_session_index(rd, type_)
+                cursor = None
+                while True:
+                    entries, cursor = await read_index_page(client, expiry_key, "-inf", now, batch_size, cursor)
+                    token_keys = [member for member, _ in entries]
+                    records = await self._get_token_records(rd, token_keys)
+                    stale = [
+                        token_key for token_key, (record, _) in zip(token_keys, records)
+                        if record is None and self._get_previous_key_client(rd, token_key) is None
+                    ]
+                    alive = {
+                        token_key: now + ttl for token_key, (record, ttl) in zip(token_keys, records)
+                        if record is not None and ttl > 0
+                    }
+                    if len(alive) != 0:
+                        await client.zadd(expiry_key, alive, xx=True)
+                    await self._unindex_sessions(rd, type_, stale)
+                    removed += len(stale)
+                    if cursor is None:
+                        break
+            return removed
+
     async def _abort_user_type_token(
             self,
             rd: AsyncRedis,
@@ -575,14 +1586,36 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             type: TokenType,
             user_tokens: list[RawToken] | None = None,
     ) -> None:
-        get_token_key = self._get_token_key_handler(type)
-        get_user_token_key = self._get_user_token_key_handler(type)
-        user_token_key = get_user_token_key(identify)
+        with measure(self.token_metrics, f"abort_user_{type.lower()}_token"):
+            get_token_key = self._get_token_key_handler(type)
+            get_user_token_key = self._get_user_token_key_handler(type)
+            user_token_key = get_user_token_key(identify)
+            token_keys = None if not user_tokens else [get_token_key(i) for i in user_tokens]
+            previous = self._get_previous_key_client(rd, user_token_key)
+            if token_keys is not None:
+                aborted = token_keys
+            elif self.get_shared_cache() is not None or (self.session_index and self.token_store is None):
+                # 유저 전체 취소는 취소 전에 토큰 키를 읽어 cache / index 에서 지움
+                aborted = await self._get_user_token_keys(rd, user_token_key)
+            else:
+                aborted = []
+            await self._get_token_store(self._get_key_client(rd, user_token_key)).abort(user_token_key, token_keys)
+            if previous is not None:
+                await self._get_token_store(previous).abort(user_token_key, token_keys)
+            self._note_aborted(aborted)
+            await self._unindex_sessions(rd, type, aborted)
+
+    async def _get_user_token_keys(self, rd: AsyncRedis, user_token_key: UserTokenKey) -> list[TokenKey]:
+        """유저의 토큰 키 목록, rebalance 중이면 이전 노드의 목록도 포함
 
-        await rd.transaction(
-            partial(self._abort_user_token_transaction, key=user_token_key, get_token_key=get_token_key, user_tokens=user_tokens),
-            user_token_key
-        )
+        * class 내부 사용
+        """
+        if self.token_store is not None:
+            return [token_key for token_key, *_ in await self.token_store.list_user(user_token_key)]
+        token_keys = list(await self._get_key_client(rd, user_token_key).smembers(user_token_key))
+        if (previous := self._get_previous_key_client(rd, user_token_key)) is not None:
+            token_keys += await previous.smembers(user_token_key)
+        return token_keys
 
     async def abort_user_access_token(
             self,
@@ -616,18 +1649,171 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
         else:
             raise ValueError('user Token error')
 
+    async def abort_tokens_bulk(
+            self,
+            rd: AsyncRedis,
+            type: Optional[TokenType] = None,
+            identify_pattern: str = "*",
+            token_filter: Optional[Callable[[T], bool]] = None,
+            batch_size: Optional[int] = None,
+            on_progress: Optional[Callable[[BulkAbortProgress], Any]] = None,
+    ) -> BulkAbortProgress:
+        """여러 유저의 토큰을 한번에 취소
+
+        유저 토큰 키를 ``SCAN`` 으로 순회하며 ``batch_size`` 단위로 pipeline 처리함
+
+        * 한 명령에 들어가는 키 갯수도 ``batch_size`` 로 제한됨
+        * 토큰 키는 ``UNLINK`` 로 삭제
+        * ``redis_cluster`` / ``redis_sharded`` 면 노드별로 동시에 ``SCAN``
+
+        Args:
+            rd: Async Redis Client
+            type: ACCESS or REFRESH, None 이면 둘 다
+            identify_pattern: uid 에 적용할 glob 패턴 (ex. ``tenant-1:*``)
+            token_filter: 지정하면 ``True`` 를 반환한 토큰만 취소 (payload 조건 등)
+            batch_size: 한번에 처리할 유저 수, 없으면 ``bulk_chunk_size``
+            on_progress: batch 마다 호출, coroutine 이면 await 함
+
+        Returns:
+            최종 진행 상황
+        """
+        with measure(self.token_metrics, "abort_tokens_bulk"):
+            batch_size = batch_size or self.bulk_chunk_size
+            progress = BulkAbortProgress()
+            if self.token_store is not None:
+                for type_ in (("ACCESS", "REFRESH") if type is None else (type,)):
+                    match = self._get_user_token_key_pattern(type_, identify_pattern)
+                    await self._abort_store_tokens_scan(self.token_store, match, token_filter, batch_size, progress, on_progress)
+                return progress
+            clients = self._get_primary_clients(rd)
+            for type_ in (("ACCESS", "REFRESH") if type is None else (type,)):
+                match = self._get_user_token_key_pattern(type_, identify_pattern)
+                await asyncio.gather(*(
+                    self._abort_tokens_scan(client, match, token_filter, batch_size, progress, on_progress, type_, rd)
+                    for client in clients
+                ))
+            return progress
+
+    async def _abort_tokens_scan(
+            self,
+            rd: AsyncRedis,
+            match: str,
+            token_filter: Optional[Callable[[T], bool]],
+            batch_size: int,
+            progress: BulkAbortProgress,
+            on_progress: Optional[Callable[[BulkAbortProgress], Any]],
+            type: TokenType = "ACCESS",
+            index_rd: Optional[AsyncRedis] = None,
+    ) -> None:
+        """한 노드의 유저 토큰 키를 ``SCAN`` 하며 batch 단위로 취소
+
+        * class 내부 사용
+        """
+        batch: list[UserTokenKey] = []
+        async for key in scan_iter(rd, match, batch_size):
+            batch.append(key)
+            if len(batch) < batch_size:
+                continue
+            await self._abort_user_tokens_batch(rd, batch, token_filter, batch_size, progress, type, index_rd)
+            batch = []
+            if on_progress is not None and isawaitable((r := on_progress(progress))):
+                await r
+        if len(batch) != 0:
+            await self._abort_user_tokens_batch(rd, batch, token_filter, batch_size, progress, type, index_rd)
+            if on_progress is not None and isawaitable((r := on_progress(progress))):
+                await r
+
+    async def _abort_store_tokens_scan(
+            self,
+            store: TokenStore,
+            match: str,
+            token_filter: Optional[Callable[[T], bool]],
+            batch_size: int,
+            progress: BulkAbortProgress,
+            on_progress: Optional[Callable[[BulkAbortProgress], Any]],
+    ) -> None:
+        """``token_store`` 의 유저 토큰 키를 순회하며 취소
+
+        * class 내부 사용
+        """
+        async for key in store.scan_user_keys(match, batch_size):
+            token_keys = [
+                token_key for token_key, record, _ in await store.list_user(key)
+                if token_filter is None or ((_token := self._decode_token(record)) is not None and token_filter(_token))
+            ]
+            if len(token_keys) != 0:
+                self._note_aborted(token_keys)
+                await store.abort(key, token_keys)
+            progress.aborted_tokens += len(token_keys)
+            progress.scanned_users += 1
+            if progress.scanned_users % batch_size == 0 and on_progress is not None and isawaitable((r := on_progress(progress))):
+                await r
+        if on_progress is not None and isawaitable((r := on_progress(progress))):
+            await r
+
+    async def _abort_user_tokens_batch(
+            self,
+            rd: AsyncRedis,
+            keys: list[UserTokenKey],
+            token_filter: Optional[Callable[[T], bool]],
+            batch_size: int,
+            progress: BulkAbortProgress,
+            type: TokenType = "ACCESS",
+            index_rd: Optional[AsyncRedis] = None,
+    ) -> None:
+        """``abort_tokens_bulk`` 의 batch 하나를 처리
+
+        * class 내부 사용
+        * ``index_rd`` 는 전역 세션 index 를 갱신할 Client, 없으면 ``rd``
+        """
+        async with pipeline(rd, False) as pipe:
+            for key in keys:
+                _: Awaitable = pipe.smembers(key)
+            members: list[set[TokenKey]] = await pipe.execute()
+
+        if token_filter is not None:
+            async with pipeline(rd, False) as pipe:
+                for tokens in members:
+                    for token_key in tokens:
+                        _: Awaitable = pipe.hgetall(token_key) if self.token_codec.hashed else pipe.get(token_key)
+                records = iter(await pipe.execute())
+            members = [
+                {i for i in tokens if (_token := self._decode_token(next(records) or None)) is not None and token_filter(_token)}
+                for tokens in members
+            ]
+
+        async with pipeline(rd, False) as pipe:
+            for key, tokens in zip(keys, members):
+                tokens = list(tokens)
+                self._note_aborted(tokens)
+                for start in range(0, len(tokens), batch_size):
+                    _: Awaitable = pipe.unlink(*tokens[start:start + batch_size])
+                    _: Awaitable = pipe.srem(key, *tokens[start:start + batch_size])
+            if len(pipe) != 0:
+                # SCAN 이후 만료 되었거나 다른 곳에서 지운 토큰은 세지 않음
+                progress.aborted_tokens += sum((await pipe.execute())[::2])
+        progress.scanned_users += len(keys)
+        aborted = [i for tokens in members for i in tokens]
+        for start in range(0, len(aborted), batch_size):
+            await self._unindex_sessions(rd if index_rd is None else index_rd, type, aborted[start:start + batch_size])
+
     async def abort_token(
             self,
             rd: AsyncRedis,
             token: RawToken,
     ) -> None:
-        get_access_token_key = self._get_token_key_handler("ACCESS")
-        get_refresh_token_key = self._get_token_key_handler("REFRESH")
-
-        await asyncio.gather(
-            rd.delete(get_access_token_key(token)),
-            rd.delete(get_refresh_token_key(token))
-        )
+        with measure(self.token_metrics, "abort_token"):
+            if not self._verify_raw_token(token):
+                return
+            get_access_token_key = self._get_token_key_handler("ACCESS")
+            get_refresh_token_key = self._get_token_key_handler("REFRESH")
+            token_keys = [get_access_token_key(token), get_refresh_token_key(token)]
+            self._note_aborted(token_keys)
+            await self._get_token_store(self._get_key_client(rd, token_keys[0])).delete(token_keys)
+            if (previous := self._get_previous_key_client(rd, token_keys[0])) is not None:
+                await self._get_token_store(previous).delete(token_keys)
+            await self._unindex_sessions(rd, "ACCESS", token_keys[:1])
+            await self._unindex_sessions(rd, "REFRESH", token_keys[1:])
 
     async def _abort_type_token(
             self,
@@ -635,8 +1821,15 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             token: RawToken,
             type: TokenType
     ) -> None:
-        token_key = self._get_token_key_handler(type)(token)
-        await rd.delete(token_key)
+        with measure(self.token_metrics, f"abort_{type.lower()}_token"):
+            if not self._verify_raw_token(token):
+                return
+            token_key = self._get_token_key_handler(type)(token)
+            self._note_aborted((token_key,))
+            await self._get_token_store(self._get_key_client(rd, token_key)).delete([token_key])
+            if (previous := self._get_previous_key_client(rd, token_key)) is not None:
+                await self._get_token_store(previous).delete([token_key])
+            await self._unindex_sessions(rd, type, [token_key])
 
     async def abort_access_token(
             self,
@@ -650,4 +1843,109 @@ class TokenBaseMixin(Generic[T, TI], MixinBase, TransactionCore):
             rd: AsyncRedis,
             token: RawToken,
     ) -> None:
-        await self._abort_type_token(rd=rd, token=token, type='REFRESH')
\ No newline at end of file
+        await self._abort_type_token(rd=rd, token=token, type='REFRESH')
+
+    async def rotate_refresh_token(
+            self,
+            rd: AsyncRedis,
+            token: RawToken,
+            payload: Optional[TokenPayload] = None,
+            **kwargs
+    ) -> Optional[tuple[TI, TI]]:
+        """refresh 토큰을 취소하고 새 access / refresh 토큰 발급
+
+        기존 토큰 확인, 취소, 새 토큰 등록이 저장소 호출 한번 (Redis 는 Lua script) 으로 처리 됨
+
+        * 교체된 토큰은 ``refresh_token_expire`` 동안 사용 기록이 남음
+        * 교체된 토큰이 다시 사용되면 같은 family (최초 발급 이후 교체로 이어진 토큰들) 를 모두 취소
+        * family 로 기록되는 것은 교체로 발급 된 토큰만 해당
+
+        Args:
+            rd: Async Redis Client
+            token: 현재 refresh 토큰
+            payload: 새 토큰의 payload, 없으면 기존 payload 사용
+            **kwargs: ``create_token`` 인자로 넘어감
+
+        Returns:
+            ``(access TokenInfo, refresh TokenInfo)``, 토큰이 없으면 ``None``
+
+        Raises:
+            TokenReuseError: 이미 교체된 토큰
+        """
+        with measure(self.token_metrics, "rotate_refresh_token"):
+            if not self._verify_raw_token(token):
+                return None
+            token_key = self._get_refresh_token_key(token)
+            used_key = self._format_token_key(self.refresh_token_used_key, token)
+            family_prefix = self._get_token_family_prefix(token)
+            store = self._get_token_store(self._get_key_client(rd, token_key))
+
+            [(record, _)] = await store.get_with_ttl([token_key])
+            if record is None and (previous := self._get_previous_key_client(rd, token_key)) is not None:
+                # rebalance 중 아직 옮겨지지 않은 토큰은 새 노드로 먼저 옮긴 후 교체
+                [(previous_record, _)] = await self._get_token_store(previous).get_with_ttl([token_key])
+                if (moving := self._decode_token(previous_record)) is not None:
+                    await move_keys(previous, self._get_key_client(rd, token_key), [
+                        token_key,
+                        self._format_token_key(self.refresh_token_family_key, token),
+                        self._get_user_access_token_key(moving.uid),
+                        self._get_user_refresh_token_key(moving.uid),
+                    ])
+                    [(record, _)] = await store.get_with_ttl([token_key])
+            if (old := self._decode_token(record)) is None:
+                revoked: list[TokenKey] = []
+                if await store.revoke_reused(used_key, family_prefix, revoked):
+                    await self._note_deleted(rd, revoked)
+                    raise TokenReuseError(token)
+                return None
+
+            access_limit, access_expire = self._get_type_token_config("ACCESS")
+            refresh_limit, refresh_expire = self._get_type_token_config("REFRESH")
+            payload = old.payload if payload is None else payload
+            while True:
+                access = replace(
+                    self._make_token(token=Token(uid=old.uid, payload=payload)),
+                    token=self._create_raw_token(old.uid, **kwargs),
+                    expires_in=access_expire,
+                )
+                refresh = replace(
+                    self._make_token(token=Token(uid=old.uid, payload=payload)),
+                    token=self._create_raw_token(old.uid, **kwargs),
+                    expires_in=refresh_expire,
+                )
+                result = await store.rotate(rotation := TokenRotation(
+                    token_key=token_key,
+                    record=record,
+                    used_key=used_key,
+                    family_pointer_key=self._format_token_key(self.refresh_token_family_key, token),
+                    family_prefix=family_prefix,
+                    family=uuid4().hex,
+                    access=TokenIssue(
+                        user_token_key=self._get_user_access_token_key(old.uid),
+                        token_key=self._get_access_token_key(access.token),
+                        record=self.token_codec.encode(access.info),
+                        expire=access_expire,
+                        limit=access_limit,
+                    ),
+                    refresh=TokenIssue(
+                        user_token_key=self._get_user_refresh_token_key(old.uid),
+                        token_key=self._get_refresh_token_key(refresh.token),
+                        record=self.token_codec.encode(refresh.info),
+                        expire=refresh_expire,
+                        limit=refresh_limit,
+                    ),
+                    refresh_family_pointer_key=self._format_token_key(self.refresh_token_family_key, refresh.token),
+                    owner_prefix=self._get_issue_owner_prefix(),
+                ))
+                # 교체한 토큰, limit 때문에 지운 토큰, 재사용이면 family 의 토큰 전부
+                await self._note_deleted(rd, rotation.deleted)
+                if result == RotateResult.ROTATED:
+                    access_key, refresh_key = self._get_access_token_key(access.token), self._get_refresh_token_key(refresh.token)
+                    self._note_issued((access_key, refresh_key))
+                    await self._index_sessions(rd, "ACCESS", [access_key], access_expire)
+                    await self._index_sessions(rd, "REFRESH", [refresh_key], refresh_expire)
+                    return access, refresh
+                if result == RotateResult.REUSED:
+                    raise TokenReuseError(token)
+                if result == RotateResult.MISSING:
+                    return None
@@ -43,6 +43,8 @@ MethodType = Literal["get", "post", "put", "delete", "patch", "head", "options",
 
 TokenType = Literal["ACCESS", "REFRESH"]
 
+SessionOrder = Literal["expiry", "issued"]
+
 RawToken = str
 
 TokenLimit = int
@@ -57,12 +59,15 @@ UserIdentify = Union[int, str]
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """토큰 Base
 
         다른 토큰 Mixin 생성시 이것을 상속 받을 것
 
+        * 요청마다 만들어지므로 ``__dict__`` 없이 ``__slots__`` 만 사용,
+          상속한 class 도 ``slots=True`` 를 지정해야 ``__dict__`` 가 생기지 않음
+
         Attributes:
             payload:
                 토큰 페이 로드
@@ -73,34 +78,62 @@ class Token:
     uid: UserIdentify
 
 
-@dataclass
+@dataclass(slots=True)
 class OpaqueToken(Token):
-    idf: TokenIdentify = field(default=lambda x: uuid.uuid4().hex)
+    idf: TokenIdentify = field(default_factory=lambda: uuid.uuid4().hex)
 
 
-@dataclass
+@dataclass(slots=True)
 class JWTToken(Token):
-    jti: TokenIdentify = field(default=lambda x: uuid.uuid4().hex)
+    jti: TokenIdentify = field(default_factory=lambda: uuid.uuid4().hex)
 
 
 T = TypeVar('T', bound=Token)
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenInfo(Generic[T]):
     info: T
     token: Optional[RawToken] = ''
     expires_in: Optional[TokenExpire] = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class OpaqueTokenInfo(TokenInfo[OpaqueToken]):
     info: OpaqueToken
 
 
-@dataclass
+@dataclass(slots=True)
 class JWTTokenInfo(TokenInfo[JWTToken]):
     info: JWTToken
 
 
+@dataclass
+class BulkAbortProgress:
+    """대량 토큰 취소 진행 상황
+
+    Attributes:
+        scanned_users: 확인한 유저 토큰 키 갯수
+        aborted_tokens: 취소한 토큰 갯수
+    """
+    scanned_users: int = 0
+    aborted_tokens: int = 0
+
+
+@dataclass
+class SessionPage(Generic[T]):
+    """전역 세션 index 조회 한 페이지
+
+    Attributes:
+        sessions: index 순서대로 살아있는 토큰
+        cursor: 다음 페이지 cursor, 마지막 페이지면 ``None``
+    """
+    sessions: list[TokenInfo[T]]
+    cursor: Optional[str] = None
+
+
+class TokenReuseError(Exception):
+    """이미 교체된 refresh 토큰이 다시 사용됨
 
+    해당 토큰에서 이어진 토큰들은 모두 취소 된 상태
+    """
@@ -14,6 +14,7 @@ from fastapi import Response
 from fastapi.params import Depends
 
 from .resource import Resource
+from .bulkhead import Bulkhead, BulkheadConfig, BulkheadStats
 from .types import (
     MethodDocument,
     DecoratedCallable,
@@ -91,6 +92,7 @@ class Namespace(APIRouter):
         self.head = None
         self.patch = None
         self.trace = None
+        self.bulkheads: dict[str, Bulkhead] = {}
 
     def route(
             self,
@@ -258,6 +260,21 @@ class Namespace(APIRouter):
                                                                  None)) is None else f"{summary} {default_summary}"
         })
         func.__func__.__meth_doc__ = delete_none(kwargs)
+        route_kwargs = func.__func__.__meth_doc__
+
+        # doc 의 bulkhead 가 Resource class 설정보다 우선
+        bulkhead_config: Optional[BulkheadConfig] = getattr(func.__func__, "__bulkhead__", None)
+        if bulkhead_config is None:
+            bulkhead_config = func.__self__.get_bulkhead_config(method)
+        if bulkhead_config is not None:
+            bulkhead = Bulkhead(bulkhead_config)
+            # 같은 Resource 를 여러 경로에 붙여도 따로 집계 되도록 경로로 구분
+            self.bulkheads[f"{method.upper()} {self.prefix}{path}"] = bulkhead
+            # 다른 dependency 보다 먼저 자리를 확인
+            route_kwargs = {
+                **route_kwargs,
+                "dependencies": [Depends(bulkhead.dependency), *route_kwargs.get("dependencies", [])],
+            }
 
         new_func = func.__self__.get_method_handler(
             func
@@ -266,9 +283,13 @@ class Namespace(APIRouter):
             path=path,
             endpoint=new_func,
             methods=[method.upper()],
-            **func.__func__.__meth_doc__
+            **route_kwargs
         )
 
+    def get_bulkhead_stats(self) -> dict[str, BulkheadStats]:
+        """``{METHOD} {prefix 포함 경로}`` 별 ``BulkheadStats``, ex. ``GET /items/{id}``"""
+        return {key: value.stats() for key, value in self.bulkheads.items()}
+
     @staticmethod
     def doc(
             summary: str | None = None,
@@ -293,7 +314,12 @@ class Namespace(APIRouter):
             response_class: Type[Response] = ORJSONResponse,
             openapi_extra: dict[str, Any] | None = None,
             generate_unique_id_function: Callable[[APIRoute], str] = generate_unique_id,
+            bulkhead: BulkheadConfig | None = None,
     ) -> Callable[[DecoratedCallable], DecoratedCallable]:
+        """
+        Args:
+            bulkhead: method 의 동시 처리 제한, Resource class 의 ``{method}_bulkhead`` / ``global_bulkhead`` 보다 우선
+        """
         tags = tags or []
         dependencies = dependencies or []
         callbacks = callbacks or []
@@ -330,6 +356,7 @@ class Namespace(APIRouter):
                 openapi_extra=openapi_extra,
                 generate_unique_id_function=generate_unique_id_function,
             )
+            func.__bulkhead__ = bulkhead
             return func
 
         return wrap
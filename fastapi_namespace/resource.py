@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import Iterable, Callable, Any, Literal
+from typing import Iterable, Callable, Any, Literal, Optional
 from fastapi.params import Depends
 from inspect import (
     Parameter,
@@ -9,11 +9,16 @@ from inspect import (
 )
 from .typings import MethodHandler, MethodType, ResourceProtocol
 from .utils import gen_op_id
+from .bulkhead import BulkheadConfig
 
 def resource_dependant_name(key: str) -> str:
     return f'{key}_dependencies'
 
 
+def resource_bulkhead_name(key: str) -> str:
+    return f'{key}_bulkhead'
+
+
 class Resource:
     global_dependencies: Iterable[Depends]
     get_dependencies: Iterable[Depends]
@@ -24,6 +29,15 @@ class Resource:
     head_dependencies: Iterable[Depends]
     patch_dependencies: Iterable[Depends]
     trace_dependencies: Iterable[Depends]
+    global_bulkhead: Optional[BulkheadConfig]
+    get_bulkhead: Optional[BulkheadConfig]
+    post_bulkhead: Optional[BulkheadConfig]
+    put_bulkhead: Optional[BulkheadConfig]
+    delete_bulkhead: Optional[BulkheadConfig]
+    options_bulkhead: Optional[BulkheadConfig]
+    head_bulkhead: Optional[BulkheadConfig]
+    patch_bulkhead: Optional[BulkheadConfig]
+    trace_bulkhead: Optional[BulkheadConfig]
 
     @staticmethod
     def get_dependant(method_handler, depends: Depends) -> Callable:
@@ -32,18 +46,41 @@ class Resource:
         method_handler_parameters = method_handler_signature.parameters
 
         op_id = gen_op_id()
+        positional = [i.name for i in method_handler_parameters.values() if i.kind is Parameter.POSITIONAL_ONLY]
+        var_positional = next(
+            (i.name for i in method_handler_parameters.values() if i.kind is Parameter.VAR_POSITIONAL),
+            None
+        )
+
+        def pop_args(kwargs: dict[str, Any]) -> list[Any]:
+            """FastAPI 는 모든 인자를 keyword 로 넘기므로 positional-only / ``*args`` 인자는 위치 인자로 바꿈"""
+            args = [kwargs.pop(i) for i in positional if i in kwargs]
+            if var_positional is not None and var_positional in kwargs:
+                value = kwargs.pop(var_positional)
+                args.extend(value if isinstance(value, (list, tuple)) else (value,))
+            return args
 
-        def wrap(**kwargs):
+        def wrap(*args, **kwargs):
             kwargs.pop(op_id, None)
-            return method_handler(**kwargs)
+            return method_handler(*args, *pop_args(kwargs), **kwargs)
 
-        async def async_wrap(**kwargs):
+        async def async_wrap(*args, **kwargs):
             kwargs.pop(op_id, None)
-            return await method_handler(**kwargs)
+            return await method_handler(*args, *pop_args(kwargs), **kwargs)
 
+        # 기본값 없는 인자가 뒤에 올 수 있도록 dependency 를 keyword-only 로 두고
+        # 그 뒤의 POSITIONAL_OR_KEYWORD 인자만 keyword-only 로 맞춤, positional-only / ``*args`` 는 앞에 그대로 둠
         params = [
-            Parameter(name=op_id, kind=Parameter.POSITIONAL_OR_KEYWORD, default=depends),
-            *method_handler_parameters.values()
+            *(
+                i for i in method_handler_parameters.values()
+                if i.kind in (Parameter.POSITIONAL_ONLY, Parameter.VAR_POSITIONAL)
+            ),
+            Parameter(name=op_id, kind=Parameter.KEYWORD_ONLY, default=depends),
+            *(
+                i.replace(kind=Parameter.KEYWORD_ONLY) if i.kind is Parameter.POSITIONAL_OR_KEYWORD else i
+                for i in method_handler_parameters.values()
+                if i.kind not in (Parameter.POSITIONAL_ONLY, Parameter.VAR_POSITIONAL)
+            )
         ]
 
         if iscoroutinefunction(method_handler):
@@ -78,3 +115,13 @@ class Resource:
         for depends in dependencies:
             method_func = self.get_dependant(method_func, depends)
         return method_func
+
+    def get_bulkhead_config(self, method_name: MethodType) -> Optional[BulkheadConfig]:
+        """``{method}_bulkhead``, 없으면 ``global_bulkhead``
+
+        * ``global_bulkhead`` 도 method 마다 따로 제한됨
+        """
+        config = getattr(self, resource_bulkhead_name(method_name), None)
+        if config is None:
+            config = getattr(self, resource_bulkhead_name('global'), None)
+        return config
@@ -0,0 +1,146 @@
+"""토큰 레코드 decode 할당량 벤치마크
+
+조회 경로에서 레코드 하나를 ``TokenInfo`` 로 만드는 동안의 메모리 할당을 codec 별로 비교
+
+* ``unslotted``: ``two_step`` 과 같지만 ``__dict__`` 가 있는 dataclass (이전 레코드 타입)
+* ``two_step``: ``codec.decode`` → (검증) → ``TokenInfo(info=..., ...)``, 이전 조회 경로
+* ``direct``: ``codec.decode_info`` 로 레코드에서 바로 ``TokenInfo``
+* ``retained_bytes``: 결과 ``TokenInfo`` 하나가 차지하는 메모리 (요청 동안 유지 됨)
+* ``peak_bytes``: decode 한번 동안 최대 사용량 (중간 객체 포함)
+* ``gc_gen0``: 결과를 버리면서 ``--iterations`` 번 실행 했을 때 gen0 GC 횟수
+
+    python -m fastapi_namespace.tests.bench_decode --payload-keys 20
+"""
+from fastapi_namespace.mixins.token.codec import TokenCodec, JSONTokenCodec, BinaryTokenCodec, HashTokenCodec
+from fastapi_namespace.mixins.token.typings import OpaqueToken, OpaqueTokenInfo
+from fastapi_namespace.utils import get_typeddict_validator
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, Callable, Optional, Union
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+CODECS: dict[str, Callable[[], TokenCodec]] = {
+    "binary": BinaryTokenCodec,
+    "json": JSONTokenCodec,
+    "hash": HashTokenCodec,
+}
+
+
+@dataclass
+class UnslottedToken:
+    payload: dict[str, Any]
+    uid: Union[int, str]
+    idf: str = ""
+
+
+@dataclass
+class UnslottedTokenInfo:
+    info: UnslottedToken
+    token: Optional[str] = ""
+    expires_in: Optional[int] = 0
+
+
+def unslotted(codec: TokenCodec, record, validator) -> Optional[UnslottedTokenInfo]:
+    _token = codec.decode(record, UnslottedToken)
+    if validator is not None and not validator(asdict(_token)):
+        return None
+    return UnslottedTokenInfo(info=_token, token="token", expires_in=3600)
+
+
+def two_step(codec: TokenCodec, record, validator) -> Optional[OpaqueTokenInfo]:
+    _token = codec.decode(record, OpaqueToken)
+    if validator is not None and not validator(asdict(_token)):
+        return None
+    return OpaqueTokenInfo(info=_token, token="token", expires_in=3600)
+
+
+def direct(codec: TokenCodec, record, validator) -> Optional[OpaqueTokenInfo]:
+    return codec.decode_info(record, OpaqueToken, OpaqueTokenInfo, "token", 3600, validator)
+
+
+def measure_path(
+        path: Callable[[TokenCodec, Any, Any], Any],
+        codec: TokenCodec,
+        record: Any,
+        validator: Any,
+        iterations: int,
+) -> dict[str, Any]:
+    # 결과를 유지 했을 때 하나당 크기
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [path(codec, record, validator) for _ in range(iterations)]
+    retained = (tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(kept)) / iterations
+
+    # decode 한번의 최대 사용량
+    peak = 0
+    for _ in range(min(iterations, 1000)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        path(codec, record, validator)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    del kept
+
+    # 결과를 버리면서 실행 했을 때 gen0 GC 횟수와 시간
+    gc.collect()
+    collections = gc.get_stats()[0]["collections"]
+    start = perf_counter()
+    for _ in range(iterations):
+        path(codec, record, validator)
+    elapsed = perf_counter() - start
+    return {
+        "retained_bytes": round(retained, 1),
+        "peak_bytes": peak,
+        "gc_gen0": gc.get_stats()[0]["collections"] - collections,
+        "ns_per_op": round(elapsed / iterations * 1e9, 1),
+    }
+
+
+def bench(payload_keys: int, iterations: int, validate: bool) -> list[dict[str, Any]]:
+    token = OpaqueToken(payload={f"claim{i}": f"value-{i}" for i in range(payload_keys)}, uid=12345)
+    validator = get_typeddict_validator(OpaqueToken, strict=False) if validate else None
+    results = []
+    for name, factory in CODECS.items():
+        codec = factory()
+        record = codec.encode(token)
+        # decode_responses=True 인 Redis Client 가 돌려주는 형태
+        record = {k: v.decode() for k, v in record.items()} if isinstance(record, dict) else record.decode()
+        if codec.trusted and validate:
+            continue
+        for path in (unslotted, two_step, direct):
+            results.append({
+                "codec": name,
+                "path": path.__name__,
+                "validated": validator is not None,
+                **measure_path(path, codec, record, validator, iterations),
+            })
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-keys", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--validate", action="store_true", help="trusted 가 아닌 codec 만 검증 포함해서 실행")
+    parser.add_argument("--output", help="결과를 저장할 파일, 없으면 stdout")
+    args = parser.parse_args(argv)
+
+    result = {
+        "config": vars(args),
+        "results": bench(args.payload_keys, args.iterations, args.validate),
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
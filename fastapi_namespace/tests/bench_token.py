@@ -0,0 +1,268 @@
+"""``OpaqueTokenMixin`` 발급 / 조회 / 목록 / 취소 벤치마크
+
+실제 Redis 서버 없이 실행 가능
+
+* ``memory``: ``MemoryTokenStore``
+* ``fakeredis``: ``fakeredis.FakeAsyncRedis`` (설치 되어 있어야 함)
+* ``redis-server``: 임시 포트로 ``redis-server`` 를 띄워서 사용 (PATH 에 있어야 함)
+* ``url``: ``--redis-url`` 의 서버 사용 (벤치마크 후 키를 지우지 않음)
+
+결과는 JSON 으로 출력 되며 저장 방식별로 비교할 수 있음
+
+    python -m fastapi_namespace.tests.bench_token --backend memory --users 200 --sessions 5 --limit 3
+"""
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.memory import MemoryTokenStore
+from fastapi_namespace.mixins.token.metrics import HistogramExporter
+from fastapi_namespace.mixins.token.typings import AsyncRedis
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+
+BACKENDS = ("memory", "fakeredis", "redis-server", "url")
+
+
+def percentile(values: list[float], p: float) -> float:
+    if len(values) == 0:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_phase(
+        name: str,
+        jobs: Iterable[Callable[[], Awaitable[Any]]],
+        concurrency: int,
+        exporter: HistogramExporter,
+) -> dict[str, Any]:
+    """``jobs`` 를 ``concurrency`` 개의 worker 로 실행하고 결과를 요약"""
+    jobs = iter(jobs)
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for job in jobs:
+            start = perf_counter()
+            try:
+                await job()
+            except Exception:
+                errors += 1
+            latencies.append(perf_counter() - start)
+
+    exporter.reset()
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    ops = len(latencies)
+    summaries = exporter.snapshot().values()
+    commands = sum(i.commands for i in summaries)
+    round_trips = sum(i.round_trips for i in summaries)
+    return {
+        "phase": name,
+        "ops": ops,
+        "errors": errors,
+        "seconds": round(elapsed, 6),
+        "ops_per_second": round(ops / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "commands_per_op": round(commands / ops, 3) if ops else 0,
+        "round_trips_per_op": round(round_trips / ops, 3) if ops else 0,
+        "watch_retries": sum(i.watch_retries for i in summaries),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def spawn_redis_server() -> AsyncIterator[str]:
+    """영속화 없이 임시 ``redis-server`` 실행"""
+    if (binary := shutil.which("redis-server")) is None:
+        raise RuntimeError("redis-server is not in PATH")
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        process = subprocess.Popen(
+            [binary, "--port", str(port), "--save", "", "--appendonly", "no", "--dir", directory],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError("redis-server did not start")
+            yield f"redis://127.0.0.1:{port}/0"
+        finally:
+            process.terminate()
+            process.wait()
+
+
+@asynccontextmanager
+async def open_backend(backend: str, redis_url: Optional[str]) -> AsyncIterator[tuple[Optional[AsyncRedis], Optional[MemoryTokenStore]]]:
+    """``(rd, token_store)``"""
+    if backend == "memory":
+        yield None, MemoryTokenStore()
+    elif backend == "fakeredis":
+        import fakeredis
+        rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+        yield rd, None
+        await rd.aclose()
+    elif backend == "redis-server":
+        from redis.asyncio import Redis
+        async with spawn_redis_server() as url:
+            rd = Redis.from_url(url, decode_responses=True)
+            yield rd, None
+            await rd.aclose()
+    elif backend == "url":
+        from redis.asyncio import Redis
+        if redis_url is None:
+            raise ValueError("--redis-url is required for the url backend")
+        rd = Redis.from_url(redis_url, decode_responses=True)
+        yield rd, None
+        await rd.aclose()
+    else:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+
+
+async def bench(
+        backend: str = "memory",
+        users: int = 100,
+        sessions: int = 3,
+        limit: Optional[int] = 3,
+        concurrency: int = 32,
+        lookups: int = 5,
+        redis_url: Optional[str] = None,
+        pipelined: bool = True,
+        seed: int = 0,
+) -> dict[str, Any]:
+    """벤치마크 실행
+
+    Args:
+        backend: ``BACKENDS`` 중 하나
+        users: 유저 수
+        sessions: 유저당 발급할 토큰 수
+        limit: 유저당 토큰 제한, ``None`` 이면 제한 없음
+        concurrency: 동시에 실행할 작업 수
+        lookups: 살아있는 토큰당 조회 횟수
+        redis_url: ``url`` backend 에서 사용할 주소
+        pipelined: 조회를 ``MULTI/EXEC`` 한번으로 할지 여부
+        seed: 조회 순서를 섞을 때 사용
+    """
+    exporter = HistogramExporter()
+    rng = random.Random(seed)
+
+    async with open_backend(backend, redis_url) as (rd, store):
+        class BenchToken(OpaqueTokenMixin):
+            access_token_limit = limit
+            token_store = store
+            token_metrics = exporter
+            token_read_pipelined = pipelined
+
+        mixin = BenchToken()
+        prefix = f"bench-{rng.getrandbits(32):08x}"
+        identities = [f"{prefix}:{i}" for i in range(users)]
+        issued: list[str] = []
+
+        async def issue(identify: str):
+            issued.append((await mixin.create_access_token(rd=rd, payload={"u": identify}, identify=identify)).token)
+
+        phases = [await run_phase(
+            "issue",
+            (lambda i=i: issue(i) for i in identities for _ in range(sessions)),
+            concurrency,
+            exporter,
+        )]
+
+        live = [i.token for identify in identities for i in await mixin.get_user_access_tokens(rd, identify)]
+        reads = [i for i in live for _ in range(lookups)]
+        rng.shuffle(reads)
+        phases.append(await run_phase(
+            "lookup",
+            (lambda t=t: mixin.get_access_token(rd=rd, token=t) for t in reads),
+            concurrency,
+            exporter,
+        ))
+        phases.append(await run_phase(
+            "list",
+            (lambda i=i: mixin.get_user_access_tokens(rd, i) for i in identities),
+            concurrency,
+            exporter,
+        ))
+        phases.append(await run_phase(
+            "revoke",
+            (lambda t=t: mixin.abort_access_token(rd=rd, token=t) for t in live),
+            concurrency,
+            exporter,
+        ))
+        for identify in identities:
+            await mixin.abort_user_access_token(rd, identify)
+
+    return {
+        "config": {
+            "backend": backend,
+            "users": users,
+            "sessions": sessions,
+            "limit": limit,
+            "concurrency": concurrency,
+            "lookups": lookups,
+            "pipelined": pipelined,
+            "live_tokens": len(live),
+            "python": sys.version.split()[0],
+        },
+        "phases": phases,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=BACKENDS, default="memory")
+    parser.add_argument("--redis-url")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=3, help="0 이면 제한 없음")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--lookups", type=int, default=5)
+    parser.add_argument("--watch-reads", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 저장할 파일, 없으면 stdout")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(bench(
+        backend=args.backend,
+        users=args.users,
+        sessions=args.sessions,
+        limit=args.limit or None,
+        concurrency=args.concurrency,
+        lookups=args.lookups,
+        redis_url=args.redis_url,
+        pipelined=not args.watch_reads,
+        seed=args.seed,
+    ))
+    text = json.dumps(result, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
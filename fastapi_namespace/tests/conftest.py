@@ -0,0 +1,19 @@
+"""테스트 공용 도구
+
+* 테스트 파일에서 ``from .conftest import Clock, run`` 으로 사용
+"""
+import asyncio
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Clock:
+    """직접 움직이는 시계, ``now`` 를 바꿔서 시간을 제어"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,84 @@
+"""여러 유저의 토큰을 ``SCAN`` 으로 취소하는 ``abort_tokens_bulk`` 테스트"""
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.typings import BulkAbortProgress
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class Bulk(OpaqueTokenMixin):
+    access_token_limit = 5
+    refresh_token_limit = 5
+
+
+async def issue(mixin, rd, uids, count=2) -> dict:
+    tokens = {}
+    for uid in uids:
+        tokens[uid] = [await mixin.create_access_token(rd=rd, identify=uid, payload={"n": i}) for i in range(count)]
+        await mixin.create_refresh_token(rd=rd, identify=uid, payload={})
+    return tokens
+
+
+def test_abort_all_users_in_batches():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    mixin = Bulk()
+    progress = []
+
+    async def main():
+        tokens = await issue(mixin, rd, range(7))
+        result = await mixin.abort_tokens_bulk(rd, type="ACCESS", batch_size=3, on_progress=lambda p: progress.append(p.scanned_users))
+        assert result == BulkAbortProgress(scanned_users=7, aborted_tokens=14)
+        for uid, infos in tokens.items():
+            assert await mixin.get_user_access_tokens(rd, uid) == []
+            assert all([await mixin.get_access_token(rd, i.token) is None for i in infos])
+            # 다른 type 은 그대로
+            assert len(await mixin.get_user_refresh_tokens(rd, uid)) == 1
+        assert await mixin.abort_tokens_bulk(rd) == BulkAbortProgress(scanned_users=7, aborted_tokens=7)
+
+    run(main())
+    # batch 마다 진행 상황을 알림
+    assert progress[-1] == 7 and len(progress) >= 3
+
+
+def test_identify_pattern_and_token_filter():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    mixin = Bulk()
+
+    async def main():
+        await issue(mixin, rd, ["tenant-1:a", "tenant-1:b", "tenant-2:a"])
+        result = await mixin.abort_tokens_bulk(rd, type="ACCESS", identify_pattern="tenant-1:*")
+        assert result == BulkAbortProgress(scanned_users=2, aborted_tokens=4)
+        assert await mixin.get_user_access_tokens(rd, "tenant-1:a") == []
+        assert len(await mixin.get_user_access_tokens(rd, "tenant-2:a")) == 2
+
+        result = await mixin.abort_tokens_bulk(rd, type="ACCESS", token_filter=lambda token: token.payload["n"] == 1)
+        assert result == BulkAbortProgress(scanned_users=1, aborted_tokens=1)
+        assert [i.info.payload for i in await mixin.get_user_access_tokens(rd, "tenant-2:a")] == [{"n": 0}]
+
+    run(main())
+
+
+def test_keys_removed_between_scan_and_unlink():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    removed = []
+
+    class Racing(Bulk):
+        async def _abort_user_tokens_batch(self, rd, keys, *args, **kwargs):
+            # SCAN 이후 다른 요청이 유저 토큰 목록 / 토큰을 지움
+            if len(removed) == 0:
+                removed.extend(keys)
+                await rd.delete(keys[0])
+                await rd.delete(*await rd.smembers(keys[1]))
+            return await super()._abort_user_tokens_batch(rd, keys, *args, **kwargs)
+
+    mixin = Racing()
+
+    async def main():
+        await issue(mixin, rd, range(4))
+        result = await mixin.abort_tokens_bulk(rd, type="ACCESS", batch_size=10)
+        assert result == BulkAbortProgress(scanned_users=4, aborted_tokens=4)
+        assert await rd.exists(*(mixin._get_user_access_token_key(i) for i in range(4))) == 0
+
+    run(main())
+    assert len(removed) == 4
@@ -0,0 +1,137 @@
+"""method 별 동시 처리 제한 ``Bulkhead`` 테스트"""
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi_namespace import Namespace, Resource, BulkheadConfig
+from fastapi_namespace.bulkhead import Bulkhead
+from .conftest import run
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def main():
+        bulkhead = Bulkhead(BulkheadConfig(max_concurrency=1, retry_after=7))
+        await bulkhead.acquire()
+        with pytest.raises(HTTPException) as e:
+            await bulkhead.acquire()
+        assert e.value.status_code == 503
+        assert e.value.headers == {"Retry-After": "7"}
+        bulkhead.release()
+        await bulkhead.acquire()
+        return bulkhead.stats()
+
+    stats = run(main())
+    assert (stats.in_flight, stats.admitted, stats.rejected) == (1, 2, 1)
+
+
+def test_released_slot_is_handed_to_waiters_in_order():
+    async def main():
+        bulkhead = Bulkhead(BulkheadConfig(max_concurrency=1, max_queue=2, queue_timeout=None))
+        await bulkhead.acquire()
+        order = []
+
+        async def wait(name):
+            await bulkhead.acquire()
+            order.append(name)
+
+        waiters = [asyncio.create_task(wait(i)) for i in "ab"]
+        await asyncio.sleep(0)
+        assert bulkhead.stats().waiting == 2
+        # 대기 중인 요청이 있으면 새 요청은 끼어들지 못함
+        with pytest.raises(HTTPException):
+            await bulkhead.acquire()
+        bulkhead.release()
+        await waiters[0]
+        bulkhead.release()
+        await waiters[1]
+        bulkhead.release()
+        assert order == ["a", "b"]
+        return bulkhead.stats()
+
+    stats = run(main())
+    assert (stats.in_flight, stats.waiting, stats.admitted, stats.queued, stats.rejected) == (0, 0, 3, 2, 1)
+
+
+def test_queue_timeout_and_cancelled_waiter():
+    async def main():
+        bulkhead = Bulkhead(BulkheadConfig(max_concurrency=1, max_queue=2, queue_timeout=0.01))
+        await bulkhead.acquire()
+        with pytest.raises(HTTPException) as e:
+            await bulkhead.acquire()
+        assert e.value.status_code == 503
+
+        cancelled = asyncio.create_task(bulkhead.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        bulkhead.release()
+        return bulkhead.stats()
+
+    stats = run(main())
+    assert (stats.in_flight, stats.waiting, stats.timed_out) == (0, 0, 1)
+
+
+def test_route_bulkhead_returns_503():
+    started, finish = asyncio.Event(), asyncio.Event()
+    ns = Namespace(prefix="/items")
+
+    @ns.route("")
+    class Items(Resource):
+        get_bulkhead = BulkheadConfig(max_concurrency=1, retry_after=3)
+
+        async def get(self):
+            started.set()
+            await finish.wait()
+            return "ok"
+
+        @ns.doc(bulkhead=BulkheadConfig(max_concurrency=5))
+        async def post(self):
+            return "ok"
+
+    app = FastAPI()
+    app.include_router(ns)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/items"))
+            await started.wait()
+            rejected = await client.get("/items")
+            assert rejected.status_code == 503
+            assert rejected.headers["Retry-After"] == "3"
+            assert (await client.post("/items")).status_code == 200
+            finish.set()
+            assert (await first).status_code == 200
+
+    run(main())
+    stats = ns.get_bulkhead_stats()
+    assert (stats["GET /items"].admitted, stats["GET /items"].rejected, stats["GET /items"].in_flight) == (1, 1, 0)
+    assert stats["POST /items"].admitted == 1
+
+
+def test_same_resource_on_two_paths_keeps_separate_stats():
+    ns = Namespace(prefix="/v1")
+
+    class Items(Resource):
+        get_bulkhead = BulkheadConfig(max_concurrency=1)
+
+        async def get(self):
+            return "ok"
+
+    ns.route("/items")(Items)
+    ns.route("/goods")(Items)
+    app = FastAPI()
+    app.include_router(ns)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/v1/items")).status_code == 200
+            assert (await client.get("/v1/goods")).status_code == 200
+            assert (await client.get("/v1/goods")).status_code == 200
+
+    run(main())
+    stats = ns.get_bulkhead_stats()
+    assert set(stats) == {"GET /v1/items", "GET /v1/goods"}
+    assert (stats["GET /v1/items"].admitted, stats["GET /v1/goods"].admitted) == (1, 2)
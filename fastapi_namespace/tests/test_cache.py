@@ -0,0 +1,216 @@
+"""토큰 조회 cache (``NegativeTokenCache`` / ``SharedTokenCache``) 테스트"""
+import subprocess
+import sys
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.cache import NegativeTokenCache, SharedTokenCache, _SHARED_SEQ
+from .conftest import Clock, run
+
+
+def test_negative_cache_expires_and_evicts_oldest():
+    clock = Clock()
+    cache = NegativeTokenCache(max_size=2, ttl=5, clock=clock)
+    cache.add("a")
+    cache.add("b")
+    cache.add("c")
+    assert not cache.contains("a")
+    assert cache.contains("b") and cache.contains("c")
+    cache.discard("b")
+    assert not cache.contains("b")
+    clock.now += 5
+    assert not cache.contains("c")
+    assert len(cache) == 0
+
+
+def test_shared_cache_is_shared_between_instances(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "cache")
+    writer = SharedTokenCache(path, slots=64, slot_size=64, ttl=10, clock=clock)
+    reader = SharedTokenCache(path, slots=64, slot_size=64, ttl=10, clock=clock)
+    try:
+        assert writer.put("access_token/a", b"record", 60)
+        assert reader.get("access_token/a") == (b"record", 60)
+        writer.discard("access_token/a")
+        assert reader.get("access_token/a") is None
+
+        # cache 만료는 ttl 과 토큰 만료 중 먼저 오는 시각
+        writer.put("access_token/b", b"record", 3)
+        clock.now += 3
+        assert reader.get("access_token/b") is None
+        assert not writer.put("access_token/c", b"x" * 64, 60)
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_shared_cache_rejects_other_layout(tmp_path):
+    path = str(tmp_path / "cache")
+    SharedTokenCache(path, slots=64, slot_size=64).close()
+    with pytest.raises(ValueError):
+        SharedTokenCache(path, slots=128, slot_size=64)
+
+
+def test_shared_cache_skips_slot_being_written(tmp_path):
+    cache = SharedTokenCache(str(tmp_path / "cache"), slots=8, slot_size=64, probes=8, ttl=10, clock=Clock())
+    try:
+        cache.put("access_token/a", b"record", 60)
+        offset = next(
+            cache._offset(i) for i in cache._window(cache._hash("access_token/a"))
+            if _SHARED_SEQ.unpack_from(cache._mmap, cache._offset(i))[0] != 0
+        )
+        seq = _SHARED_SEQ.unpack_from(cache._mmap, offset)[0]
+        # 다른 worker 가 쓰는 중 (seq 홀수)
+        _SHARED_SEQ.pack_into(cache._mmap, offset, seq + 1)
+        assert cache.get("access_token/a") is None
+        _SHARED_SEQ.pack_into(cache._mmap, offset, seq + 2)
+        assert cache.get("access_token/a") == (b"record", 60)
+    finally:
+        cache.close()
+
+
+WRITER = """
+import sys
+from fastapi_namespace.mixins.token.cache import SharedTokenCache
+cache = SharedTokenCache(sys.argv[1], slots=8, slot_size=256, probes=8, ttl=60)
+record = sys.argv[2].encode() * 200
+for i in range(3000):
+    cache.put("access_token/a", record, 60)
+    if i % 7 == 0:
+        cache.discard("access_token/a")
+"""
+
+
+def test_shared_cache_concurrent_writers_never_tear(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = SharedTokenCache(path, slots=8, slot_size=256, probes=8, ttl=60)
+    writers = [
+        subprocess.Popen([sys.executable, "-c", WRITER, path, name])
+        for name in "AB"
+    ]
+    try:
+        seen = set()
+        while any(i.poll() is None for i in writers):
+            if (cached := cache.get("access_token/a")) is not None:
+                seen.add(cached[0])
+        assert all(i.wait() == 0 for i in writers)
+        # 두 worker 가 같은 키를 번갈아 써도 섞인 레코드는 읽히지 않음
+        assert seen <= {b"A" * 200, b"B" * 200}
+        # 같은 키는 window 안에 한 slot 만 사용
+        key_hash = cache._hash("access_token/a")
+        slots = [cache._mmap[cache._offset(i) + 4:cache._offset(i) + 20] for i in cache._window(key_hash)]
+        assert slots.count(key_hash) <= 1
+    finally:
+        for i in writers:
+            i.kill()
+        cache.close()
+
+
+def mixin_with_negative_cache():
+    fakeredis = pytest.importorskip("fakeredis")
+    clock = Clock()
+    tokens = iter(f"token{i}" for i in range(100))
+
+    class Negative(OpaqueTokenMixin):
+        negative_cache = True
+        access_token_limit = 5
+
+        def create_token(self, *args, **kwargs) -> str:
+            return next(tokens)
+
+    Negative._negative_cache = NegativeTokenCache(ttl=5, clock=clock)
+    return Negative(), fakeredis.FakeAsyncRedis(decode_responses=True), clock
+
+
+def test_negative_cache_skips_store_until_ttl():
+    mixin, rd, clock = mixin_with_negative_cache()
+    cache = mixin.get_negative_cache()
+
+    async def main():
+        assert await mixin.get_access_token(rd, "token0") is None
+        assert (cache.hits, len(cache)) == (0, 1)
+        # 다른 프로세스가 저장해도 ttl 동안은 조회하지 않음
+        await rd.set(mixin._get_access_token_key("token0"), b"\x01" + b'[{}, 1, "x"]', ex=60)
+        assert await mixin.get_access_token(rd, "token0") is None
+        assert await mixin.get_type_tokens(rd, ["token0"]) == [None]
+        assert cache.hits == 2
+        clock.now += 5
+        assert (await mixin.get_access_token(rd, "token0")).info.uid == 1
+
+        # ACCESS / REFRESH 둘 다 없었던 토큰만 조회를 생략함
+        assert await mixin.get_type_token(rd, "token1") == (None, None)
+        await rd.set(mixin._get_access_token_key("token1"), b"\x01" + b'[{}, 2, "x"]', ex=60)
+        assert await mixin.get_type_token(rd, "token1") == (None, None)
+        cache.discard(mixin._get_refresh_token_key("token1"))
+        access, refresh = await mixin.get_type_token(rd, "token1")
+        assert access.info.uid == 2 and refresh is None
+
+    run(main())
+
+
+def test_negative_cache_forgets_tokens_issued_here():
+    mixin, rd, _ = mixin_with_negative_cache()
+
+    async def main():
+        assert await mixin.get_type_tokens(rd, ["token0", "token1"]) == [None, None]
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        [bulk] = await mixin.create_tokens_bulk(rd, [(2, {})])
+        assert (token.token, bulk.token) == ("token0", "token1")
+        assert (await mixin.get_access_token(rd, "token0")).info.uid == 1
+        assert [i.info.uid for i in await mixin.get_type_tokens(rd, ["token0", "token1"])] == [1, 2]
+
+    run(main())
+
+
+def mixin_with_shared_cache(tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+
+    class Cached(OpaqueTokenMixin):
+        shared_cache_path = str(tmp_path / "cache")
+        shared_cache_slots = 64
+        shared_cache_ttl = 60
+        access_token_limit = 2
+
+    return Cached(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_shared_cache_dropped_on_user_abort(tmp_path):
+    mixin, rd = mixin_with_shared_cache(tmp_path)
+
+    async def main():
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(2)]
+        for i in tokens:
+            assert await mixin.get_access_token(rd, i.token) is not None
+        await mixin.abort_user_access_token(rd, 1)
+        for i in tokens:
+            assert await mixin.get_access_token(rd, i.token) is None
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
+
+
+def test_shared_cache_dropped_on_limit_eviction(tmp_path):
+    mixin, rd = mixin_with_shared_cache(tmp_path)
+
+    async def main():
+        async def evicted(tokens) -> list[bool]:
+            # 남은 시간이 같으면 어느 토큰이 지워질지 정해지지 않으므로 저장소와 비교
+            result = [await mixin.get_access_token(rd, i.token) is None for i in tokens]
+            assert result == [await rd.exists(mixin._get_access_token_key(i.token)) == 0 for i in tokens]
+            return result
+
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(2)]
+        assert await evicted(tokens) == [False, False]
+        await mixin.create_access_token(rd=rd, identify=1, payload={})
+        assert (await evicted(tokens)).count(True) == 1
+
+        bulk = await mixin.create_tokens_bulk(rd, [(2, {}), (2, {})])
+        assert await evicted(bulk) == [False, False]
+        await mixin.create_tokens_bulk(rd, [(2, {})])
+        assert (await evicted(bulk)).count(True) == 1
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
@@ -0,0 +1,114 @@
+"""``redis_cluster`` 노드별 Client 테스트"""
+import pytest
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterNode
+from redis.crc import key_slot
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from .conftest import run
+
+
+class FakeCluster:
+    """``get_node_from_key`` / ``get_primaries`` 만 있는 ``RedisCluster`` 대신 사용"""
+
+    def __init__(self, *ports: int):
+        self.nodes = [ClusterNode("127.0.0.1", port, decode_responses=False) for port in ports]
+
+    def get_node_from_key(self, key: str) -> ClusterNode:
+        return self.nodes[len(key) % len(self.nodes)]
+
+    def get_primaries(self) -> list[ClusterNode]:
+        return self.nodes
+
+
+class First(OpaqueTokenMixin):
+    redis_cluster = True
+
+
+class Second(OpaqueTokenMixin):
+    redis_cluster = True
+
+
+def test_cluster_clients_are_per_class_and_closed_on_shutdown():
+    rd = FakeCluster(7000, 7001)
+
+    async def main():
+        first, second = First(), Second()
+        client = first._get_key_client(rd, "a")
+        assert first._get_key_client(rd, "bb") is not client
+        assert first._get_key_client(rd, "ccc") is client
+        assert second._get_key_client(rd, "a") is not client
+        assert len(First._get_primary_clients(rd)) == 2
+        assert OpaqueTokenMixin.__dict__.get("_cluster_clients") is None
+        # 토큰 키를 str 로 다루므로 노드 Client 는 항상 decode
+        assert client.connection_pool.connection_kwargs["decode_responses"]
+
+        await First.shutdown()
+        assert First.__dict__.get("_cluster_clients") is None
+        assert Second.__dict__.get("_cluster_clients") is not None
+        # 닫은 뒤에는 새 Client 를 만듦
+        assert first._get_key_client(rd, "a") is not client
+        await First.shutdown()
+        await Second.shutdown()
+
+    run(main())
+
+
+def test_raw_token_from_bytes_key():
+    mixin = First()
+    token = mixin._create_raw_token(identify=1)
+    key = mixin._get_access_token_key(token)
+    assert "{" in key
+    assert mixin._get_raw_token(key) == token
+    assert mixin._get_raw_token(key.encode()) == token
+
+
+class OneNodeClients:
+    """모든 slot 이 한 노드에 있는 Cluster 의 노드 Client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_client(self, rd, key):
+        return self.client
+
+    def get_primary_clients(self, rd):
+        return [self.client]
+
+    async def aclose(self):
+        pass
+
+
+def test_bulk_issue_transactions_stay_in_one_slot(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    transactions: list[set[int]] = []
+    execute = Pipeline.execute
+
+    async def checked_execute(self, raise_on_error=True):
+        if self.is_transaction or self.explicit_transaction:
+            # 명령의 첫 인자가 키, DEL 은 모든 인자가 키
+            transactions.append({
+                key_slot(str(key).encode())
+                for args, _ in self.command_stack
+                for key in (args[1:] if args[0] == "DEL" else args[1:2])
+            })
+        return await execute(self, raise_on_error)
+
+    monkeypatch.setattr(Pipeline, "execute", checked_execute)
+
+    class Bulk(OpaqueTokenMixin):
+        redis_cluster = True
+        access_token_limit = 2
+
+    Bulk.get_cluster_clients = classmethod(lambda cls: OneNodeClients(client))
+    mixin = Bulk()
+
+    async def main():
+        # 두번째 청크는 갯수 제한으로 지우는 토큰도 같은 transaction 에 들어감
+        await mixin.create_tokens_bulk(FakeCluster(7000), [(i % 10, {}) for i in range(40)], chunk_size=25)
+        for i in range(10):
+            assert await client.scard(mixin._get_user_access_token_key(i)) == 2
+
+    run(main())
+    assert len(transactions) >= 10
+    assert all(len(i) == 1 for i in transactions)
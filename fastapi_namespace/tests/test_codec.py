@@ -0,0 +1,121 @@
+"""토큰 레코드 codec 테스트"""
+import pytest
+from orjson import dumps
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.codec import BinaryTokenCodec, HashTokenCodec, JSONTokenCodec
+from fastapi_namespace.mixins.token.typings import OpaqueToken, OpaqueTokenInfo
+from .conftest import run
+
+
+TOKEN = OpaqueToken(payload={"role": "admin"}, uid=1, idf="abc")
+LEGACY = dumps({"payload": {"role": "admin"}, "uid": 1, "idf": "abc"})
+
+
+@pytest.mark.parametrize("decoded", [False, True], ids=["bytes", "str"])
+def test_binary_codec_round_trip(decoded):
+    codec = BinaryTokenCodec()
+    record = codec.encode(TOKEN)
+    assert record[:1] == b"\x01" and b"role" in record and b"uid" not in record
+    data = record.decode() if decoded else record
+    assert codec.decode(data, OpaqueToken) == TOKEN
+    assert codec.decode_info(data, OpaqueToken, OpaqueTokenInfo, "t", 10) == OpaqueTokenInfo(TOKEN, "t", 10)
+
+
+@pytest.mark.parametrize("decoded", [False, True], ids=["bytes", "str"])
+def test_binary_codec_reads_legacy_json(decoded):
+    codec = BinaryTokenCodec()
+    data = LEGACY.decode() if decoded else LEGACY
+    assert codec.decode(data, OpaqueToken) == TOKEN
+    assert codec.decode_info(data, OpaqueToken, OpaqueTokenInfo, "t", 10) == OpaqueTokenInfo(TOKEN, "t", 10)
+    # validator 를 넘기면 기존 레코드도 검증함
+    assert codec.decode_info(data, OpaqueToken, OpaqueTokenInfo, "t", 10, lambda values: False) is None
+    assert JSONTokenCodec().decode(data, OpaqueToken) == TOKEN
+    assert not codec.verified(data)
+
+
+def reject(values):
+    return False
+
+
+@pytest.mark.parametrize("decoded", [False, True], ids=["bytes", "str"])
+def test_codecs_skip_validation_only_for_own_records(decoded):
+    binary = BinaryTokenCodec()
+    record = binary.encode(TOKEN)
+    record = record.decode() if decoded else record
+    assert binary.verified(record)
+    assert binary.decode_info(record, OpaqueToken, OpaqueTokenInfo, "t", 10, reject) == OpaqueTokenInfo(TOKEN, "t", 10)
+    assert JSONTokenCodec().decode_info(LEGACY, OpaqueToken, OpaqueTokenInfo, "t", 10, reject) is None
+
+    hashed = HashTokenCodec()
+    record = hashed.encode(TOKEN)
+    record = {k: v.decode() for k, v in record.items()} if decoded else record
+    assert hashed.verified(record) and hashed.decode(record, OpaqueToken) == TOKEN
+    assert hashed.decode_info(record, OpaqueToken, OpaqueTokenInfo, "t", 10, reject) == OpaqueTokenInfo(TOKEN, "t", 10)
+    # 버전 필드가 없는 hash 레코드는 직접 쓴 것으로 보지 않음
+    del record[hashed.version_field]
+    assert not hashed.verified(record) and hashed.decode(record, OpaqueToken) == TOKEN
+    assert hashed.decode_info(record, OpaqueToken, OpaqueTokenInfo, "t", 10, reject) is None
+
+
+def test_mixin_reads_legacy_json_records():
+    fakeredis = pytest.importorskip("fakeredis")
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    class Limited(OpaqueTokenMixin):
+        access_token_limit = 2
+
+    mixin = Limited()
+
+    async def main():
+        key = mixin._get_access_token_key("legacy")
+        await rd.set(key, LEGACY, ex=60)
+        await rd.sadd(mixin._get_user_access_token_key(1), key)
+        assert (await mixin.get_access_token(rd, "legacy")).info == TOKEN
+        new = await mixin.create_access_token(rd=rd, identify=1, payload={"role": "admin"})
+        assert (await rd.get(mixin._get_access_token_key(new.token)))[:1] == "\x01"
+        assert {i.token for i in await mixin.get_user_access_tokens(rd, 1)} == {"legacy", new.token}
+
+    run(main())
+
+
+@pytest.mark.parametrize("codec", [BinaryTokenCodec(), HashTokenCodec()], ids=["binary", "hash"])
+def test_mixin_validates_records_it_did_not_write(codec):
+    fakeredis = pytest.importorskip("fakeredis")
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    class Limited(OpaqueTokenMixin):
+        token_codec = codec
+        access_token_limit = 3
+
+    mixin = Limited()
+
+    async def main():
+        new = await mixin.create_access_token(rd=rd, identify=1, payload={"role": "admin"})
+        bad = mixin._get_access_token_key("bad")
+        if codec.hashed:
+            await rd.hset(bad, mapping={"payload.role": '"admin"', "uid": "[1]", "idf": '"abc"'})
+        else:
+            await rd.set(bad, dumps({"payload": "oops", "uid": 1, "idf": "abc"}))
+        await rd.expire(bad, 60)
+        await rd.sadd(mixin._get_user_access_token_key(1), bad)
+
+        assert await mixin.get_access_token(rd, "bad") is None
+        assert await mixin.get_access_token(rd, new.token) is not None
+        assert [i.token for i in await mixin.get_user_access_tokens(rd, 1)] == [new.token]
+
+    run(main())
+
+
+def test_token_types_stay_mutable_and_subclassable():
+    from dataclasses import dataclass
+
+    @dataclass
+    class MyToken(OpaqueToken):
+        scope: str = ""
+
+    token = MyToken(payload={}, uid=1, scope="read")
+    token.payload["role"] = "admin"
+    info = OpaqueTokenInfo(TOKEN, "t", 10)
+    info.expires_in = 5
+    assert (token.payload, info.expires_in) == ({"role": "admin"}, 5)
+    assert not hasattr(info, "__dict__")
@@ -0,0 +1,136 @@
+"""``WatchRetry`` / ``KeyedLock`` 테스트"""
+import asyncio
+import pytest
+from redis.exceptions import WatchError
+from fastapi_namespace.mixins.token.contention import KeyedLock, WatchRetry
+from fastapi_namespace.mixins.token.metrics import HistogramExporter, measure, transaction
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def recording_retry(**kwargs) -> tuple[WatchRetry, list[float]]:
+    """대기 시간 상한을 고르고 실제로 기다리지 않고 기록만 하는 ``WatchRetry``"""
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    return WatchRetry(random=lambda low, high: high, sleep=sleep, **kwargs), sleeps
+
+
+def test_delay_grows_exponentially_up_to_cap():
+    retry, _ = recording_retry(base=0.01, cap=0.05)
+    assert [retry.delay(attempt) for attempt in range(1, 6)] == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+
+def test_delay_is_full_jitter():
+    bounds = []
+    retry = WatchRetry(base=0.01, cap=0.05, random=lambda low, high: bounds.append((low, high)) or low)
+    assert retry.delay(3) == 0
+    assert bounds == [(0, 0.04)]
+    default = WatchRetry(base=0.01, cap=0.05)
+    assert all(0 <= default.delay(attempt) <= 0.05 for attempt in range(1, 20))
+
+
+def test_backoff_gives_up_after_max_retries():
+    retry, sleeps = recording_retry(max_retries=3, base=0.01, cap=1)
+
+    async def main():
+        return [await retry.backoff(attempt) for attempt in range(1, 5)]
+
+    assert run(main()) == [True, True, True, False]
+    assert sleeps == [0.01, 0.02, 0.04]
+
+
+def test_transaction_raises_watch_error_after_max_retries():
+    retry, sleeps = recording_retry(max_retries=2)
+    exporter = HistogramExporter()
+    server = fakeredis.FakeServer()
+    rd = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    other = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    calls = []
+
+    async def conflict(pipe):
+        # WATCH 후 다른 연결이 키를 바꿔서 매번 EXEC 실패
+        calls.append(1)
+        await other.incr("counter")
+        pipe.multi()
+        pipe.set("value", 1)
+
+    async def main():
+        with pytest.raises(WatchError):
+            with measure(exporter, "conflict"):
+                await transaction(rd, conflict, "counter", retry=retry)
+        assert await rd.get("value") is None
+
+    run(main())
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    summary = exporter.snapshot()["conflict"]
+    assert (summary.watch_retries, summary.errors) == (3, 1)
+
+
+def test_keyed_lock_serializes_same_key_only():
+    lock = KeyedLock()
+    order = []
+
+    async def hold(key, name, wait):
+        async with lock(key):
+            order.append(f"{name}+")
+            await wait.wait()
+            order.append(f"{name}-")
+
+    async def main():
+        release_a, release_b = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(hold("a", "a1", release_a))
+        second = asyncio.create_task(hold("a", "a2", release_a))
+        other = asyncio.create_task(hold("b", "b1", release_b))
+        await asyncio.sleep(0)
+        # 같은 키는 기다리고 다른 키는 바로 실행
+        assert order == ["a1+", "b1+"]
+        assert len(lock) == 2
+        release_b.set()
+        await other
+        assert len(lock) == 1
+        release_a.set()
+        await asyncio.gather(first, second)
+
+    run(main())
+    assert order == ["a1+", "b1+", "b1-", "a1-", "a2+", "a2-"]
+    assert len(lock) == 0
+
+
+def test_keyed_lock_evicts_after_error_and_cancel():
+    lock = KeyedLock()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            async with lock("a"):
+                raise RuntimeError()
+        assert len(lock) == 0
+
+        entered = asyncio.Event()
+
+        async def hold():
+            async with lock("a"):
+                entered.set()
+                await asyncio.Event().wait()
+
+        async def wait():
+            async with lock("a"):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await entered.wait()
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        # 기다리던 작업이 취소 돼도 잡고 있는 작업의 Lock 은 남음
+        assert len(lock) == 1
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+        assert len(lock) == 0
+
+    run(main())
@@ -0,0 +1,80 @@
+"""``get_token_fields`` / ``HashTokenCodec`` 믹스인 테스트"""
+import pytest
+from orjson import dumps
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.codec import HashTokenCodec
+from fastapi_namespace.mixins.token.typings import OpaqueToken
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+FIELDS = ["uid", "payload.role", "payload.missing", "unknown"]
+
+
+class Hashed(OpaqueTokenMixin):
+    token_codec = HashTokenCodec()
+    access_token_limit = 2
+
+
+def test_hash_codec_reads_only_requested_fields():
+    mixin, rd = Hashed(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def main():
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={"role": "admin", "tags": ["a"]})
+        key = mixin._get_access_token_key(token.token)
+        assert await rd.type(key) == "hash"
+        assert await rd.hget(key, "payload.role") == '"admin"'
+
+        fields = await mixin.get_token_fields(rd, token.token, FIELDS)
+        assert fields.token == token.token and 0 < fields.expires_in <= mixin.access_token_expire
+        # 요청한 필드만 읽고 접근할 때 decode
+        assert list(fields) == FIELDS
+        assert fields._values == {}
+        assert fields["payload.role"] == "admin"
+        assert fields._values == {"payload.role": "admin"}
+        assert dict(fields) == {"uid": 1, "payload.role": "admin", "payload.missing": None, "unknown": None}
+
+        assert await mixin.get_token_fields(rd, "missing", FIELDS) is None
+        await mixin.abort_access_token(rd, token.token)
+        assert await mixin.get_token_fields(rd, token.token, FIELDS) is None
+
+    run(main())
+
+
+def test_hash_codec_lists_user_tokens():
+    mixin, rd = Hashed(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def main():
+        first = await mixin.create_access_token(rd=rd, identify=1, payload={"n": 1})
+        second = await mixin.create_access_token(rd=rd, identify=1, payload={"n": 2})
+        await mixin.create_access_token(rd=rd, identify=2, payload={"n": 3})
+        infos = await mixin.get_user_access_tokens(rd, 1)
+        assert {i.token: i.info for i in infos} == {
+            first.token: OpaqueToken(payload={"n": 1}, uid=1, idf=first.info.idf),
+            second.token: OpaqueToken(payload={"n": 2}, uid=1, idf=second.info.idf),
+        }
+        assert (await mixin.get_access_token(rd, second.token)).info.payload == {"n": 2}
+
+    run(main())
+
+
+def test_fields_fall_back_to_whole_record():
+    """hash codec 이 아니면 레코드 전체를 읽어서 필드를 골라냄"""
+    mixin, rd = OpaqueTokenMixin(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def main():
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={"role": "admin"})
+        assert await rd.type(mixin._get_access_token_key(token.token)) == "string"
+        fields = await mixin.get_token_fields(rd, token.token, FIELDS)
+        assert dict(fields) == {"uid": 1, "payload.role": "admin", "payload.missing": None, "unknown": None}
+
+        # 기존 JSON 문자열 레코드
+        key = mixin._get_access_token_key("legacy")
+        await rd.set(key, dumps({"payload": {"role": "user"}, "uid": 2, "idf": "abc"}), ex=60)
+        fields = await mixin.get_token_fields(rd, "legacy", ["idf", "payload.role"])
+        assert dict(fields) == {"idf": "abc", "payload.role": "user"}
+        assert 0 < fields.expires_in <= 60
+        assert await mixin.get_token_fields(rd, "missing", FIELDS) is None
+
+    run(main())
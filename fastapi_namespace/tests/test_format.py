@@ -0,0 +1,59 @@
+"""서명된 opaque 토큰 형식 ``SignedOpaqueToken`` 테스트"""
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.cluster import get_hash_tag
+from fastapi_namespace.mixins.token.format import SignedOpaqueToken, TokenHeader
+from .conftest import run
+
+
+def test_issue_and_parse():
+    token_format = SignedOpaqueToken("secret")
+    token = token_format.issue("abcd", issued_at=1700000000)
+    assert token.startswith("abcd.")
+    assert token_format.parse(token) == TokenHeader(version=1, hint="abcd", issued_at=1700000000)
+    assert token_format.issue("abcd") != token_format.issue("abcd")
+
+
+def test_parse_rejects_forged_and_malformed_tokens():
+    token_format = SignedOpaqueToken("secret")
+    token = token_format.issue("abcd")
+    hint, _, body = token.rpartition(".")
+    forged = body[:10] + ("A" if body[10] != "A" else "B") + body[11:]
+    for bad in [
+        f"{hint}.{forged}",
+        f"efgh.{body}",
+        body,
+        f"{hint}.{body[:-1]}",
+        f"{hint}.{'*' * len(body)}",
+        "",
+    ]:
+        assert token_format.parse(bad) is None
+    assert SignedOpaqueToken("other").parse(token) is None
+    assert SignedOpaqueToken("secret", mac_length=8).parse(token) is None
+
+
+def test_mixin_rejects_forged_tokens_without_lookup():
+    fakeredis = pytest.importorskip("fakeredis")
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    class Signed(OpaqueTokenMixin):
+        token_secret = "secret"
+
+    mixin = Signed()
+
+    async def main():
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        header = mixin.parse_token_header(token.token)
+        assert header.hint == get_hash_tag(1, mixin.cluster_tag_length)
+        assert (await mixin.get_access_token(rd, token.token)).info.uid == 1
+
+        forged = SignedOpaqueToken("other").issue(header.hint)
+        await rd.set(mixin._get_access_token_key(forged), await rd.get(mixin._get_access_token_key(token.token)))
+        assert mixin.parse_token_header(forged) is None
+        # 저장소에 있어도 서명이 맞지 않으면 조회하지 않음
+        assert await mixin.get_access_token(rd, forged) is None
+        await mixin.abort_access_token(rd, forged)
+        assert await rd.exists(mixin._get_access_token_key(forged)) == 1
+
+    run(main())
+    assert OpaqueTokenMixin().parse_token_header("abcd.efgh") is None
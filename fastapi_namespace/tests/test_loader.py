@@ -0,0 +1,157 @@
+"""요청 단위 batch 조회 ``DataLoader`` / ``Loader`` 테스트"""
+import asyncio
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from fastapi_namespace import Namespace, Resource, DataLoader, Loader
+from .conftest import run
+
+
+class Recorder:
+    def __init__(self, fail=()):
+        self.calls: list[list] = []
+        self.fail = set(fail)
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        return [ValueError(key) if key in self.fail else key * 10 for key in keys]
+
+
+def test_concurrent_loads_are_batched_and_memoized():
+    fn = Recorder()
+
+    async def main():
+        loader = DataLoader(fn)
+        assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [10, 20, 10]
+        assert await loader.load(2) == 20
+        assert await loader.load_many([3, 4]) == [30, 40]
+
+    run(main())
+    assert fn.calls == [[1, 2], [3, 4]]
+
+
+def test_max_batch_size_splits_batches():
+    fn = Recorder()
+
+    async def main():
+        loader = DataLoader(fn, max_batch_size=2, cache=False)
+        assert await loader.load_many([1, 2, 3, 1]) == [10, 20, 30, 10]
+
+    run(main())
+    assert fn.calls == [[1, 2], [3, 1]]
+
+
+def test_failed_keys_are_loaded_again():
+    fn = Recorder(fail={2})
+
+    async def main():
+        loader = DataLoader(fn)
+        ok, failed = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        assert ok == 10 and isinstance(failed, ValueError)
+        fn.fail.clear()
+        assert await loader.load(2) == 20
+        assert await loader.load(1) == 10
+
+    run(main())
+    assert fn.calls == [[1, 2], [2]]
+
+
+def test_batch_error_and_wrong_length_fail_every_key():
+    async def broken(keys):
+        return keys[:-1]
+
+    async def main():
+        loader = DataLoader(broken)
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        assert all(isinstance(i, ValueError) for i in results)
+        assert loader._futures == {}
+
+    run(main())
+
+
+def test_prime_and_clear():
+    fn = Recorder()
+
+    async def main():
+        loader = DataLoader(fn)
+        loader.prime(1, "primed")
+        assert await loader.load(1) == "primed"
+        loader.clear(1)
+        assert await loader.load(1) == 10
+
+    run(main())
+    assert fn.calls == [[1]]
+
+
+def test_cancelled_batch_does_not_leave_pending_loads():
+    async def main():
+        event = asyncio.Event()
+
+        async def slow(keys):
+            event.set()
+            await asyncio.sleep(10)
+            return keys
+
+        loader = DataLoader(slow)
+        waiting = asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        await event.wait()
+        [task] = loader._tasks
+        task.cancel()
+        results = await asyncio.wait_for(waiting, 1)
+        assert all(isinstance(i, asyncio.CancelledError) for i in results)
+        assert loader._tasks == set() and loader._futures == {}
+
+    run(main())
+
+
+def test_cancelled_caller_does_not_poison_cache():
+    fn = Recorder()
+
+    async def main():
+        loader = DataLoader(fn)
+        future = loader.load(1)
+        future.cancel()
+        await asyncio.sleep(0)
+        assert await loader.load(1) == 10
+
+    run(main())
+
+
+def test_loader_dependency_is_shared_within_request():
+    fn = Recorder()
+
+    async def warm(users: DataLoader = Loader(fn)):
+        await users.load(1)
+
+    ns = Namespace(prefix="/users")
+
+    @ns.route("")
+    class Users(Resource):
+        global_dependencies = [Depends(warm)]
+
+        async def get(self, users: DataLoader = Loader(fn)):
+            return await users.load_many([1, 2, 3])
+
+    app = FastAPI()
+    app.include_router(ns)
+    with TestClient(app) as client:
+        assert client.get("/users").json() == [10, 20, 30]
+        assert client.get("/users").json() == [10, 20, 30]
+    # 요청마다 새 loader, 같은 요청 안에서는 1 을 다시 조회하지 않음
+    assert fn.calls == [[1], [2, 3], [1], [2, 3]]
+
+
+@pytest.mark.parametrize("size", [None, 1])
+def test_tasks_are_referenced_until_done(size):
+    fn = Recorder()
+
+    async def main():
+        loader = DataLoader(fn, max_batch_size=size)
+        first, second = loader.load(1), loader.load(2)
+        await asyncio.sleep(0)
+        assert len(loader._tasks) == (1 if size is None else 2)
+        assert await asyncio.gather(first, second) == [10, 20]
+        await asyncio.sleep(0)
+        assert loader._tasks == set()
+
+    run(main())
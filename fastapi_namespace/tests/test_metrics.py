@@ -0,0 +1,89 @@
+"""토큰 작업 측정 (``measure`` / ``HistogramExporter``) 테스트"""
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.metrics import HistogramExporter, OperationStats, OperationSummary, count, measure
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_histogram_exporter_summarizes_operations():
+    exporter = HistogramExporter(buckets=(0.01, 0.1))
+    exporter.export(OperationStats("get", commands=3, round_trips=1, elapsed=0.01))
+    exporter.export(OperationStats("get", commands=2, round_trips=2, watch_retries=1, elapsed=0.05, error=True))
+    exporter.export(OperationStats("get", negative_cache_hits=1, shared_cache_hits=1, elapsed=1.0))
+    snapshot = exporter.snapshot()
+    assert snapshot == {"get": OperationSummary(
+        count=3, errors=1, commands=5, round_trips=3, watch_retries=1,
+        negative_cache_hits=1, shared_cache_hits=1, total_time=1.06, buckets=[1, 1, 1],
+    )}
+    # snapshot 은 복사본
+    snapshot["get"].buckets[0] = 100
+    assert exporter.snapshot()["get"].buckets == [1, 1, 1]
+    exporter.reset()
+    assert exporter.snapshot() == {}
+
+
+def test_measure_nests_into_outer_operation():
+    exporter = HistogramExporter()
+    with measure(exporter, "outer") as stats:
+        count(2)
+        with measure(exporter, "inner") as inner:
+            count()
+        assert inner is None
+    with pytest.raises(ValueError):
+        with measure(exporter, "failed"):
+            raise ValueError()
+    with measure(None, "ignored") as ignored:
+        count()
+    assert ignored is None
+    snapshot = exporter.snapshot()
+    assert set(snapshot) == {"outer", "failed"}
+    assert (snapshot["outer"].commands, snapshot["outer"].round_trips) == (3, 2) == (stats.commands, stats.round_trips)
+    assert snapshot["failed"].errors == 1
+
+
+def metered(tmp_path):
+    class Metered(OpaqueTokenMixin):
+        token_metrics = HistogramExporter()
+        negative_cache = True
+        shared_cache_path = str(tmp_path / "cache")
+        shared_cache_slots = 64
+
+    return Metered(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_mixin_counts_issue_abort_and_cache_use(tmp_path):
+    mixin, rd = metered(tmp_path)
+    metrics = mixin.token_metrics
+
+    async def main():
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        created = metrics.snapshot()["create_access_token"]
+        assert created.count == 1 and created.commands > 0 and created.round_trips > 0
+
+        # 처음은 저장소 조회, 다음은 shared cache hit
+        assert await mixin.get_access_token(rd, token.token) is not None
+        first = metrics.snapshot()["get_access_token"]
+        assert first.round_trips > 0 and first.shared_cache_hits == 0
+        assert await mixin.get_access_token(rd, token.token) is not None
+        second = metrics.snapshot()["get_access_token"]
+        assert second.shared_cache_hits == 1 and second.round_trips == first.round_trips
+
+        # 없는 토큰은 저장소 조회 후 negative cache hit
+        assert await mixin.get_access_token(rd, "missing") is None
+        miss = metrics.snapshot()["get_access_token"]
+        assert miss.round_trips > second.round_trips and miss.negative_cache_hits == 0
+        assert await mixin.get_access_token(rd, "missing") is None
+        hit = metrics.snapshot()["get_access_token"]
+        assert hit.negative_cache_hits == 1 and hit.round_trips == miss.round_trips
+        assert hit.count == 4
+
+        await mixin.abort_access_token(rd, token.token)
+        aborted = metrics.snapshot()["abort_access_token"]
+        assert aborted.count == 1 and aborted.commands > 0 and aborted.errors == 0
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
@@ -0,0 +1,86 @@
+"""keyspace notification 으로 유저 토큰 목록을 정리하는 ``TokenIndexSubscriber`` 테스트"""
+import asyncio
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.store import OWNER_EXPIRE_GRACE
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def subscribed(rd):
+    class Subscribed(OpaqueTokenMixin):
+        access_token_limit = 5
+        token_index_subscriber = True
+        subscriber_flush_interval = 0.05
+
+    Subscribed.get_shared_redis_client = classmethod(lambda cls: rd)
+    return Subscribed
+
+
+def test_owner_is_recorded_per_token_with_expire():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    mixin = subscribed(rd)()
+
+    async def main():
+        token = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        [bulk] = await mixin.create_tokens_bulk(rd, [(2, {})])
+        refresh = await mixin.create_refresh_token(rd=rd, identify=3, payload={})
+        access, new_refresh = await mixin.rotate_refresh_token(rd, refresh.token)
+
+        prefix = mixin._get_token_owner_prefix()
+        for info, user_token_key in [
+            (token, mixin._get_user_access_token_key(1)),
+            (bulk, mixin._get_user_access_token_key(2)),
+            (access, mixin._get_user_access_token_key(3)),
+        ]:
+            owner_key = prefix + mixin._get_access_token_key(info.token)
+            assert await rd.get(owner_key) == user_token_key
+            assert mixin.access_token_expire < await rd.ttl(owner_key) <= mixin.access_token_expire + OWNER_EXPIRE_GRACE
+        owner_key = prefix + mixin._get_refresh_token_key(new_refresh.token)
+        assert await rd.get(owner_key) == mixin._get_user_refresh_token_key(3)
+        assert await rd.ttl(owner_key) > mixin.refresh_token_expire
+
+    run(main())
+
+
+def test_flush_removes_tokens_and_owners():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    cls = subscribed(rd)
+    mixin = cls()
+
+    async def main():
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(3)]
+        keys = [mixin._get_access_token_key(i.token) for i in tokens]
+        await rd.delete(keys[0], keys[1])
+        subscriber = cls.get_token_index_subscriber()
+        assert await subscriber.flush(rd, [keys[0], keys[1], keys[1], "access_token/unknown"]) == 2
+        assert await rd.smembers(mixin._get_user_access_token_key(1)) == {keys[2]}
+        prefix = mixin._get_token_owner_prefix()
+        assert await rd.exists(prefix + keys[0], prefix + keys[1]) == 0
+        assert await rd.exists(prefix + keys[2]) == 1
+
+    run(main())
+
+
+def test_subscriber_listens_for_events():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    cls = subscribed(rd)
+    mixin = cls()
+
+    async def main():
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(2)]
+        await cls.startup()
+        try:
+            await asyncio.sleep(0.05)
+            key = mixin._get_access_token_key(tokens[0].token)
+            await rd.delete(key)
+            await rd.publish("__keyevent@0__:expired", key)
+            await rd.publish("__keyevent@0__:expired", "something/else")
+            await asyncio.sleep(0.2)
+        finally:
+            await cls.shutdown()
+        assert cls.get_token_index_subscriber().removed == 1
+        assert await rd.smembers(mixin._get_user_access_token_key(1)) == {mixin._get_access_token_key(tokens[1].token)}
+
+    run(main())
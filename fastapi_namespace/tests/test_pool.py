@@ -0,0 +1,92 @@
+"""idle 연결을 끊는 ``TokenConnectionPool`` 테스트"""
+import asyncio
+import pytest
+from redis.asyncio import Redis
+from fastapi_namespace.mixins.token import pool as pool_module
+from fastapi_namespace.mixins.token.pool import TokenConnectionPool, create_token_redis_client
+from .conftest import Clock, run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(pool_module, "monotonic", clock)
+    return clock
+
+
+def token_pool(**kwargs) -> TokenConnectionPool:
+    return TokenConnectionPool(
+        connection_class=fakeredis.FakeAsyncRedisConnection,
+        server=fakeredis.FakeServer(),
+        decode_responses=True,
+        **kwargs
+    )
+
+
+async def hold(pool: TokenConnectionPool, count: int) -> list:
+    connections = [await pool.get_connection("PING") for _ in range(count)]
+    for connection in connections:
+        await pool.release(connection)
+    return connections
+
+
+def test_reap_idle_keeps_min_idle_and_reconnects(clock):
+    pool = token_pool(idle_timeout=60, min_idle=1)
+    rd = Redis(connection_pool=pool)
+
+    async def main():
+        connections = await hold(pool, 3)
+        assert all(i.is_connected for i in connections)
+        clock.now += 30
+        assert await pool.reap_idle() == 0
+        clock.now += 31
+        assert await pool.reap_idle() == 2
+        # 먼저 반납된 연결부터 끊김
+        assert [i.is_connected for i in connections] == [False, False, True]
+        assert await pool.reap_idle() == 0
+
+        # 끊긴 연결도 pool 에 남아 있다가 다시 연결됨
+        await rd.set("a", 1)
+        assert await asyncio.gather(*(rd.get("a") for _ in range(3))) == ["1"] * 3
+        assert all(i.is_connected for i in connections)
+        await rd.aclose(close_connection_pool=True)
+
+    run(main())
+
+
+def test_reap_idle_skips_connections_in_use(clock):
+    pool = token_pool(idle_timeout=60, max_connections=2)
+
+    async def main():
+        idle, used = await hold(pool, 2)
+        assert await pool.get_connection("PING") is used
+        clock.now += 61
+        assert await pool.reap_idle() == 1
+        assert not idle.is_connected and used.is_connected
+        await pool.release(used)
+        assert await pool.reap_idle() == 0
+        clock.now += 61
+        assert await pool.reap_idle() == 1
+        await pool.aclose()
+
+    run(main())
+
+
+def test_reap_idle_disabled():
+    pool = token_pool(idle_timeout=None)
+
+    async def main():
+        [connection] = await hold(pool, 1)
+        assert await pool.reap_idle() == 0
+        assert connection.is_connected
+        await pool.aclose()
+
+    run(main())
+
+
+def test_token_redis_client_keeps_decode_responses_setting():
+    assert create_token_redis_client("redis://localhost").connection_pool.connection_kwargs["decode_responses"]
+    client = create_token_redis_client("redis://localhost", decode_responses=False)
+    assert not client.connection_pool.connection_kwargs["decode_responses"]
@@ -0,0 +1,123 @@
+"""만료 된 토큰 키를 백그라운드로 정리하는 ``TokenReaper`` 테스트"""
+import asyncio
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.metrics import HistogramExporter
+from fastapi_namespace.mixins.token.reaper import TokenReaper
+from fastapi_namespace.mixins.token.store import RedisTokenStore
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_sweep_prunes_every_batch_and_pattern():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    store = RedisTokenStore(rd)
+    reaper = TokenReaper(lambda: [store], ["user_access_token/*", "user_refresh_token/*"], batch_size=3, rate=None)
+
+    async def main():
+        for i in range(7):
+            for prefix in ("access", "refresh"):
+                await rd.sadd(f"user_{prefix}_token/{i}", f"{prefix}_token/alive{i}", f"{prefix}_token/dead{i}")
+                await rd.set(f"{prefix}_token/alive{i}", "record")
+        await rd.sadd("other/1", "access_token/dead")
+        assert await reaper.sweep() == 14
+        assert await rd.smembers("user_access_token/3") == {"access_token/alive3"}
+        assert await rd.scard("other/1") == 1
+        assert await reaper.sweep() == 0
+
+    run(main())
+    assert (reaper.removed, reaper.scanned) == (14, 28)
+
+
+def test_reaper_task_survives_errors():
+    calls = []
+
+    class Broken:
+        async def scan_user_keys(self, pattern, count):
+            calls.append(pattern)
+            raise ConnectionError()
+            yield
+
+    metrics = HistogramExporter()
+    reaper = TokenReaper(lambda: [Broken()], ["user_access_token/*"], interval=0.01, metrics=metrics)
+
+    async def main():
+        reaper.start()
+        await asyncio.sleep(0.05)
+        assert not reaper._task.done()
+        await reaper.aclose()
+        assert reaper._task is None
+
+    run(main())
+    assert len(calls) > 1
+    # 실패한 순회는 버리지 않고 기록
+    assert reaper.failed == len(calls) and isinstance(reaper.last_error, ConnectionError)
+    summary = metrics.snapshot()["reap_tokens"]
+    assert summary.count == summary.errors == len(calls)
+
+
+def test_startup_requires_a_store_to_reap():
+    class Unconfigured(OpaqueTokenMixin):
+        token_reaper = True
+
+    with pytest.raises(AttributeError):
+        run(Unconfigured.startup())
+    assert Unconfigured.__dict__.get("_reaper") is None
+
+
+def test_mixin_reaper_replaces_pruning_on_issue():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    class Reaped(OpaqueTokenMixin):
+        access_token_limit = 5
+        token_reaper = True
+        reaper_rate = None
+
+    Reaped.get_shared_redis_client = classmethod(lambda cls: rd)
+    mixin = Reaped()
+
+    async def main():
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(3)]
+        await rd.delete(mixin._get_access_token_key(tokens[0].token))
+        # 발급 / 목록 조회 시에는 정리하지 않음
+        await mixin.create_access_token(rd=rd, identify=1, payload={})
+        user_key = mixin._get_user_access_token_key(1)
+        assert await rd.scard(user_key) == 4
+        assert len(await mixin.get_user_access_tokens(rd, 1)) == 3
+        assert await Reaped.get_token_reaper().sweep() == 1
+        assert await rd.scard(user_key) == 3
+
+    try:
+        run(main())
+    finally:
+        run(Reaped.shutdown())
+
+
+def test_sweep_trims_session_index():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    class Indexed(OpaqueTokenMixin):
+        access_token_limit = 5
+        token_reaper = True
+        reaper_rate = None
+        session_index = True
+
+    Indexed.get_shared_redis_client = classmethod(lambda cls: rd)
+    mixin = Indexed()
+
+    async def main():
+        tokens = [await mixin.create_access_token(rd=rd, identify=1, payload={}) for _ in range(3)]
+        expiry_key, issued_key = mixin._get_session_index_keys("ACCESS")
+        # 이미 만료 시각이 지난 것처럼 만들고 토큰 하나는 지움
+        await rd.zadd(expiry_key, {mixin._get_access_token_key(i.token): 1 for i in tokens})
+        await rd.delete(mixin._get_access_token_key(tokens[0].token))
+        reaper = Indexed.get_token_reaper()
+        await reaper.sweep()
+        assert reaper.trimmed == 1
+        assert await rd.zcard(expiry_key) == await rd.zcard(issued_key) == 2
+
+    try:
+        run(main())
+    finally:
+        run(Indexed.shutdown())
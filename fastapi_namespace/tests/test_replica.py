@@ -0,0 +1,115 @@
+"""replica 조회 (``ReplicaSet`` / ``read_rd``) 테스트"""
+import asyncio
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.replica import ReplicaSet
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class Node(fakeredis.FakeAsyncRedis):
+    """``INFO replication`` 의 offset 을 정할 수 있는 Client"""
+
+    def __init__(self, **kwargs):
+        super().__init__(server=fakeredis.FakeServer(), decode_responses=True, **kwargs)
+        self.offset = 0
+        self.link = "up"
+
+    async def info(self, section=None, *args, **kwargs):
+        if isinstance(self.link, Exception):
+            raise self.link
+        return {"master_repl_offset": self.offset, "slave_repl_offset": self.offset, "master_link_status": self.link}
+
+
+def test_replica_set_excludes_lagging_and_broken_replicas():
+    async def main():
+        primary, fresh, lagging, down, broken = Node(), Node(), Node(), Node(), Node()
+        replica_set = ReplicaSet(primary, [fresh, lagging, down, broken], max_lag=0.05, check_interval=0.01)
+        assert replica_set.get_client() is None
+
+        primary.offset = 10
+        for replica in (fresh, lagging, down, broken):
+            replica.offset = 10
+        down.link = "down"
+        broken.link = ConnectionError()
+        await replica_set.check()
+        assert replica_set.lags[2:] == [None, None]
+        assert {replica_set.get_client() for _ in range(4)} == {fresh, lagging}
+
+        # lagging 은 offset 10 에 머무름
+        await asyncio.sleep(0.03)
+        primary.offset = fresh.offset = 20
+        await replica_set.check()
+        await asyncio.sleep(0.03)
+        primary.offset = fresh.offset = 30
+        await replica_set.check()
+        assert replica_set.lags[0] == 0 and replica_set.lags[1] > 0.05
+        assert {replica_set.get_client() for _ in range(4)} == {fresh}
+        await replica_set.aclose()
+
+    run(main())
+
+
+class Replicated(OpaqueTokenMixin):
+    access_token_limit = 5
+    redis_replica_urls = ["redis://replica"]
+
+
+def replicated():
+    primary, replica = Node(), Node()
+
+    class Mixin(Replicated):
+        pass
+
+    Mixin._redis_client = primary
+    Mixin._replica_set = ReplicaSet(primary, [replica])
+    return Mixin, primary, replica
+
+
+def test_reads_use_replica_and_fall_back_to_primary():
+    cls, primary, replica = replicated()
+    mixin = cls()
+
+    async def main():
+        await cls.get_replica_set().check()
+        token = await mixin.create_access_token(rd=primary, identify=1, payload={})
+        key = mixin._get_access_token_key(token.token)
+        # replica 에 아직 복제 되지 않은 토큰은 primary 에서 찾음
+        assert (await mixin.get_access_token(primary, token.token)).info.uid == 1
+
+        await replica.set(key, await primary.get(key), ex=60)
+        await primary.set(key, b"\x01" + b'[{"from": "primary"}, 1, "x"]', ex=60)
+        assert (await mixin.get_access_token(primary, token.token, pipelined=True)).info.payload == {}
+        # WATCH 조회는 항상 primary
+        assert (await mixin.get_access_token(primary, token.token, pipelined=False)).info.payload == {"from": "primary"}
+        # 공유 Client 가 아니면 read_rd 를 넘겨야 replica 를 사용함
+        other = Node()
+        await other.set(key, await primary.get(key), ex=60)
+        assert (await mixin.get_access_token(other, token.token)).info.payload == {"from": "primary"}
+        assert (await mixin.get_access_token(other, token.token, read_rd=replica)).info.payload == {}
+
+    try:
+        run(main())
+    finally:
+        run(cls.shutdown())
+
+
+def test_user_token_list_reads_replica_only():
+    cls, primary, replica = replicated()
+    mixin = cls()
+
+    async def main():
+        await cls.get_replica_set().check()
+        token = await mixin.create_access_token(rd=primary, identify=1, payload={})
+        # 복제 지연 동안은 replica 목록에 없음
+        assert await mixin.get_user_access_tokens(primary, 1) == []
+        key, user_key = mixin._get_access_token_key(token.token), mixin._get_user_access_token_key(1)
+        await replica.set(key, await primary.get(key), ex=60)
+        await replica.sadd(user_key, key)
+        assert [i.token for i in await mixin.get_user_access_tokens(primary, 1)] == [token.token]
+
+    try:
+        run(main())
+    finally:
+        run(cls.shutdown())
@@ -0,0 +1,35 @@
+"""``Resource.get_dependant`` 로 감싼 method handler 테스트"""
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi_namespace import Namespace, Resource
+from .conftest import run
+
+
+def test_dependencies_wrap_any_handler_signature():
+    calls = []
+    ns = Namespace(prefix="/items")
+
+    @ns.route("")
+    class Items(Resource):
+        global_dependencies = [Depends(lambda: calls.append("global"))]
+        get_dependencies = [Depends(lambda: calls.append("get"))]
+
+        async def get(self, *args, q: int = 0):
+            return {"args": list(args), "q": q}
+
+        def post(self, item: str, /, q: int = 1):
+            return {"item": item, "q": q}
+
+    app = FastAPI()
+    app.include_router(ns)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/items", params={"q": 3, "args": "a"})
+            assert (response.status_code, response.json()) == (200, {"args": ["a"], "q": 3})
+            response = await client.post("/items", params={"item": "x"})
+            assert (response.status_code, response.json()) == (200, {"item": "x", "q": 1})
+
+    run(main())
+    assert calls == ["global", "get", "global"]
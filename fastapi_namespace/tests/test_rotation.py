@@ -0,0 +1,92 @@
+"""``rotate_refresh_token`` 이 지운 토큰 정리 테스트"""
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.typings import TokenReuseError
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def rotating(tmp_path):
+    class Rotating(OpaqueTokenMixin):
+        session_index = True
+        shared_cache_path = str(tmp_path / "cache")
+        shared_cache_slots = 64
+        shared_cache_ttl = 60
+
+    return Rotating(), fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+async def indexed(mixin, rd, type, token_key) -> bool:
+    expiry_key, issued_key = mixin._get_session_index_keys(type)
+    return await rd.zscore(expiry_key, token_key) is not None or await rd.zscore(issued_key, token_key) is not None
+
+
+def test_rotate_drops_tokens_evicted_by_limit(tmp_path):
+    mixin, rd = rotating(tmp_path)
+
+    async def main():
+        old = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        refresh = await mixin.create_refresh_token(rd=rd, identify=1, payload={})
+        # shared cache 에 올림
+        assert await mixin.get_access_token(rd, old.token) is not None
+        old_key = mixin._get_access_token_key(old.token)
+        assert await indexed(mixin, rd, "ACCESS", old_key)
+
+        access, _ = await mixin.rotate_refresh_token(rd, refresh.token)
+        # access_token_limit 때문에 지워진 토큰도 cache 와 index 에서 빠짐
+        assert await rd.exists(old_key) == 0
+        assert await mixin.get_access_token(rd, old.token) is None
+        assert not await indexed(mixin, rd, "ACCESS", old_key)
+        assert not await indexed(mixin, rd, "REFRESH", mixin._get_refresh_token_key(refresh.token))
+        assert await mixin.get_access_token(rd, access.token) is not None
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
+
+
+def test_reuse_drops_whole_family(tmp_path):
+    mixin, rd = rotating(tmp_path)
+
+    async def main():
+        refresh = await mixin.create_refresh_token(rd=rd, identify=1, payload={})
+        access, new_refresh = await mixin.rotate_refresh_token(rd, refresh.token)
+        assert await mixin.get_access_token(rd, access.token) is not None
+
+        with pytest.raises(TokenReuseError):
+            await mixin.rotate_refresh_token(rd, refresh.token)
+        assert await mixin.get_access_token(rd, access.token) is None
+        assert await mixin.get_refresh_token(rd, new_refresh.token) is None
+        assert not await indexed(mixin, rd, "ACCESS", mixin._get_access_token_key(access.token))
+        assert not await indexed(mixin, rd, "REFRESH", mixin._get_refresh_token_key(new_refresh.token))
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
+
+
+def test_reuse_of_expired_record_drops_family(tmp_path):
+    """교체된 토큰 레코드가 이미 없으면 ``revoke_reused`` 로 family 를 지움"""
+    mixin, rd = rotating(tmp_path)
+
+    async def main():
+        refresh = await mixin.create_refresh_token(rd=rd, identify=1, payload={})
+        _, second = await mixin.rotate_refresh_token(rd, refresh.token)
+        access, third = await mixin.rotate_refresh_token(rd, second.token)
+        assert await mixin.get_access_token(rd, access.token) is not None
+
+        with pytest.raises(TokenReuseError):
+            await mixin.rotate_refresh_token(rd, second.token)
+        assert await mixin.get_access_token(rd, access.token) is None
+        assert await mixin.get_refresh_token(rd, third.token) is None
+        assert not await indexed(mixin, rd, "ACCESS", mixin._get_access_token_key(access.token))
+        assert not await indexed(mixin, rd, "REFRESH", mixin._get_refresh_token_key(third.token))
+
+    try:
+        run(main())
+    finally:
+        run(mixin.shutdown())
@@ -0,0 +1,76 @@
+"""``security_class`` 인증 dependency 테스트"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from fastapi_namespace import Namespace
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.sercurity.oauth2 import OAuth2
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.mark.parametrize("credentials, token", [
+    ("Bearer abc", "abc"),
+    ("bearer abc", "abc"),
+    ("Basic abc", None),
+    ("Bearer", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_token(credentials, token):
+    assert OAuth2(flows={}).parse_token(credentials) == token
+
+
+def secured_app(auto_error: bool):
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    ns = Namespace(prefix="/me")
+    lookups = []
+
+    async def get_redis():
+        return rd
+
+    @ns.route("")
+    class Me(OpaqueTokenMixin):
+        security_class = OAuth2(flows={}, auto_error=auto_error)
+        security_route = ["get"]
+        security_redis_dependency = get_redis
+
+        async def get_access_token(self, *args, **kwargs):
+            lookups.append(kwargs["token"])
+            return await super().get_access_token(*args, **kwargs)
+
+        async def get(self, request: Request):
+            # dependency 가 조회한 결과를 다시 조회하지 않고 사용
+            token_info = await self.authenticate(request, rd, request.headers.get("Authorization"))
+            assert token_info is self.get_current_token(request)
+            return None if token_info is None else token_info.info.uid
+
+        async def post(self):
+            token = await self.create_access_token(rd=rd, identify=1, payload={})
+            return token.token
+
+    app = FastAPI()
+    app.include_router(ns)
+    return app, lookups
+
+
+def test_security_route_authenticates_once_per_request():
+    app, lookups = secured_app(auto_error=True)
+    with TestClient(app) as client:
+        # security_route 에 없는 method 는 인증하지 않음
+        token = client.post("/me").json()
+        assert client.get("/me", headers={"Authorization": f"Bearer {token}"}).json() == 1
+        assert lookups == [token]
+        response = client.get("/me", headers={"Authorization": "Bearer unknown"})
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+        assert client.get("/me").status_code == 403
+
+
+def test_security_without_auto_error_returns_none():
+    app, lookups = secured_app(auto_error=False)
+    with TestClient(app) as client:
+        assert client.get("/me", headers={"Authorization": "Bearer unknown"}).json() is None
+        assert client.get("/me", headers={"Authorization": "Basic abc"}).json() is None
+        assert client.get("/me").json() is None
+    assert lookups == ["unknown"]
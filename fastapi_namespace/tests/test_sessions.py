@@ -0,0 +1,154 @@
+"""전역 세션 index (``session_index``) 테스트"""
+import pytest
+from itertools import count
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.sharding import HashRing, ShardedRedis, get_key_tag, move_keys, rebalance
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def client():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+class Sharded(OpaqueTokenMixin):
+    session_index = True
+    redis_sharded = True
+
+
+def add_shard_taking(rd: ShardedRedis, key: str) -> None:
+    """``key`` 가 새 노드로 옮겨 가도록 노드 추가
+
+    ring 위치는 노드 이름의 hash 로만 정해지므로 ``key`` 를 가져가는 이름을 미리 골라서 추가함
+    """
+    tag = get_key_tag(key)
+    name = next(
+        name for name in (f"shard{i}" for i in count())
+        if HashRing([*rd.ring.nodes, name], rd.replicas).get_node(tag) == name
+    )
+    rd.add_shard(name, client())
+
+
+def test_move_keys_merges_sorted_set():
+    async def main():
+        source, target = client(), client()
+        await source.zadd("index", {"a": 1, "b": 5})
+        await target.zadd("index", {"b": 3, "c": 2})
+        await source.expire("index", 100)
+        await target.expire("index", 50)
+        await move_keys(source, target, ["index"])
+        assert await target.zrange("index", 0, -1, withscores=True) == [("a", 1), ("c", 2), ("b", 5)]
+        assert 50 < await target.ttl("index") <= 100
+        assert await source.exists("index") == 0
+
+    run(main())
+
+
+def test_session_index_survives_rebalance():
+    async def main():
+        rd = ShardedRedis({"a": client(), "b": client()})
+        mixin = Sharded()
+        for i in range(30):
+            await mixin.create_access_token(rd=rd, identify=i, payload={})
+        index_key, _ = mixin._get_session_index_keys("ACCESS")
+        before = rd.get_client(index_key)
+        add_shard_taking(rd, index_key)
+        assert rd.get_client(index_key) is not before
+
+        # rebalance 중 발급 되어 새 노드에도 index 가 생김
+        await mixin.create_access_token(rd=rd, identify=1000, payload={})
+        assert len([i async for i in mixin.iter_sessions(rd, page_size=7)]) == 31
+        await rebalance(rd)
+        assert len([i async for i in mixin.iter_sessions(rd, page_size=7)]) == 31
+        assert await mixin.trim_session_index(rd) == 0
+
+    run(main())
+
+
+def test_session_index_merges_before_rebalance_moves_it():
+    async def main():
+        rd = ShardedRedis({"a": client(), "b": client()})
+        mixin = Sharded()
+        for i in range(10):
+            await mixin.create_access_token(rd=rd, identify=i, payload={})
+        index_key, _ = mixin._get_session_index_keys("ACCESS")
+        before = rd.get_client(index_key)
+        add_shard_taking(rd, index_key)
+        assert rd.get_client(index_key) is not before
+
+        token = await mixin.create_access_token(rd=rd, identify=1000, payload={})
+        await mixin.abort_access_token(rd, token.token)
+        # 이전 노드에서 취소 된 토큰이 합치면서 되살아나지 않음
+        await mixin.abort_user_access_token(rd, 0)
+        await rebalance(rd)
+        assert await rd.get_client(index_key).zcard(index_key) == 9
+        assert sorted([int(i.info.uid) async for i in mixin.iter_sessions(rd)]) == list(range(1, 10))
+
+    run(main())
+
+
+class Indexed(OpaqueTokenMixin):
+    session_index = True
+
+
+def test_bulk_issued_sessions_have_unique_scores():
+    async def main():
+        rd = client()
+        mixin = Indexed()
+        tokens = await mixin.create_tokens_bulk(rd, [(i, {}) for i in range(50)])
+        expiry_key, issued_key = mixin._get_session_index_keys("ACCESS")
+        for key in (expiry_key, issued_key):
+            scores = [score for _, score in await rd.zrange(key, 0, -1, withscores=True)]
+            assert len(set(scores)) == 50
+
+        pages = []
+        cursor = None
+        while True:
+            page = await mixin.get_session_page(rd, order="issued", count=7, cursor=cursor)
+            pages.append(page.sessions)
+            if (cursor := page.cursor) is None:
+                break
+        assert [len(i) for i in pages] == [7] * 7 + [1]
+        assert [i.token for page in pages for i in page] == [i.token for i in tokens]
+
+        latest = await mixin.get_session_page(rd, order="issued", count=3, reverse=True)
+        assert [i.token for i in latest.sessions] == [i.token for i in tokens[:-4:-1]]
+
+    run(main())
+
+
+def test_session_page_cursor_skips_aborted_and_ties():
+    async def main():
+        rd = client()
+        mixin = Indexed()
+        tokens = [await mixin.create_access_token(rd=rd, identify=i, payload={}) for i in range(6)]
+        expiry_key, _ = mixin._get_session_index_keys("ACCESS")
+        # 같은 score 의 항목은 member 순서로 이어서 읽음
+        await rd.zadd(expiry_key, {mixin._get_access_token_key(i.token): 1e12 for i in tokens})
+
+        first = await mixin.get_session_page(rd, count=2)
+        await mixin.abort_access_token(rd, first.sessions[0].token)
+        rest = [i async for i in mixin.iter_sessions(rd, page_size=2)]
+        assert len(rest) == 5
+        second = await mixin.get_session_page(rd, count=10, cursor=first.cursor)
+        assert second.cursor is None
+        assert {i.token for i in first.sessions} | {i.token for i in second.sessions} == {i.token for i in tokens}
+        assert len(second.sessions) == 4
+
+    run(main())
+
+
+def test_session_page_requires_positive_count():
+    class Indexed(OpaqueTokenMixin):
+        session_index = True
+
+    async def main():
+        rd = client()
+        mixin = Indexed()
+        await mixin.create_access_token(rd=rd, identify=1, payload={})
+        with pytest.raises(ValueError):
+            await mixin.get_session_page(rd, count=0)
+        assert len((await mixin.get_session_page(rd, count=1)).sessions) == 1
+
+    run(main())
@@ -0,0 +1,110 @@
+"""client 측 sharding ``ShardedRedis`` / ``rebalance`` 테스트"""
+import pytest
+from fastapi_namespace.mixins.token import OpaqueTokenMixin
+from fastapi_namespace.mixins.token.sharding import HashRing, ShardedRedis, get_key_tag, move_keys, rebalance
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def client():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+class Sharded(OpaqueTokenMixin):
+    access_token_limit = 3
+    redis_sharded = True
+
+
+def test_get_key_tag():
+    assert get_key_tag("access_token/{abcd}/abcd.xyz") == "abcd"
+    assert get_key_tag("access_token/{}/x") == "access_token/{}/x"
+    assert get_key_tag("plain") == "plain"
+
+
+def test_hash_ring_moves_only_to_new_node():
+    with pytest.raises(ValueError):
+        HashRing([])
+    tags = [f"tag{i}" for i in range(3000)]
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+    moved = [tag for tag in tags if before.get_node(tag) != after.get_node(tag)]
+    assert all(after.get_node(tag) == "d" for tag in moved)
+    # 대략 1 / 노드 수 만큼만 옮겨짐
+    assert 0.15 < len(moved) / len(tags) < 0.35
+
+
+def test_move_keys_keeps_newer_values():
+    async def main():
+        source, target = client(), client()
+        await source.set("token", "old", ex=100)
+        await target.set("token", "new", ex=10)
+        await source.sadd("user", "a", "b")
+        await target.sadd("user", "c")
+        await source.set("moved", "value", ex=100)
+        await move_keys(source, target, ["token", "user", "moved", "missing"])
+        assert await target.get("token") == "new"
+        assert await target.smembers("user") == {"a", "b", "c"}
+        assert await target.get("moved") == "value" and 0 < await target.ttl("moved") <= 100
+        assert await source.exists("token", "user", "moved") == 0
+
+    run(main())
+
+
+def test_tokens_are_readable_and_abortable_during_rebalance():
+    async def main():
+        rd = ShardedRedis({"a": client(), "b": client()})
+        mixin = Sharded()
+        tokens = {i: await mixin.create_access_token(rd=rd, identify=i, payload={}) for i in range(40)}
+        for uid, token in tokens.items():
+            key = mixin._get_access_token_key(token.token)
+            # 유저의 토큰 목록과 토큰은 같은 노드
+            assert rd.get_client(key) is rd.get_client(mixin._get_user_access_token_key(uid))
+            assert await rd.get_client(key).exists(key) == 1
+
+        rd.add_shard("c", client())
+        assert rd.rebalancing
+        with pytest.raises(RuntimeError):
+            rd.add_shard("d", client())
+        moving = [
+            uid for uid, token in tokens.items()
+            if rd.get_previous_client(mixin._get_access_token_key(token.token)) is not None
+        ]
+        assert len(moving) != 0
+
+        # 아직 옮겨지지 않은 토큰도 조회 / 취소 가능
+        for uid in moving[1:]:
+            assert (await mixin.get_access_token(rd, tokens[uid].token)).info.uid == uid
+        await mixin.abort_access_token(rd, tokens[moving[0]].token)
+        assert await mixin.get_access_token(rd, tokens[moving[0]].token) is None
+
+        assert await rebalance(rd, batch_size=7) > 0
+        assert not rd.rebalancing
+        for uid, token in tokens.items():
+            info = await mixin.get_access_token(rd, token.token)
+            assert (info is None) == (uid == moving[0])
+        # 이전 노드에는 옮겨진 키가 남지 않음
+        for name, node in rd.clients.items():
+            for key in await node.keys("*"):
+                assert rd.ring.get_node(get_key_tag(key)) == name
+
+    run(main())
+
+
+def test_remove_shard_moves_keys_and_returns_client():
+    async def main():
+        removed_client = client()
+        rd = ShardedRedis({"a": client(), "b": client(), "c": removed_client})
+        mixin = Sharded()
+        tokens = [await mixin.create_access_token(rd=rd, identify=i, payload={}) for i in range(20)]
+        with pytest.raises(ValueError):
+            rd.remove_shard("unknown")
+        rd.remove_shard("c")
+        await rebalance(rd)
+        assert list(rd.clients) == ["a", "b"]
+        assert await removed_client.dbsize() == 0
+        for i, token in enumerate(tokens):
+            assert (await mixin.get_access_token(rd, token.token)).info.uid == i
+        assert await rebalance(rd) == 0
+
+    run(main())
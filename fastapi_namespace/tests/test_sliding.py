@@ -0,0 +1,42 @@
+"""사용한 토큰의 만료 시간을 모아서 갱신하는 ``SlidingExpiration`` 테스트"""
+import pytest
+from redis.exceptions import ConnectionError
+from fastapi_namespace.mixins.token.sliding import SlidingExpiration
+from .conftest import run
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_flush_extends_each_key_once():
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    sliding = SlidingExpiration(batch_size=2)
+
+    async def main():
+        for key in ("a", "b", "c"):
+            await rd.set(key, 1, ex=10)
+        sliding.note(rd, ["a", "b"], 100)
+        sliding.note(rd, ["b", "c"], 200)
+        await sliding.flush()
+        assert [await rd.ttl(i) for i in ("a", "b", "c")] == [100, 200, 200]
+
+    run(main())
+    assert (sliding.flushed, sliding.failed, sliding.last_error) == (3, 0, None)
+
+
+def test_failed_flush_is_counted_and_other_clients_continue():
+    server = fakeredis.FakeServer()
+    broken = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    sliding = SlidingExpiration(batch_size=2)
+
+    async def main():
+        await rd.set("ok", 1, ex=10)
+        server.connected = False
+        sliding.note(broken, ["a", "b", "c"], 100)
+        sliding.note(rd, ["ok"], 100)
+        await sliding.flush()
+        assert await rd.ttl("ok") == 100
+
+    run(main())
+    assert (sliding.flushed, sliding.failed) == (1, 3)
+    assert isinstance(sliding.last_error, ConnectionError)
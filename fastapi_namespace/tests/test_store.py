@@ -0,0 +1,309 @@
+"""모든 ``TokenStore`` 구현이 같은 동작을 하는지 확인하는 테스트"""
+import pytest
+from fastapi_namespace.mixins.token.store import TokenStore, RedisTokenStore, TokenIssue, TokenRotation, RotateResult
+from fastapi_namespace.mixins.token.memory import MemoryTokenStore
+from .conftest import Clock, run
+
+
+def memory_store():
+    clock = Clock()
+    return MemoryTokenStore(clock=clock), clock
+
+
+def redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisTokenStore(fakeredis.FakeAsyncRedis(decode_responses=True)), None
+
+
+def bytes_redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisTokenStore(fakeredis.FakeAsyncRedis()), None
+
+
+@pytest.fixture(params=[memory_store, redis_store, bytes_redis_store], ids=["memory", "redis", "bytes"])
+def backend(request) -> tuple[TokenStore, Clock | None]:
+    return request.param()
+
+
+def key_factory(*tokens: str):
+    it = iter(tokens)
+    return lambda: ((t := next(it)), f"access_token/{t}")
+
+
+def test_add_and_get(backend):
+    store, _ = backend
+
+    async def main():
+        raw, key, ttl = await store.add("user/1", key_factory("a"), b"record", 60)
+        assert (raw, key, ttl) == ("a", "access_token/a", 60)
+        [(record, ttl)] = await store.get_with_ttl([key])
+        assert record in (b"record", "record") and 0 < ttl <= 60
+        assert await store.get_with_ttl(["access_token/none"]) == [(None, -2)]
+
+    run(main())
+
+
+def test_add_skips_existing_key(backend):
+    store, _ = backend
+
+    async def main():
+        await store.add("user/1", key_factory("a"), b"1", 60)
+        raw, _, _ = await store.add("user/1", key_factory("a", "b"), b"2", 60)
+        assert raw == "b"
+        assert sorted(i[0] for i in await store.list_user("user/1")) == ["access_token/a", "access_token/b"]
+
+    run(main())
+
+
+def test_cleanup_limit_evicts_shortest(backend):
+    store, _ = backend
+
+    async def main():
+        await store.add("user/1", key_factory("a"), b"1", 10)
+        await store.add("user/1", key_factory("b"), b"2", 60)
+        assert await store.cleanup("user/1", 2) == ["access_token/a"]
+        assert [i[0] for i in await store.list_user("user/1")] == ["access_token/b"]
+        assert (await store.get_with_ttl(["access_token/a"]))[0][0] is None
+
+    run(main())
+
+
+def test_abort(backend):
+    store, _ = backend
+
+    async def main():
+        for i in "abc":
+            await store.add("user/1", key_factory(i), b"1", 60)
+        await store.abort("user/1", ["access_token/a", "access_token/x"])
+        assert sorted(i[0] for i in await store.list_user("user/1")) == ["access_token/b", "access_token/c"]
+        await store.abort("user/1")
+        assert await store.list_user("user/1") == []
+        assert await store.get_with_ttl(["access_token/b"]) == [(None, -2)]
+
+    run(main())
+
+
+def test_delete_and_expire(backend):
+    store, _ = backend
+
+    async def main():
+        await store.add("user/1", key_factory("a"), b"1", 60)
+        await store.expire(["access_token/a", "access_token/none"], 300)
+        assert 60 < (await store.get_with_ttl(["access_token/a"]))[0][1] <= 300
+        await store.delete(["access_token/a"])
+        assert await store.get_with_ttl(["access_token/a"]) == [(None, -2)]
+
+    run(main())
+
+
+def test_scan_user_keys(backend):
+    store, _ = backend
+
+    async def main():
+        for uid in ("t1:1", "t1:2", "t2:1"):
+            await store.add(f"user/{uid}", key_factory(uid), b"1", 60)
+        assert sorted({i async for i in store.scan_user_keys("user/t1:*", 10)}) == ["user/t1:1", "user/t1:2"]
+
+    run(main())
+
+
+def test_memory_expiry_is_deterministic():
+    store, clock = memory_store()
+
+    async def main():
+        await store.add("user/1", key_factory("a"), b"1", 10)
+        clock.now += 9
+        assert (await store.get_with_ttl(["access_token/a"]))[0][1] == 1
+        clock.now += 1
+        assert await store.get_with_ttl(["access_token/a"]) == [(None, -2)]
+        assert await store.list_user("user/1") == []
+        assert store._records == {} and store._sets == {}
+
+    run(main())
+
+
+def rotation(old: str, new: str, record: bytes, family: str = "f1") -> TokenRotation:
+    return TokenRotation(
+        token_key=f"refresh_token/{old}",
+        record=record,
+        used_key=f"used/{old}",
+        family_pointer_key=f"family/{old}",
+        family_prefix="family_tokens/",
+        family=family,
+        access=TokenIssue("user_access/1", f"access_token/{new}", b"a", 60, 1),
+        refresh=TokenIssue("user_refresh/1", f"refresh_token/{new}", b"r", 120, 1),
+        refresh_family_pointer_key=f"family/{new}",
+    )
+
+
+def test_rotate_and_reuse(backend):
+    store, _ = backend
+    if isinstance(store, RedisTokenStore):
+        pytest.importorskip("lupa")
+
+    async def main():
+        await store.add("user_refresh/1", lambda: ("r0", "refresh_token/r0"), b"r", 120)
+        [(record, _)] = await store.get_with_ttl(["refresh_token/r0"])
+        assert await store.rotate(first := rotation("r0", "r1", record)) == RotateResult.ROTATED
+        assert first.deleted == ["refresh_token/r0"]
+        assert await store.get_with_ttl(["refresh_token/r0"]) == [(None, -2)]
+        assert [i[0] for i in await store.list_user("user_refresh/1")] == ["refresh_token/r1"]
+
+        [(record, _)] = await store.get_with_ttl(["refresh_token/r1"])
+        assert await store.rotate(collision := rotation("r1", "r1", record)) == RotateResult.COLLISION
+        assert collision.deleted == []
+        # limit 1 이라 access/r1 이 밀려남
+        assert await store.rotate(second := rotation("r1", "r2", record)) == RotateResult.ROTATED
+        assert sorted(second.deleted) == ["access_token/r1", "refresh_token/r1"]
+
+        assert await store.rotate(reused := rotation("r0", "r3", record)) == RotateResult.REUSED
+        assert {"access_token/r2", "refresh_token/r2"} <= set(reused.deleted)
+        assert await store.get_with_ttl(["refresh_token/r2", "access_token/r2"]) == [(None, -2), (None, -2)]
+        assert await store.revoke_reused("used/r1", "family_tokens/", deleted := [])
+        assert deleted == []
+        assert not await store.revoke_reused("used/none", "family_tokens/")
+
+    run(main())
+
+
+def test_redis_rotate_rereads_family_changed_before_script():
+    store, _ = redis_store()
+    pytest.importorskip("lupa")
+    # script 는 한번만 만들어지고 호출할 때 Client 를 넘김
+    store.rd.register_script = None
+    mget = store.rd.mget
+    stale = []
+
+    async def stale_mget(*keys):
+        # 첫번째는 script 전에 family 가 바뀐 것처럼 이전 값을 돌려줌
+        if len(stale) == 0:
+            stale.append(keys)
+            return [None, None]
+        return await mget(*keys)
+
+    async def main():
+        await store.add("user_refresh/1", lambda: ("r0", "refresh_token/r0"), b"r", 120)
+        [(record, _)] = await store.get_with_ttl(["refresh_token/r0"])
+        assert await store.rotate(rotation("r0", "r1", record, family="f1")) == RotateResult.ROTATED
+
+        store.rd.mget = stale_mget
+        [(record, _)] = await store.get_with_ttl(["refresh_token/r1"])
+        assert await store.rotate(rotation("r1", "r2", record, family="f2")) == RotateResult.ROTATED
+        assert len(stale) == 1
+        assert await store.rd.get("family/r2") == "f1"
+        assert await store.rd.smembers("family_tokens/f1") == {"access_token/r1", "access_token/r2", "refresh_token/r2", "family/r2"}
+        assert await store.rd.exists("family_tokens/f2") == 0
+
+    run(main())
+
+
+def test_prune(backend):
+    store, _ = backend
+
+    async def main():
+        for i in "ab":
+            await store.add("user/1", key_factory(i), b"1", 60)
+        await store.delete(["access_token/a"])
+        assert await store.prune(["user/1", "user/none"]) == 1
+        assert [i async for i in store.scan_user_keys("user/*", 10)] == ["user/1"]
+        assert await store.prune(["user/1"]) == 0
+
+    run(main())
+
+
+def hashed_redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisTokenStore(fakeredis.FakeAsyncRedis(decode_responses=True), hashed=True), None
+
+
+@pytest.fixture(params=[memory_store, hashed_redis_store], ids=["memory", "redis"])
+def hashed_backend(request) -> tuple[TokenStore, Clock | None]:
+    return request.param()
+
+
+def test_hash_record_fields(hashed_backend):
+    store, _ = hashed_backend
+
+    async def main():
+        await store.add("user/1", key_factory("a"), {"uid": b"1", "payload.role": b'"admin"'}, 60)
+        [(record, _)] = await store.get_with_ttl(["access_token/a"])
+        assert {k: v if isinstance(v, str) else v.decode() for k, v in record.items()} == {"uid": "1", "payload.role": '"admin"'}
+        [(values, ttl), missing] = await store.get_fields(["access_token/a", "access_token/none"], ["payload.role", "idf"])
+        assert [v if v is None or isinstance(v, str) else v.decode() for v in values] == ['"admin"', None] and 0 < ttl <= 60
+        assert missing == (None, -2)
+        assert [i[0] for i in await store.list_user("user/1")] == ["access_token/a"]
+
+    run(main())
+
+
+def test_rotation_is_required():
+    assert {"rotate", "revoke_reused"} <= TokenStore.__abstractmethods__
+
+
+def test_redis_store_returns_str_keys_without_decoded_responses():
+    fakeredis = pytest.importorskip("fakeredis")
+    store = RedisTokenStore(fakeredis.FakeAsyncRedis(), watch_reads=True, hashed=True)
+
+    async def main():
+        await store.add("user/1", lambda: ("a", "access_token/a"), {"uid": b"1"}, 60)
+        assert await store.get_with_ttl(["access_token/a"]) == [({"uid": b"1"}, 60)]
+        assert await store.list_user("user/1") == [("access_token/a", {"uid": b"1"}, 60)]
+        assert await store.get_fields(["access_token/a"], ["uid"]) == [([b"1"], 60)]
+
+    run(main())
+
+
+def test_mixin_reuses_store_per_client():
+    import gc
+    from fastapi_namespace.mixins.token import OpaqueTokenMixin
+    fakeredis = pytest.importorskip("fakeredis")
+
+    class Stored(OpaqueTokenMixin):
+        pass
+
+    mixin = Stored()
+    rd = fakeredis.FakeAsyncRedis(decode_responses=True)
+    store = mixin._get_token_store(rd)
+    assert mixin._get_token_store(rd) is store and Stored()._get_token_store(rd) is store
+    assert mixin._get_token_store(rd, watch_reads=True).watch_reads
+    # 저장소가 Client 를 붙잡지 않음
+    del rd, store
+    gc.collect()
+    assert len(Stored._token_stores) == 0
+
+
+@pytest.mark.parametrize("hashed", [False, True], ids=["binary", "hash"])
+def test_mixin_works_without_decoded_responses(hashed):
+    from fastapi_namespace.mixins.token import OpaqueTokenMixin
+    from fastapi_namespace.mixins.token.codec import BinaryTokenCodec, HashTokenCodec
+    from fastapi_namespace.mixins.token.typings import TokenReuseError
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    class Raw(OpaqueTokenMixin):
+        token_codec = HashTokenCodec() if hashed else BinaryTokenCodec()
+        access_token_limit = 3
+        session_index = True
+
+    mixin, rd = Raw(), fakeredis.FakeAsyncRedis()
+
+    async def main():
+        first = await mixin.create_access_token(rd=rd, identify=1, payload={"role": "admin"})
+        second = await mixin.create_access_token(rd=rd, identify=1, payload={})
+        assert (await mixin.get_access_token(rd, first.token)).info == first.info
+        assert {i.token for i in await mixin.get_user_access_tokens(rd, 1)} == {first.token, second.token}
+        assert (await mixin.get_token_fields(rd, first.token, ["payload.role"]))["payload.role"] == "admin"
+        assert {i.token for i in (await mixin.get_session_page(rd, count=1)).sessions} <= {first.token, second.token}
+
+        refresh = await mixin.create_refresh_token(rd=rd, identify=1, payload={})
+        access, _ = await mixin.rotate_refresh_token(rd, refresh.token)
+        with pytest.raises(TokenReuseError):
+            await mixin.rotate_refresh_token(rd, refresh.token)
+        assert await mixin.get_access_token(rd, access.token) is None
+
+        await mixin.abort_access_token(rd, first.token)
+        assert [i.token for i in await mixin.get_user_access_tokens(rd, 1)] == [second.token]
+        assert (await mixin.abort_tokens_bulk(rd)).aborted_tokens == 1
+        assert await mixin.get_user_access_tokens(rd, 1) == []
+
+    run(main())
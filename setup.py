@@ -24,6 +24,10 @@ setup(
     ],
     tests_require=[
         "uvicorn>=0.9.0",
-        "fastapi-redis-vet1ments>=0.2.6"
+        "fastapi-redis-vet1ments>=0.2.6",
+        "pytest>=7.0.0",
+        "httpx>=0.27.0",
+        "fakeredis>=2.20.0",
+        "lupa>=2.0"
     ],
 )
\ No newline at end of file